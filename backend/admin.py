@@ -1,8 +1,69 @@
+"""
+Flask-Admin panel, mounted at /admin when ENABLE_ADMIN=1 (see app.py).
+
+The transaction and installment tables grow with every user, so their list views
+(LargeTableView) are built not to scan them:
+    - a fixed page size, sorted by primary key; other sortable columns and the filters
+      are limited to indexed columns
+    - the relationships shown in the list are joined into the page query instead of
+      being loaded row by row
+    - an unfiltered list shows an estimated row count (pg_class.reltuples on PostgreSQL,
+      the highest id elsewhere) once the table passes EXACT_COUNT_LIMIT rows; filtered
+      lists use the previous/next pager and run no COUNT(*) at all
+"""
 import os
 from flask_admin import Admin
+from sqlalchemy import func, select, text
 from models import Account, Category, Debt, Installment, InstallmentTransaction, LoanGiven, Reminder, Report, Subscription, Transaction, db, User
 from flask_admin.contrib.sqla import ModelView
 
+EXACT_COUNT_LIMIT = 100000
+
+def estimated_count(session, model):
+    """
+    Approximate number of rows of the model's table, exact below EXACT_COUNT_LIMIT
+    """
+    if session.get_bind().dialect.name == 'postgresql':
+        estimate = session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": f'"{model.__tablename__}"'},
+        ).scalar()
+    else:
+        estimate = session.execute(select(func.max(model.id))).scalar()
+    # reltuples is -1 (or 0) until the table is first analyzed
+    if estimate is None or estimate < EXACT_COUNT_LIMIT:
+        return session.execute(select(func.count()).select_from(model)).scalar()
+    return estimate
+
+class LargeTableView(ModelView):
+    page_size = 50
+    can_set_page_size = False
+    simple_list_pager = True
+    column_display_pk = True
+    column_default_sort = ('id', True)
+    column_sortable_list = ('id',)
+
+    def get_list(self, page, sort_column, sort_desc, search, filters, execute=True, page_size=None):
+        count, data = super().get_list(page, sort_column, sort_desc, search, filters, execute, page_size)
+        if not search and not filters:
+            count = estimated_count(self.session, self.model)
+        return count, data
+
+class TransactionView(LargeTableView):
+    column_list = ('id', 'date', 'type', 'amount', 'description', 'user.email', 'account.name', 'category.name')
+    column_select_related_list = (Transaction.user, Transaction.account, Transaction.category)
+    column_sortable_list = ('id', 'type', 'description')
+    column_filters = ('user_id', 'account_id', 'category_id', 'subscription_id', 'type')
+
+class InstallmentView(LargeTableView):
+    column_list = ('id', 'debt_id', 'loan_given_id', 'amount', 'due_date', 'status', 'last_payment_date')
+    column_filters = ('debt_id', 'loan_given_id', 'status')
+
+class InstallmentTransactionView(LargeTableView):
+    column_list = ('id', 'installment_id', 'transaction_id', 'amount', 'transaction.date')
+    column_select_related_list = (InstallmentTransaction.transaction,)
+    column_filters = ('installment_id', 'transaction_id')
+
 def setup_admin(app):
     app.secret_key = os.environ.get('FLASK_APP_KEY', 'sample key')
     app.config['FLASK_ADMIN_SWATCH'] = 'darkly'
@@ -12,15 +73,15 @@ def setup_admin(app):
     # Add your models here, for example this is how we add a the User model to the admin
     admin.add_view(ModelView(User, db.session))
     admin.add_view(ModelView(Account, db.session))
-    admin.add_view(ModelView(Transaction, db.session))
+    admin.add_view(TransactionView(Transaction, db.session))
     admin.add_view(ModelView(Category, db.session))
     admin.add_view(ModelView(Subscription, db.session))
     admin.add_view(ModelView(LoanGiven, db.session))
     admin.add_view(ModelView(Debt, db.session))
-    admin.add_view(ModelView(Installment, db.session))
-    admin.add_view(ModelView(InstallmentTransaction, db.session))
+    admin.add_view(InstallmentView(Installment, db.session))
+    admin.add_view(InstallmentTransactionView(InstallmentTransaction, db.session))
     admin.add_view(ModelView(Reminder, db.session))
     admin.add_view(ModelView(Report, db.session))
 
     # You can duplicate that line to add new models
-    # admin.add_view(ModelView(YourModelName, db.session))
\ No newline at end of file
+    # admin.add_view(ModelView(YourModelName, db.session))
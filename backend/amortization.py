@@ -0,0 +1,165 @@
+"""
+Payoff projections of debts and loans given.
+
+An obligation's schedule is its outstanding installments (amount minus what the
+InstallmentTransaction links already paid) in due date order, applied against
+remaining_amount. If the installments run out before the balance does, the schedule
+continues monthly with the last installment amount. Obligations have no interest rate,
+so a payment reduces the balance by its full amount.
+
+build_projections() projects every debt and loan of a user at once. It reads the
+obligations with one query per table and the outstanding installments of all of them
+with one grouped query, then walks the schedules with Decimal arithmetic. What-if
+scenarios add `extra` to every scheduled payment and/or pay `lump_sum` today.
+
+The outstanding installments are read on every call, in the same grouped query per type,
+like remaining_amount: they are not cached across requests, so a projection never mixes a
+fresh balance with installments paid through another worker or a bulk Core write
+(importer, scheduler, overdue sweep).
+"""
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import func, select
+from models import db, Debt, Installment, InstallmentTransaction, LoanGiven, frequencyType, statusType
+from utils import next_payment_date
+
+ZERO = Decimal("0.00")
+MAX_PERIODS = 600
+
+OBLIGATIONS = {
+    "debt": (Debt, Debt.creditor, Installment.debt_id),
+    "loan_given": (LoanGiven, LoanGiven.debtor, Installment.loan_given_id),
+}
+
+def _load_schedules(kind, ids):
+    """
+    Returns {obligation id: [(due_date, outstanding amount)]} of the given obligations,
+    reading the unpaid installments of all of them in one query
+    """
+    owner = OBLIGATIONS[kind][2]
+    paid = func.coalesce(func.sum(InstallmentTransaction.amount), 0)
+    rows = db.session.execute(
+        select(owner, Installment.due_date, Installment.amount, paid)
+        .outerjoin(InstallmentTransaction, InstallmentTransaction.installment_id == Installment.id)
+        .where(owner.in_(ids), Installment.status != statusType.paid)
+        .group_by(Installment.id, owner, Installment.due_date, Installment.amount)
+        .order_by(owner, Installment.due_date, Installment.id)
+    )
+    schedules = {obligation_id: [] for obligation_id in ids}
+    for obligation_id, due_date, amount, paid_amount in rows:
+        outstanding = Decimal(amount) - Decimal(paid_amount)
+        if outstanding > 0:
+            schedules[obligation_id].append((due_date, outstanding))
+    return schedules
+
+def _periods(installments, payment_date):
+    """
+    Yields (due date, scheduled amount): the installments, then monthly repeats of the last one
+    """
+    yield from installments
+    if installments:
+        date, amount = installments[-1]
+        # The last installment may itself be clamped (Feb 28 of a schedule on the 31st)
+        anchor_day = max(due_date.day for due_date, _ in installments)
+    elif payment_date is not None:
+        # No installments: the whole balance is due on payment_date
+        yield payment_date, None
+        return
+    else:
+        return
+    while True:
+        date = next_payment_date(date, frequencyType.monthly, anchor_day)
+        yield date, amount
+
+def project(remaining, installments, payment_date=None, extra=ZERO, lump_sum=ZERO, today=None):
+    """
+    Walks the schedule until the balance is paid off. Returns the payments with the
+    balance left after each one, the payoff date (None if nothing is scheduled) and
+    the balance still unscheduled
+    """
+    today = today or datetime.now()
+    balance = Decimal(remaining)
+    payments = []
+    if lump_sum and balance > 0:
+        paid = min(lump_sum, balance)
+        balance -= paid
+        payments.append({"due_date": today, "amount": paid, "balance": balance, "overdue": False})
+
+    for due_date, amount in _periods(installments, payment_date):
+        if balance <= 0 or len(payments) >= MAX_PERIODS:
+            break
+        paid = balance if amount is None else min(amount + extra, balance)
+        if paid <= 0:
+            break
+        balance -= paid
+        payments.append({"due_date": due_date, "amount": paid, "balance": balance, "overdue": due_date < today})
+
+    return {
+        "payments": payments,
+        "payoff_date": payments[-1]["due_date"] if payments and balance <= 0 else None,
+        "unscheduled": balance,
+    }
+
+def _projection(kind, row, installments, extra, lump_sum, today):
+    obligation_id, party, total_amount, remaining_amount, payment_date, status = row
+    projection = {
+        "id": obligation_id,
+        "type": kind,
+        "party": party,
+        "total_amount": total_amount,
+        "remaining_amount": remaining_amount,
+        "status": status,
+        **project(remaining_amount, installments, payment_date, today=today),
+    }
+    if extra or lump_sum:
+        what_if = project(remaining_amount, installments, payment_date, extra, lump_sum, today)
+        what_if["payments_saved"] = len(projection["payments"]) - len(what_if["payments"])
+        projection["what_if"] = what_if
+    return projection
+
+def _monthly(remaining, schedules):
+    """
+    Scheduled payments and outstanding balance per month across several payment schedules
+    """
+    months = defaultdict(lambda: ZERO)
+    for payments in schedules:
+        for payment in payments:
+            months[payment["due_date"].strftime("%Y-%m")] += payment["amount"]
+    result = []
+    for month in sorted(months):
+        remaining -= months[month]
+        result.append({"month": month, "payments": months[month], "balance": remaining})
+    return result
+
+def build_projections(user_id, kinds=("debt", "loan_given"), obligation_id=None, extra=ZERO, lump_sum=ZERO, today=None):
+    """
+    Projections of the user's unpaid debts and loans given, keyed by type.
+    `obligation_id` selects a single obligation instead (with a single kind)
+    """
+    today = today or datetime.now()
+    result = {}
+    for kind in kinds:
+        model, party, _ = OBLIGATIONS[kind]
+        query = (
+            select(model.id, party, model.total_amount, model.remaining_amount, model.payment_date, model.status)
+            .where(model.user_id == user_id)
+            .order_by(model.payment_date, model.id)
+        )
+        if obligation_id is not None:
+            query = query.where(model.id == obligation_id)
+        else:
+            query = query.where(model.status != statusType.paid)
+        rows = db.session.execute(query).all()
+        schedules = _load_schedules(kind, [row[0] for row in rows])
+        projections = [_projection(kind, row, schedules[row[0]], extra, lump_sum, today) for row in rows]
+        remaining = sum((projection["remaining_amount"] for projection in projections), ZERO)
+        result[kind] = {
+            "obligations": projections,
+            "remaining_amount": remaining,
+            "payoff_date": max((p["payoff_date"] for p in projections if p["payoff_date"]), default=None),
+            "months": _monthly(remaining, [p["payments"] for p in projections]),
+        }
+        if extra or lump_sum:
+            result[kind]["what_if_months"] = _monthly(remaining, [p["what_if"]["payments"] for p in projections])
+    return result
@@ -0,0 +1,230 @@
+"""
+Spending analytics of a user over a date window: totals per category and per month,
+running balance at the end of each month, trailing moving averages and top merchants.
+
+All aggregation runs in the database as GROUP BY queries; Python only walks the
+resulting buckets (categories x months). Whole months inside the window are read from
+the monthly TransactionRollup buckets and only the partial months at its edges are
+aggregated from the transaction table, so the cost grows with the number of months
+and categories rather than with the number of transactions. Top merchants are read the
+same way from the monthly MerchantRollup buckets.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import extract, func, select
+from models import db, Account, Category, CategoryType, MerchantRollup, ReportType, Transaction, TransactionRollup
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+# Latest window end: next_month() overflows on dates in December of year 9999
+LATEST_END = datetime(9999, 1, 1)
+
+def month_start(date):
+    return datetime(date.year, date.month, 1)
+
+def next_month(date):
+    return (month_start(date) + timedelta(days=32)).replace(day=1)
+
+def default_window(now=None):
+    """
+    The last 12 calendar months, current one included
+    """
+    end = next_month(now or datetime.now())
+    start = end
+    for _ in range(12):
+        start = month_start(start - timedelta(days=1))
+    return start, end
+
+def month_count(start, end):
+    """
+    Number of calendar months touched by [start, end)
+    """
+    last = end - timedelta(microseconds=1)
+    return (last.year - start.year) * 12 + last.month - start.month + 1
+
+def _full_months(start, end):
+    """
+    Splits [start, end) into the range covered by whole months and the partial edges
+    """
+    first = start if start == month_start(start) else next_month(start)
+    last = month_start(end)
+    if first >= last:
+        return None, [(start, end)]
+    edges = [(low, high) for low, high in ((start, first), (last, end)) if low < high]
+    return (first, last), edges
+
+def _category_month_totals(user_id, start, end):
+    """
+    Returns {(category_id, month start): [total, count]} for the transactions in [start, end)
+    """
+    totals = defaultdict(lambda: [ZERO, 0])
+    full, edges = _full_months(start, end)
+
+    if full is not None:
+        rows = db.session.execute(
+            select(
+                TransactionRollup.category_id,
+                TransactionRollup.bucket,
+                func.sum(TransactionRollup.total),
+                func.sum(TransactionRollup.count),
+            )
+            .where(
+                TransactionRollup.user_id == user_id,
+                TransactionRollup.granularity == ReportType.monthly,
+                TransactionRollup.bucket >= full[0],
+                TransactionRollup.bucket < full[1],
+            )
+            .group_by(TransactionRollup.category_id, TransactionRollup.bucket)
+        )
+        for category_id, bucket, total, count in rows:
+            entry = totals[(category_id, bucket)]
+            entry[0] += Decimal(total or 0)
+            entry[1] += count
+
+    for low, high in edges:
+        year, month = extract('year', Transaction.date), extract('month', Transaction.date)
+        rows = db.session.execute(
+            select(Transaction.category_id, year, month, func.sum(Transaction.amount), func.count())
+            .where(Transaction.user_id == user_id, Transaction.date >= low, Transaction.date < high)
+            .group_by(Transaction.category_id, year, month)
+        )
+        for category_id, year_value, month_value, total, count in rows:
+            entry = totals[(category_id, datetime(int(year_value), int(month_value), 1))]
+            entry[0] += Decimal(total or 0)
+            entry[1] += count
+
+    return totals
+
+def _net(totals, types):
+    """
+    Income minus expense of the aggregated buckets. Categories missing from `types` are skipped
+    """
+    net = ZERO
+    for (category_id, _), (total, _) in totals.items():
+        category_type = types.get(category_id)
+        if category_type is not None:
+            net += -total if category_type == CategoryType.expense else total
+    return net
+
+def _top_merchants(user_id, start, end, limit, expense_category_ids):
+    """
+    Expense descriptions with the largest total in [start, end): whole months come from
+    the MerchantRollup buckets and the partial edges from the transaction table
+    """
+    merchants = defaultdict(lambda: [ZERO, 0])
+    full, edges = _full_months(start, end)
+
+    queries = [
+        select(Transaction.description, func.sum(Transaction.amount), func.count())
+        .where(
+            Transaction.user_id == user_id,
+            Transaction.date >= low,
+            Transaction.date < high,
+            Transaction.description.is_not(None),
+            Transaction.category_id.in_(expense_category_ids),
+        )
+        .group_by(Transaction.description)
+        for low, high in edges
+    ]
+    if full is not None:
+        queries.append(
+            select(MerchantRollup.description, func.sum(MerchantRollup.total), func.sum(MerchantRollup.count))
+            .where(
+                MerchantRollup.user_id == user_id,
+                MerchantRollup.bucket >= full[0],
+                MerchantRollup.bucket < full[1],
+                MerchantRollup.category_id.in_(expense_category_ids),
+            )
+            .group_by(MerchantRollup.description)
+        )
+
+    for query in queries:
+        for description, total, count in db.session.execute(query):
+            if not description:
+                continue
+            merchant = merchants[description]
+            merchant[0] += Decimal(total or 0)
+            merchant[1] += count
+
+    top = sorted(merchants.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+    return [{"description": description, "total": total, "count": count} for description, (total, count) in top]
+
+def build_analytics(user_id, start, end, top=10, window=3):
+    """
+    Aggregates the user's transactions between start (inclusive) and end (exclusive).
+    `window` is the number of months of the trailing moving averages
+    """
+    categories = {
+        category_id: (name, category_type)
+        for category_id, name, category_type in db.session.execute(
+            select(Category.id, Category.name, Category.type).where(Category.user_id == user_id)
+        )
+    }
+    types = {category_id: category_type for category_id, (_, category_type) in categories.items()}
+    totals = _category_month_totals(user_id, start, end)
+
+    months = []
+    month = month_start(start)
+    while month < end:
+        months.append(month)
+        month = next_month(month)
+
+    by_month = {month: {CategoryType.income: ZERO, CategoryType.expense: ZERO, "count": 0} for month in months}
+    by_category = defaultdict(lambda: [ZERO, 0])
+    for (category_id, month), (total, count) in totals.items():
+        # A transaction filed under another user's category has no type here
+        category_type = types.get(category_id)
+        if category_type is None:
+            continue
+        by_month[month][category_type] += total
+        by_month[month]["count"] += count
+        by_category[category_id][0] += total
+        by_category[category_id][1] += count
+
+    current_balance = db.session.execute(
+        select(func.coalesce(func.sum(Account.balance), 0)).where(Account.user_id == user_id)
+    ).scalar_one()
+    # Balance before the window: today's balance minus everything dated from its start on
+    after = _category_month_totals(user_id, end, datetime.max.replace(microsecond=0))
+    balance = Decimal(current_balance) - _net(totals, types) - _net(after, types)
+    opening_balance = balance
+
+    monthly = []
+    for index, month in enumerate(months):
+        values = by_month[month]
+        income, expense = values[CategoryType.income], values[CategoryType.expense]
+        balance += income - expense
+        trailing = [by_month[previous] for previous in months[max(0, index - window + 1):index + 1]]
+        monthly.append({
+            "month": month.strftime("%Y-%m"),
+            "income": income,
+            "expense": expense,
+            "net": income - expense,
+            "transaction_count": values["count"],
+            "balance": balance,
+            "income_moving_average": (sum(m[CategoryType.income] for m in trailing) / len(trailing)).quantize(CENT),
+            "expense_moving_average": (sum(m[CategoryType.expense] for m in trailing) / len(trailing)).quantize(CENT),
+        })
+
+    income = sum((m["income"] for m in monthly), ZERO)
+    expense = sum((m["expense"] for m in monthly), ZERO)
+    return {
+        "start": start,
+        "end": end,
+        "income": income,
+        "expense": expense,
+        "net": income - expense,
+        "transaction_count": sum(m["transaction_count"] for m in monthly),
+        "opening_balance": opening_balance,
+        "closing_balance": balance,
+        "categories": [
+            {"id": category_id, "name": categories[category_id][0], "type": categories[category_id][1], "total": total, "count": count}
+            for category_id, (total, count) in sorted(by_category.items(), key=lambda item: item[1][0], reverse=True)
+        ],
+        "months": monthly,
+        "top_merchants": _top_merchants(
+            user_id, start, end, top,
+            [category_id for category_id, category_type in types.items() if category_type == CategoryType.expense],
+        ),
+    }
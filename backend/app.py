@@ -1,79 +1,199 @@
 """
-This module takes care of starting the API Server, Loading the DB and Adding the endpoints
+This module takes care of starting the API Server, Loading the DB and Adding the endpoints.
+
+create_app() builds the application: importing this module only imports Flask, and the
+extensions, models and blueprints are loaded by the factory. Startup work that only some
+processes need is skipped in the others:
+    - Flask-Admin (and its templates) is mounted only with ENABLE_ADMIN=1
+    - Flask-Migrate, which imports alembic, is set up only when the app is loaded by the
+      `flask` command (flask db upgrade, ...)
+`python -X importtime` profiles of the startup are compared with benchmarks/startup.py.
 """
 import os
-from flask import Flask, request, jsonify, url_for, send_from_directory
-from flask_migrate import Migrate
-from flask_cors import CORS
-from flask_jwt_extended import JWTManager
+import click
+from flask import Flask, jsonify, send_from_directory
 from dotenv import load_dotenv
-from database import db
-from models import *
-from admin import setup_admin
-from routes.auth import auth_bp
-from routes.users import users_bp
-
-# Load environment variables
-load_dotenv()
-
-# from models import Person
 
-ENV = "development" if os.getenv("FLASK_DEBUG") == "1" else "production"
 static_file_dir = os.path.join(os.path.dirname(
     os.path.realpath(__file__)), '../dist/')
-app = Flask(__name__)
-app.url_map.strict_slashes = False
-
-# database condiguration
-db_url = os.getenv("DATABASE_URL")
-if db_url is not None:
-    app.config['SQLALCHEMY_DATABASE_URI'] = db_url.replace(
-        "postgres://", "postgresql://")
-else:
-    app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite:///database.db"
-
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# JWT Configuration
-app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'super-secret-key')
-jwt = JWTManager(app)
-
-MIGRATE = Migrate(app, db, compare_type=True)
-db.init_app(app)
-
-# Enable CORS
-CORS(app)
-
-# Setup admin
-setup_admin(app)
-
-# Register Blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(users_bp, url_prefix='/api/users')
-
-# Basic route for testing
-@app.route('/api/health')
-def health():
-    return jsonify({"status": "ok", "message": "Backend is running"})
-
-# generate sitemap with all your endpoints
-@app.route('/')
-def sitemap():
-    if ENV == "development":
-        return jsonify({"message": "Flask API is running in development mode"})
-    return send_from_directory(static_file_dir, 'index.html')
-
-# any other endpoint will try to serve it like a static file
-@app.route('/<path:path>', methods=['GET'])
-def serve_any_other_file(path):
-    if not os.path.isfile(os.path.join(static_file_dir, path)):
-        path = 'index.html'
-    response = send_from_directory(static_file_dir, path)
-    response.cache_control.max_age = 0  # avoid cache memory
-    return response
+
+def create_app(config=None):
+    """
+    Builds the app from the environment; `config` overrides any of the resulting settings
+    """
+    # Load environment variables
+    load_dotenv()
+
+    from flask_cors import CORS
+    from flask_jwt_extended import JWTManager
+    from database import db
+    import ledger  # registers the Transaction listeners that keep balances and rollups in sync
+    from commands import setup_commands
+    from compression import setup_compression
+    from engine import engine_options, pool_status, setup_engine
+    from http_cache import setup_http_cache
+    from identity import setup_identity
+    from instrumentation import setup_instrumentation
+    from passwords import setup_passwords
+    from routing import replica_binds, setup_routing
+    from serialization import OrjsonProvider, setup_sparse_fields
+    from static_files import INDEX, StaticManifest
+    from utils import admin_required
+
+    ENV = "development" if os.getenv("FLASK_DEBUG") == "1" else "production"
+    app = Flask(__name__)
+    app.url_map.strict_slashes = False
+    app.config['STATIC_DIR'] = static_file_dir
+    # orjson encodes Decimal, datetime and enum values of the serialized models natively
+    app.json = OrjsonProvider(app)
+
+    # database condiguration
+    db_url = os.getenv("DATABASE_URL")
+    if db_url is not None:
+        app.config['SQLALCHEMY_DATABASE_URI'] = db_url.replace(
+            "postgres://", "postgresql://")
+    else:
+        app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite:///database.db"
+
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Pool sizing, connection health checks and SQLite WAL/busy_timeout (see engine.py)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    # Read replicas (optional): GET requests read from them, writes stay on the primary (see routing.py)
+    app.config['SQLALCHEMY_BINDS'] = replica_binds(os.getenv('DATABASE_REPLICA_URLS', ''), engine_options)
+
+    # SQL instrumentation (opt-in): Server-Timing headers and slow request logging
+    app.config['SQL_INSTRUMENTATION'] = os.getenv('SQL_INSTRUMENTATION') == '1'
+    app.config['SLOW_REQUEST_MS'] = float(os.getenv('SLOW_REQUEST_MS', 500))
+    app.config['SLOW_QUERY_MS'] = float(os.getenv('SLOW_QUERY_MS', 100))
+    app.config['SLOW_REQUEST_QUERIES'] = int(os.getenv('SLOW_REQUEST_QUERIES', 50))
+    app.config['SLOWEST_STATEMENTS'] = int(os.getenv('SLOWEST_STATEMENTS', 3))
+
+    # JWT Configuration
+    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'super-secret-key')
+    app.config['JWT_USER_CACHE_SIZE'] = int(os.getenv('JWT_USER_CACHE_SIZE', 10000))
+    app.config['JWT_USER_CACHE_TTL'] = float(os.getenv('JWT_USER_CACHE_TTL', 60))
+
+    # Password hashing: Werkzeug method and cost, verified on a bounded process pool
+    app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    app.config['PASSWORD_HASH_WORKERS'] = os.getenv('PASSWORD_HASH_WORKERS')
+    app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 0)) or None
+    app.config['PASSWORD_HASH_QUEUE_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 1))
+
+    # Rendered JSON bodies of the ETag-validated read endpoints (see http_cache.py)
+    app.config['RESPONSE_CACHE_SIZE'] = int(os.getenv('RESPONSE_CACHE_SIZE', 10000))
+    app.config['RESPONSE_CACHE_TTL'] = float(os.getenv('RESPONSE_CACHE_TTL', 300))
+
+    # Longest window of GET /api/analytics, in calendar months
+    app.config['ANALYTICS_MAX_MONTHS'] = int(os.getenv('ANALYTICS_MAX_MONTHS', 120))
+
+    # Negotiated brotli/gzip compression of text responses (see compression.py)
+    app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    app.config['COMPRESS_GZIP_LEVEL'] = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    app.config['COMPRESS_BROTLI_QUALITY'] = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+
+    # Built frontend served from a manifest of dist/ read once at startup (see static_files.py)
+    app.config['STATIC_MANIFEST'] = os.getenv('STATIC_MANIFEST', '0' if ENV == 'development' else '1') == '1'
+    app.config['STATIC_MAX_AGE'] = int(os.getenv('STATIC_MAX_AGE', 3600))
+    app.config['STATIC_MEMORY_LIMIT'] = int(os.getenv('STATIC_MEMORY_LIMIT', 1024 * 1024))
+
+    # Connection pool metrics at /api/health/pool (opt-in, admin token required)
+    app.config['POOL_METRICS'] = os.getenv('POOL_METRICS') == '1'
+
+    # Flask-Admin panel at /admin (opt-in)
+    app.config['ENABLE_ADMIN'] = os.getenv('ENABLE_ADMIN') == '1'
+
+    if config:
+        app.config.update(config)
+
+    jwt = JWTManager(app)
+    setup_identity(jwt, app)
+    setup_passwords(app)
+    setup_http_cache(app)
+
+    db.init_app(app)
+    setup_engine(app, db)
+    setup_routing(app, db)
+    if click.get_current_context(silent=True) is not None:
+        # Loaded by the `flask` command: the db command group needs Flask-Migrate
+        from flask_migrate import Migrate
+        Migrate(app, db, compare_type=True)
+
+    # Enable CORS
+    CORS(app, expose_headers=['Server-Timing', 'ETag'])
+
+    # Per-request SQL instrumentation
+    setup_instrumentation(app)
+
+    # ?fields=id,amount,date limits the serialized columns (see serialization.py)
+    setup_sparse_fields(app)
+
+    setup_compression(app)
+
+    # Setup admin
+    if app.config['ENABLE_ADMIN']:
+        from admin import setup_admin
+        setup_admin(app)
+
+    # Register CLI commands
+    setup_commands(app)
+
+    # Register Blueprints
+    from routes.auth import auth_bp
+    from routes.users import users_bp
+    from routes.transactions import transactions_bp
+    from routes.reports import reports_bp
+    from routes.analytics import analytics_bp
+    from routes.projections import projections_bp
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(users_bp, url_prefix='/api/users')
+    app.register_blueprint(transactions_bp, url_prefix='/api/transactions')
+    app.register_blueprint(reports_bp, url_prefix='/api/reports')
+    app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+    app.register_blueprint(projections_bp, url_prefix='/api/projections')
+
+    static_dir = app.config['STATIC_DIR']
+    static_manifest = StaticManifest(
+        static_dir, max_age=app.config['STATIC_MAX_AGE'], memory_limit=app.config['STATIC_MEMORY_LIMIT'],
+        compress_min_size=app.config['COMPRESS_MIN_SIZE'], gzip_level=app.config['COMPRESS_GZIP_LEVEL'],
+        brotli_quality=app.config['COMPRESS_BROTLI_QUALITY'],
+    ) if app.config['STATIC_MANIFEST'] else None
+
+    # Basic route for testing
+    @app.route('/api/health')
+    def health():
+        return jsonify({"status": "ok", "message": "Backend is running"})
+
+    # Connection pool metrics for monitoring: pool sizes and bind names are not public
+    if app.config['POOL_METRICS']:
+        @app.route('/api/health/pool')
+        @admin_required
+        def health_pool():
+            return jsonify(pool_status(db))
+
+    # generate sitemap with all your endpoints
+    @app.route('/')
+    def sitemap():
+        if ENV == "development":
+            return jsonify({"message": "Flask API is running in development mode"})
+        if static_manifest is not None:
+            return static_manifest.response(INDEX, app.response_class)
+        return send_from_directory(static_dir, 'index.html')
+
+    # any other endpoint will try to serve it like a static file
+    @app.route('/<path:path>', methods=['GET'])
+    def serve_any_other_file(path):
+        if static_manifest is not None:
+            return static_manifest.response(path, app.response_class)
+        if not os.path.isfile(os.path.join(static_dir, path)):
+            path = 'index.html'
+        response = send_from_directory(static_dir, path)
+        response.cache_control.max_age = 0  # avoid cache memory
+        return response
+
+    return app
 
 
 # this only runs if `$ python src/main.py` is executed
 if __name__ == '__main__':
     PORT = int(os.environ.get('PORT', 5000))
-    app.run(host='127.0.0.1', port=PORT, debug=False)
\ No newline at end of file
+    create_app().run(host='127.0.0.1', port=PORT, debug=False)
@@ -0,0 +1,178 @@
+"""
+Benchmark of the API hot paths against seeded local SQLite databases.
+
+For each scale (number of seeded users) a fresh database is created and filled with
+seed.DatasetGenerator, then every case is run through the Flask test client (no network)
+and its latency, throughput, status codes and SQL queries per request are recorded.
+Results are written as JSON so two runs can be compared:
+
+    $ python benchmarks/run.py --scales 10,100 --output before.json
+    $ python benchmarks/run.py --scales 10,100 --output after.json --compare before.json
+
+Each scale runs in its own process because create_app() reads DATABASE_URL and the models
+and caches are module level.
+"""
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "Test1234"
+
+def run_scale(scale, iterations, months, transactions_per_month):
+    """
+    Seeds a database with `scale` users and measures every case. Runs in a child process
+    """
+    database = os.path.join(tempfile.mkdtemp(prefix="finzen-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    sys.path.insert(0, BACKEND_DIR)
+
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event, select
+    from app import create_app
+    from models import db, User
+    from seed import DatasetGenerator
+    from utils import hash_password
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        DatasetGenerator(
+            scale, months=months, transactions_per_month=transactions_per_month,
+            password_hash=hash_password(PASSWORD),
+        ).run()
+        seed_seconds = time.perf_counter() - start
+        user_id, email = db.session.execute(select(User.id, User.email).order_by(User.id)).first()
+        headers = {"Authorization": "Bearer " + create_access_token(identity=str(user_id))}
+
+        queries = [0]
+        event.listen(db.engine, "before_cursor_execute", lambda *args: queries.__setitem__(0, queries[0] + 1))
+
+    client = app.test_client()
+    counter = iter(range(10 ** 9))
+
+    def serialize_large():
+        with app.app_context():
+            db.session.get(User, user_id).serialize(large=True)
+        return 200
+
+    cases = {
+        "POST /api/auth/login": lambda: client.post("/api/auth/login", json={"email": email, "password": PASSWORD}).status_code,
+        "POST /api/auth/register": lambda: client.post("/api/auth/register", json={
+            "email": f"bench{next(counter)}@bench.com", "password": PASSWORD, "full_name": "Bench User",
+        }).status_code,
+        "GET /api/users": lambda: client.get("/api/users/", headers=headers).status_code,
+        "GET /api/users/<id>": lambda: client.get(f"/api/users/{user_id}", headers=headers).status_code,
+        "GET /api/analytics": lambda: client.get("/api/analytics/", headers=headers).status_code,
+        "User.serialize(large=True)": serialize_large,
+    }
+
+    results = {}
+    for name, case in cases.items():
+        for _ in range(min(3, iterations)):
+            case()
+
+        latencies, statuses = [], {}
+        queries[0] = 0
+        started = time.perf_counter()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            status = case()
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        results[name] = {
+            "iterations": iterations,
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "p50_ms": round(latencies[len(latencies) // 2], 3),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+            "max_ms": round(latencies[-1], 3),
+            "throughput_rps": round(iterations / elapsed, 1),
+            "queries_per_request": round(queries[0] / iterations, 2),
+            "status_codes": statuses,
+        }
+
+    return {"users": scale, "seed_seconds": round(seed_seconds, 2), "cases": results}
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, previous):
+    """
+    Prints the change in p50 latency and queries per request against a previous result file
+    """
+    before = {scale["users"]: scale["cases"] for scale in previous["scales"]}
+    for scale in current["scales"]:
+        for name, result in scale["cases"].items():
+            old = before.get(scale["users"], {}).get(name)
+            if not old:
+                continue
+            change = (result["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0
+            print(f"{scale['users']:>7} users  {name:<28} p50 {old['p50_ms']:>9.2f} -> {result['p50_ms']:>9.2f} ms ({change:+.1f}%)"
+                  f"  queries {old['queries_per_request']} -> {result['queries_per_request']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="10,100,1000", help="Comma separated numbers of seeded users")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--months", type=int, default=6)
+    parser.add_argument("--transactions-per-month", type=int, default=30)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", default=None, help="Previous result file to compare against")
+    parser.add_argument("--scale", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scale is not None:
+        json.dump(run_scale(args.scale, args.iterations, args.months, args.transactions_per_month), sys.stdout)
+        return
+
+    scales = []
+    for scale in (int(value) for value in args.scales.split(",")):
+        print(f"Running scale {scale} users...", file=sys.stderr)
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--scale", str(scale), "--iterations", str(args.iterations),
+             "--months", str(args.months), "--transactions-per-month", str(args.transactions_per_month)],
+            capture_output=True, text=True,
+        )
+        if child.returncode != 0:
+            sys.exit(child.stderr)
+        scales.append(json.loads(child.stdout))
+
+    result = {
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"iterations": args.iterations, "months": args.months, "transactions_per_month": args.transactions_per_month},
+        "scales": scales,
+    }
+    with open(args.output, "w") as output:
+        json.dump(result, output, indent=2)
+
+    for scale in scales:
+        for name, case in scale["cases"].items():
+            print(f"{scale['users']:>7} users  {name:<28} p50 {case['p50_ms']:>9.2f} ms  p95 {case['p95_ms']:>9.2f} ms"
+                  f"  {case['throughput_rps']:>8.1f} req/s  {case['queries_per_request']:>6} queries  {case['status_codes']}")
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as previous:
+            compare(result, json.load(previous))
+
+if __name__ == "__main__":
+    main()
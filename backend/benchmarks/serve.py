@@ -0,0 +1,191 @@
+"""
+Throughput of the production serving profile (gunicorn.conf.py) as the number of workers grows.
+
+A SQLite database is seeded once, then for each worker count gunicorn is started on a free
+port and every case is hammered over HTTP by `--concurrency` client threads, each on its own
+keep-alive connection, for `--duration` seconds. Requests per second and p50/p95 latency are
+written as JSON:
+
+    $ python benchmarks/serve.py --workers 1,2,4,8 --output serve_results.json
+
+Run it on the machine (or container CPU quota) being sized: throughput should scale with the
+number of workers until it reaches the number of cores.
+"""
+import argparse
+from datetime import datetime, timezone
+import http.client
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from run import PASSWORD, git_revision
+
+def seed(database, users, months, transactions_per_month):
+    """
+    Seeds the database in a child process and returns (user id, email, token) for the first user
+    """
+    script = (
+        "import json\n"
+        "from flask_jwt_extended import create_access_token\n"
+        "from sqlalchemy import select\n"
+        "from app import create_app\n"
+        "from models import db, User\n"
+        "from seed import DatasetGenerator\n"
+        "from utils import hash_password\n"
+        "app = create_app()\n"
+        "with app.app_context():\n"
+        "    db.create_all()\n"
+        f"    DatasetGenerator({users}, months={months}, transactions_per_month={transactions_per_month},\n"
+        f"                     password_hash=hash_password({PASSWORD!r})).run()\n"
+        "    user_id, email = db.session.execute(select(User.id, User.email).order_by(User.id)).first()\n"
+        "    print(json.dumps([user_id, email, create_access_token(identity=str(user_id))]))\n"
+    )
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}", PASSWORD_HASH_WORKERS="0")
+    child = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if child.returncode != 0:
+        sys.exit(child.stderr)
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_until_ready(port, server, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit(server.stderr.read().decode())
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/api/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    sys.exit("gunicorn did not start in time")
+
+def load(port, method, path, body, headers, concurrency, duration):
+    """
+    Sends requests from `concurrency` threads for `duration` seconds and returns the latencies
+    """
+    latencies, statuses, lock = [], {}, threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        own, codes = [], {}
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = str(response.status)
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                status = "error"
+            own.append((time.perf_counter() - start) * 1000)
+            codes[status] = codes.get(status, 0) + 1
+        with lock:
+            latencies.extend(own)
+            for status, count in codes.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    return latencies, statuses
+
+def run_workers(workers, threads, database, cases, concurrency, duration):
+    port = free_port()
+    env = dict(
+        os.environ, DATABASE_URL=f"sqlite:///{database}", PORT=str(port),
+        WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(threads), GUNICORN_LOG_LEVEL="warning", GUNICORN_ACCESSLOG="",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "wsgi:app", "--bind", f"127.0.0.1:{port}"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        wait_until_ready(port, server)
+        results = {}
+        for name, (method, path, body, headers) in cases.items():
+            load(port, method, path, body, headers, concurrency, min(1.0, duration))
+            latencies, statuses = load(port, method, path, body, headers, concurrency, duration)
+            latencies.sort()
+            results[name] = {
+                "requests": len(latencies),
+                "throughput_rps": round(len(latencies) / duration, 1),
+                "p50_ms": round(latencies[len(latencies) // 2], 3) if latencies else None,
+                "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3) if latencies else None,
+                "status_codes": statuses,
+            }
+        return {"workers": workers, "threads": threads, "cases": results}
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="Comma separated gunicorn worker counts")
+    parser.add_argument("--threads", type=int, default=2, help="Threads per worker")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client connections")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per case")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--months", type=int, default=6)
+    parser.add_argument("--transactions-per-month", type=int, default=30)
+    parser.add_argument("--output", default="serve_results.json")
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(prefix="finzen-serve-"), "bench.db")
+    print(f"Seeding {args.users} users...", file=sys.stderr)
+    user_id, email, token = seed(database, args.users, args.months, args.transactions_per_month)
+    auth = {"Authorization": f"Bearer {token}"}
+    login = json.dumps({"email": email, "password": PASSWORD})
+    cases = {
+        "GET /api/health": ("GET", "/api/health", None, {}),
+        "GET /api/users/<id>": ("GET", f"/api/users/{user_id}", None, auth),
+        "GET /api/transactions": ("GET", "/api/transactions/?limit=50", None, auth),
+        "POST /api/auth/login": ("POST", "/api/auth/login", login, {"Content-Type": "application/json"}),
+    }
+
+    runs = []
+    for workers in (int(value) for value in args.workers.split(",")):
+        print(f"Running {workers} workers...", file=sys.stderr)
+        runs.append(run_workers(workers, args.threads, database, cases, args.concurrency, args.duration))
+
+    result = {
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {
+            "threads": args.threads, "concurrency": args.concurrency, "duration": args.duration,
+            "users": args.users, "months": args.months, "transactions_per_month": args.transactions_per_month,
+        },
+        "runs": runs,
+    }
+    with open(args.output, "w") as output:
+        json.dump(result, output, indent=2)
+
+    for run in runs:
+        for name, case in run["cases"].items():
+            print(f"{run['workers']:>3} workers  {name:<24} {case['throughput_rps']:>9.1f} req/s"
+                  f"  p50 {case['p50_ms']} ms  p95 {case['p95_ms']} ms  {case['status_codes']}")
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Startup cost of the app: importing app.py and running create_app() in a fresh interpreter,
+which a gunicorn master (or every worker, without preload) pays on each boot and an
+autoscaled container pays on each cold start.
+
+Every variant is started `--runs` times in a child process and the median wall time is
+recorded; one more run under `python -X importtime` lists the modules with the largest
+cumulative import time. Results are written as JSON:
+
+    $ python benchmarks/startup.py --runs 7 --output startup_results.json
+
+Variants: "api" (the default serving profile) and "admin" (ENABLE_ADMIN=1).
+"""
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from run import BACKEND_DIR, git_revision
+
+VARIANTS = {
+    "api": {},
+    "admin": {"ENABLE_ADMIN": "1"},
+}
+
+SCRIPT = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "from app import create_app\n"
+    "create_app()\n"
+    "print(round((time.perf_counter() - start) * 1000, 1))\n"
+)
+
+def start(env, importtime=False):
+    """
+    Runs the startup script once and returns (milliseconds, stderr)
+    """
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", SCRIPT]
+    child = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if child.returncode != 0:
+        sys.exit(child.stderr)
+    return float(child.stdout.strip().splitlines()[-1]), child.stderr
+
+def top_imports(importtime_output, count):
+    """
+    The top level imports (those made by the script itself) and the slowest packages anywhere
+    in the import tree, by cumulative microseconds
+    """
+    modules = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(cumulative), depth))
+    slowest = sorted(modules, key=lambda module: module[1], reverse=True)
+    return [
+        {"module": name, "cumulative_ms": round(cumulative / 1000, 1), "depth": depth}
+        for name, cumulative, depth in slowest[:count]
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7, help="Starts per variant")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to record")
+    parser.add_argument("--output", default="startup_results.json")
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(prefix="finzen-startup-"), "startup.db")
+    variants = {}
+    for name, overrides in VARIANTS.items():
+        print(f"Starting {name} {args.runs} times...", file=sys.stderr)
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}", **overrides)
+        env.pop("FLASK_DEBUG", None)
+        timings = [start(env)[0] for _ in range(args.runs)]
+        variants[name] = {
+            "env": overrides,
+            "median_ms": statistics.median(timings),
+            "min_ms": min(timings),
+            "max_ms": max(timings),
+            "slowest_imports": top_imports(start(env, importtime=True)[1], args.top),
+        }
+
+    result = {
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "variants": variants,
+    }
+    with open(args.output, "w") as output:
+        json.dump(result, output, indent=2)
+
+    for name, variant in variants.items():
+        print(f"{name:<6} median {variant['median_ms']} ms  (min {variant['min_ms']}, max {variant['max_ms']})")
+        for module in variant["slowest_imports"][:5]:
+            print(f"         {module['module']:<32} {module['cumulative_ms']:>8} ms")
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,17 @@
+from decimal import Decimal
+import logging
+import time
 import click
-from models import db, User
+from sqlalchemy import bindparam, case, delete, func, select, update
+from importer import PARSERS, TransactionImporter
+from ledger import apply_merchant_deltas, apply_rollup_deltas, merchant_deltas, rollup_deltas
+from models import db, Account, Category, CategoryType, MerchantRollup, Transaction, TransactionRollup, User
+from overdue import sweep_overdue
+from reminders import ReminderDispatcher, make_sink
+from scheduler import SubscriptionScheduler
+from seed import DatasetGenerator
+from static_files import precompress
+from utils import hash_password
 
 """
 In this file, you can add as many commands as you want using the @app.cli.command decorator
@@ -17,17 +29,235 @@ def setup_commands(app):
     @click.argument("count") # argument of out command
     def insert_test_users(count):
         print("Creating test users")
-        for x in range(1, int(count) + 1):
-            user = User()
-            user.email = "test_user" + str(x) + "@test.com"
-            user.password = "123456"
-            user.is_active = True
-            db.session.add(user)
-            db.session.commit()
-            print("User: ", user.email, " created.")
+        generator = DatasetGenerator(int(count), months=0, password_hash=hash_password("Test1234"))
+        created = generator.run()
+        print("All", created["users"], "test users created, password: Test1234")
 
-        print("All test users created")
+    """
+    Grants (or with --revoke removes) the admin permission required by the admin routes,
+    such as /api/health/pool: $ flask set-admin ana@example.com
+    """
+    @app.cli.command("set-admin")
+    @click.argument("email")
+    @click.option("--revoke", is_flag=True, help="Remove the permission instead")
+    def set_admin(email, revoke):
+        user = db.session.scalar(select(User).where(User.email == email))
+        if user is None:
+            raise click.ClickException(f"No user with email {email}")
+        user.is_admin = not revoke
+        db.session.commit()
+        click.echo(f"{email} is {'no longer' if revoke else 'now'} an admin")
 
+    """
+    Generates a seeded synthetic dataset for load testing: users with accounts, categories,
+    months of transactions, subscriptions, debts and loans with installments and reminders.
+    Every chunk of users is written in a single database transaction:
+    $ flask insert-test-data --users 1000 --months 12 --transactions-per-month 80
+    """
     @app.cli.command("insert-test-data")
-    def insert_test_data():
-        pass
\ No newline at end of file
+    @click.option("--users", default=100, show_default=True)
+    @click.option("--months", default=12, show_default=True)
+    @click.option("--transactions-per-month", default=60, show_default=True)
+    @click.option("--seed", default=42, show_default=True)
+    @click.option("--chunk-size", default=100, show_default=True, help="Users written per database transaction")
+    def insert_test_data(users, months, transactions_per_month, seed, chunk_size):
+        start = time.perf_counter()
+        generator = DatasetGenerator(
+            users, months=months, transactions_per_month=transactions_per_month, seed=seed,
+            chunk_size=chunk_size, password_hash=hash_password("Test1234"),
+        )
+        created = generator.run(progress=lambda created: print("Users:", created["users"], "transactions:", created["transactions"]))
+        print("Created", created["users"], "users and", created["transactions"], "transactions in", round(time.perf_counter() - start, 1), "s")
+
+    """
+    Rebuilds the TransactionRollup and MerchantRollup aggregates from scratch in a single streamed
+    pass over the transaction table: $ flask rebuild-rollups --chunk-size 10000
+    """
+    @app.cli.command("rebuild-rollups")
+    @click.option("--chunk-size", default=10000, show_default=True)
+    def rebuild_rollups(chunk_size):
+        db.session.execute(delete(TransactionRollup))
+        db.session.execute(delete(MerchantRollup))
+        rows = db.session.execute(
+            select(
+                Transaction.user_id, Transaction.account_id, Transaction.category_id,
+                Transaction.amount, Transaction.date, Transaction.description,
+            )
+            .execution_options(yield_per=chunk_size)
+        ).mappings()
+
+        total = 0
+        for chunk in rows.partitions():
+            apply_rollup_deltas(db.session.connection(), rollup_deltas(chunk))
+            apply_merchant_deltas(db.session.connection(), merchant_deltas(chunk))
+            total += len(chunk)
+            print("Processed", total, "transactions")
+
+        db.session.commit()
+        print("Rollups rebuilt")
+
+    """
+    Recomputes every Account.balance from its transactions (income adds, expense subtracts)
+    in chunks of accounts and reports the ones that drifted: $ flask reconcile-balances --fix
+    Without --fix it only reports. With --fix the accounts of each chunk are locked
+    (SELECT ... FOR UPDATE on PostgreSQL) while they are corrected. Accounts whose ledger
+    sum is negative cannot be stored (positive_balance check): they are reported and left as is
+    """
+    @app.cli.command("reconcile-balances")
+    @click.option("--chunk-size", default=1000, show_default=True)
+    @click.option("--fix", is_flag=True, help="Overwrite drifted balances with the ledger value")
+    def reconcile_balances(chunk_size, fix):
+        signed_amount = case(
+            (Category.type == CategoryType.income, Transaction.amount),
+            else_=-Transaction.amount,
+        )
+        last_id = 0
+        checked = 0
+        drifted = []
+        negative = []
+
+        while True:
+            query = select(Account.id, Account.balance).where(Account.id > last_id).order_by(Account.id).limit(chunk_size)
+            if fix:
+                query = query.with_for_update()
+            accounts = db.session.execute(query).all()
+            if not accounts:
+                break
+
+            account_ids = [account.id for account in accounts]
+            ledger = dict(db.session.execute(
+                select(Transaction.account_id, func.sum(signed_amount))
+                .join(Category, Category.id == Transaction.category_id)
+                .where(Transaction.account_id.in_(account_ids))
+                .group_by(Transaction.account_id)
+            ).all())
+
+            chunk_drift = []
+            for account_id, balance in accounts:
+                expected = Decimal(ledger.get(account_id) or 0).quantize(Decimal("0.01"))
+                if balance == expected:
+                    continue
+                click.echo(f"Account {account_id} balance {balance} ledger {expected} drift {balance - expected}")
+                if expected < 0:
+                    negative.append(account_id)
+                else:
+                    chunk_drift.append({"account_id": account_id, "balance": expected})
+
+            if fix and chunk_drift:
+                table = Account.__table__
+                db.session.execute(
+                    update(table).where(table.c.id == bindparam("account_id")).values(balance=bindparam("balance")),
+                    chunk_drift,
+                )
+            db.session.commit()
+
+            drifted += chunk_drift
+            checked += len(accounts)
+            last_id = account_ids[-1]
+
+        click.echo(f"Checked {checked} accounts, {len(drifted)} drifted" + (", fixed" if fix and drifted else ""))
+        if negative:
+            click.echo(
+                f"{len(negative)} accounts have a negative ledger and were not changed: "
+                + ", ".join(str(account_id) for account_id in negative),
+                err=True,
+            )
+
+    """
+    Imports a CSV or OFX bank export for a user in chunks:
+    $ flask import-transactions 1 export.ofx --account Checking --income-category Salary --expense-category Other
+    """
+    @app.cli.command("import-transactions")
+    @click.argument("user_id", type=int)
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--format", "file_format", type=click.Choice(sorted(PARSERS)), default=None, help="Defaults to the file extension")
+    @click.option("--account", default=None, help="Account used when a row has none")
+    @click.option("--income-category", default=None, help="Category for positive amounts without one")
+    @click.option("--expense-category", default=None, help="Category for negative amounts without one")
+    @click.option("--chunk-size", default=1000, show_default=True)
+    def import_transactions(user_id, path, file_format, account, income_category, expense_category, chunk_size):
+        file_format = file_format or ("ofx" if path.lower().endswith(".ofx") else "csv")
+        importer = TransactionImporter(user_id, account, income_category, expense_category, chunk_size)
+        with open(path, encoding="utf-8-sig", errors="replace", newline="") as stream:
+            result = importer.run(PARSERS[file_format](stream))
+
+        for error in result["errors"]:
+            print("Line", error["line"], ":", error["msg"])
+        print("Imported", result["imported"], "transactions,", result["error_count"], "rows with errors")
+
+    """
+    Charges the due subscriptions (creates their recurring transactions and moves their
+    payment dates forward). Safe to run repeatedly, e.g. every few minutes from cron:
+    $ flask charge-subscriptions
+    or as a long running worker: $ flask charge-subscriptions --loop --interval 300
+    """
+    @app.cli.command("charge-subscriptions")
+    @click.option("--batch-size", default=1000, show_default=True)
+    @click.option("--loop", is_flag=True, help="Keep running, charging every --interval seconds")
+    @click.option("--interval", default=300, show_default=True, help="Seconds between runs with --loop")
+    def charge_subscriptions(batch_size, loop, interval):
+        while True:
+            start = time.perf_counter()
+            result = SubscriptionScheduler(batch_size).run()
+            db.session.remove()
+            for failure in result["failed"]:
+                print("Subscription", failure["id"], "failed:", failure["msg"])
+            print("Charged", result["subscriptions"], "subscriptions,", result["transactions"], "transactions,",
+                  len(result["failed"]), "failed in", round(time.perf_counter() - start, 1), "s")
+            if not loop:
+                break
+            time.sleep(interval)
+
+    """
+    Delivers the due reminders through the REMINDER_SINK sink and marks them as sent. Several
+    workers can run at once, each reminder is leased to one of them: $ flask dispatch-reminders
+    or as a long running worker: $ flask dispatch-reminders --loop --interval 60
+    """
+    @app.cli.command("dispatch-reminders")
+    @click.option("--batch-size", default=500, show_default=True)
+    @click.option("--lease", default=300, show_default=True, help="Seconds a claimed reminder stays reserved to this worker")
+    @click.option("--sink", default=None, help="log or file:<path> (default: REMINDER_SINK or log)")
+    @click.option("--loop", is_flag=True, help="Keep running, dispatching every --interval seconds")
+    @click.option("--interval", default=60, show_default=True, help="Seconds between runs with --loop")
+    def dispatch_reminders(batch_size, lease, sink, loop, interval):
+        sink = make_sink(sink)
+        app.logger.setLevel(logging.INFO)
+        while True:
+            start = time.perf_counter()
+            result = ReminderDispatcher(sink, batch_size=batch_size, lease=lease).run()
+            db.session.remove()
+            print("Sent", result["sent"], "reminders,", result["failed"], "failed in", round(time.perf_counter() - start, 1), "s")
+            if not loop:
+                break
+            time.sleep(interval)
+
+    """
+    Marks the pending debts, loans given and installments whose date has passed as overdue,
+    in chunks of --chunk-size rows per database transaction: $ flask sweep-overdue
+    or as a long running worker: $ flask sweep-overdue --loop --interval 3600
+    """
+    @app.cli.command("sweep-overdue")
+    @click.option("--chunk-size", default=5000, show_default=True)
+    @click.option("--loop", is_flag=True, help="Keep running, sweeping every --interval seconds")
+    @click.option("--interval", default=3600, show_default=True, help="Seconds between runs with --loop")
+    def sweep_overdue_command(chunk_size, loop, interval):
+        while True:
+            start = time.perf_counter()
+            swept = sweep_overdue(chunk_size=chunk_size)
+            db.session.remove()
+            print("Overdue:", ", ".join(f"{table} {count}" for table, count in swept.items()),
+                  "in", round(time.perf_counter() - start, 1), "s")
+            if not loop:
+                break
+            time.sleep(interval)
+
+    """
+    Writes the .br and .gz variants of the built frontend files, served in place of the originals
+    to clients that accept them: $ flask precompress-static (after every frontend build)
+    """
+    @app.cli.command("precompress-static")
+    @click.option("--root", default=None, help="Directory to compress (default: the served dist/)")
+    @click.option("--min-size", default=1024, show_default=True, help="Skip files smaller than this many bytes")
+    def precompress_static(root, min_size):
+        root = root or app.config['STATIC_DIR']
+        print("Wrote", precompress(root, min_size), "compressed files in", root)
@@ -0,0 +1,67 @@
+"""
+Response compression.
+
+compress_response() encodes responses with brotli or gzip, whichever the client's
+Accept-Encoding prefers (brotli wins ties; it is only offered when the optional `brotli`
+package is installed):
+    COMPRESS_MIN_SIZE        bodies smaller than this many bytes are sent as is (default 1024)
+    COMPRESS_GZIP_LEVEL      gzip level, 1-9 (default 6)
+    COMPRESS_BROTLI_QUALITY  brotli quality, 0-11 (default 4, fast enough for dynamic JSON)
+
+Only text types are compressed. Streamed responses and files served with
+direct_passthrough are left alone, as are bodies that already have a Content-Encoding.
+A compressed response's strong ETag becomes weak, since its bytes differ from the
+identity encoding; If-None-Match is compared weakly, so revalidation still returns 304.
+"""
+import gzip
+from flask import request
+try:
+    import brotli
+except ImportError:  # optional, gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml',
+    'image/svg+xml', 'text/css', 'text/csv', 'text/html', 'text/javascript', 'text/plain',
+}
+
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def compress(data, encoding, gzip_level=6, brotli_quality=4):
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+def setup_compression(app):
+    min_size = app.config['COMPRESS_MIN_SIZE']
+    gzip_level = app.config['COMPRESS_GZIP_LEVEL']
+    brotli_quality = app.config['COMPRESS_BROTLI_QUALITY']
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < min_size:
+            return response
+        encoding = request.accept_encodings.best_match(ENCODINGS) if request.accept_encodings else None
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        response.set_data(compress(data, encoding, gzip_level, brotli_quality))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,134 @@
+"""
+SQLAlchemy engine configuration from the environment.
+
+engine_options() builds SQLALCHEMY_ENGINE_OPTIONS for the configured database:
+    DB_POOL_SIZE          connections kept open per process (default 10)
+    DB_MAX_OVERFLOW       extra connections opened under load (default 20)
+    DB_POOL_TIMEOUT       seconds a request waits for a free connection (default 10)
+    DB_POOL_RECYCLE       seconds before a connection is replaced (default 1800)
+    DB_POOL_PRE_PING      test connections on checkout, 1/0 (default 1)
+    DB_CONNECT_TIMEOUT    seconds to open a new connection (default 10)
+    SQLITE_BUSY_TIMEOUT   ms SQLite waits on a locked database instead of failing (default 5000)
+    SQLITE_SYNCHRONOUS    SQLite synchronous pragma (default NORMAL, safe with WAL)
+
+SQLite file databases are switched to WAL on connect, so readers do not block the writer.
+Pools are MeteredQueuePool instances, and pool_status() reports their occupancy and how
+long requests waited for a connection.
+"""
+import os
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+class MeteredQueuePool(QueuePool):
+    """
+    QueuePool that records how long checkouts wait for a connection and how many time out
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics_lock = threading.Lock()
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        with self.metrics_lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_ms = 0.0
+            self.max_wait_ms = 0.0
+
+    def recreate(self):
+        # engine.dispose() replaces the pool; keep counting on the new one
+        pool = super().recreate()
+        pool.checkouts, pool.timeouts = self.checkouts, self.timeouts
+        pool.wait_ms, pool.max_wait_ms = self.wait_ms, self.max_wait_ms
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self.metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self.metrics_lock:
+                self.checkouts += 1
+                self.wait_ms += elapsed
+                self.max_wait_ms = max(self.max_wait_ms, elapsed)
+
+def _is_sqlite_memory(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def engine_options(database_url):
+    url = make_url(database_url)
+    if _is_sqlite_memory(url):
+        # Flask-SQLAlchemy shares a single connection (StaticPool) for in-memory databases
+        return {}
+
+    options = {
+        'poolclass': MeteredQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1',
+    }
+    connect_timeout = int(os.getenv('DB_CONNECT_TIMEOUT', 10))
+    if url.get_backend_name() == 'sqlite':
+        # sqlite3's own lock timeout; the busy_timeout pragma below takes over once connected
+        options['connect_args'] = {'timeout': connect_timeout, 'check_same_thread': False}
+    elif url.get_backend_name() == 'postgresql':
+        options['connect_args'] = {'connect_timeout': connect_timeout}
+    return options
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute(f"PRAGMA synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')}")
+        cursor.execute(f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))}")
+    finally:
+        cursor.close()
+
+def setup_engine(app, db):
+    """
+    Registers the SQLite pragmas on every file-backed SQLite engine of the app
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite' and not _is_sqlite_memory(engine.url):
+                if not event.contains(engine, 'connect', _set_sqlite_pragmas):
+                    event.listen(engine, 'connect', _set_sqlite_pragmas)
+
+def pool_status(db):
+    """
+    Occupancy and checkout wait metrics of every engine pool, keyed by bind name
+    """
+    status = {}
+    for bind, engine in db.engines.items():
+        pool = engine.pool
+        entry = {'pool': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(0, pool.overflow()),
+                max_overflow=pool._max_overflow,
+            )
+        if isinstance(pool, MeteredQueuePool):
+            with pool.metrics_lock:
+                entry.update(
+                    checkouts=pool.checkouts,
+                    timeouts=pool.timeouts,
+                    wait_ms_total=round(pool.wait_ms, 3),
+                    wait_ms_avg=round(pool.wait_ms / pool.checkouts, 3) if pool.checkouts else 0.0,
+                    wait_ms_max=round(pool.max_wait_ms, 3),
+                )
+        status[bind or 'default'] = entry
+    return status
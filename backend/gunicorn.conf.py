@@ -0,0 +1,56 @@
+"""
+Production serving profile for `gunicorn wsgi:app` (loaded automatically from this directory).
+
+Every setting can be overridden through the environment:
+    WEB_CONCURRENCY           worker processes (default 2 * CPUs + 1)
+    GUNICORN_THREADS          threads per worker, > 1 uses the gthread worker (default 2)
+    GUNICORN_PRELOAD          import the app once in the master before forking (default 1)
+    GUNICORN_TIMEOUT          seconds before a silent worker is killed and restarted (default 30)
+    GUNICORN_GRACEFUL_TIMEOUT seconds workers get to finish their requests on reload/stop (default 30)
+    GUNICORN_KEEPALIVE        seconds an idle keep-alive connection is held open (default 5)
+    GUNICORN_MAX_REQUESTS     requests before a worker is recycled, 0 disables it (default 1000)
+    GUNICORN_ACCESSLOG        access log file, empty disables it (default '-', stdout)
+    PASSWORD_HASH_WORKERS     hashing processes per worker (default 0: inline, see passwords.py)
+
+Graceful reload: `kill -HUP <master pid>` replaces the workers once their in-flight requests
+finish. With the app preloaded HUP does not pick up new code; deploy with USR2 (start a new
+master) followed by WINCH/TERM on the old one, or set GUNICORN_PRELOAD=0.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 2))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# Must outlive the idle timeout of the load balancer in front, or it will reuse closed sockets
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+
+# The workers already use every core: a hashing pool per worker would start
+# workers * pool size processes, so passwords are hashed inline unless configured
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+def post_fork(server, worker):
+    """
+    Connections opened by the preloaded app in the master must not be shared between
+    workers: drop them from the inherited pool (without closing the master's sockets)
+    """
+    if not preload_app:
+        return
+    from wsgi import app
+    from database import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,90 @@
+"""
+Conditional GET for the read endpoints.
+
+Each cacheable response gets a strong ETag derived from the versions of the rows it
+renders (User.version is bumped by every UPDATE of the row), read from the database and
+computed before anything is serialized:
+    - a request whose If-None-Match carries the current ETag gets an empty 304
+    - otherwise the rendered JSON body is taken from `_responses`, an in-process
+      TTL/LRU cache keyed by resource and stored with the ETag it was rendered for,
+      or rendered and stored
+
+A cached body is only reused while its ETag matches the current one, so entries of other
+workers never serve stale data as long as the versions are read from the rows. The
+current_user of identity.py is a cached snapshot that can lag behind writes made by other
+workers, so its version must not be used (see users.user_response). The after_flush
+listener below drops the entries of the users written in this process to free them early.
+
+conditional_json() covers responses whose ETag cannot be known before rendering: the body
+is rendered and hashed, and a matching If-None-Match still turns it into a 304.
+If-None-Match is compared weakly, so the weak ETags of compressed responses
+(compression.py) also revalidate.
+"""
+import hashlib
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from cache import TTLCache
+from models import User
+from serialization import requested_fields
+
+_responses = TTLCache(maxsize=10000, ttl=300)
+
+def etag_for(*parts):
+    """
+    Strong ETag (unquoted) of the given version parts
+    """
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+def _validated(response, etag):
+    response.set_etag(etag)
+    # Browsers keep the body but revalidate it on every poll
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def _json(body, etag, status=200):
+    return _validated(current_app.response_class(body, status=status, mimetype=current_app.json.mimetype), etag)
+
+def cached_json(key, etag, render):
+    """
+    Response for the resource `key` at version `etag`. `render` returns the payload
+    to encode and only runs when neither the client nor the cache has this version
+    """
+    fields = requested_fields()
+    if fields is not None:
+        key, etag = (*key, fields), etag_for(etag, sorted(fields))
+    if request.if_none_match.contains_weak(etag):
+        return _validated(current_app.response_class(status=304), etag)
+
+    cached = _responses.get(key)
+    if cached is not None and cached[0] == etag:
+        return _json(cached[1], etag)
+
+    body = current_app.json.response(render()).get_data()
+    _responses.set(key, (etag, body))
+    return _json(body, etag)
+
+def conditional_json(payload, status=200):
+    """
+    Renders the payload and answers 304 if the client already has the same body
+    """
+    body = current_app.json.response(payload).get_data()
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        return _validated(current_app.response_class(status=304), etag)
+    return _json(body, etag, status)
+
+def forget_responses(predicate):
+    _responses.delete_where(predicate)
+
+@event.listens_for(Session, 'after_flush')
+def _forget_written_users(session, flush_context):
+    user_ids = {instance.id for instance in (*session.new, *session.dirty, *session.deleted) if isinstance(instance, User)}
+    if user_ids:
+        # Any user write can change a page of the user list
+        forget_responses(lambda key: key[0] == 'users' or (key[0] == 'user' and key[1] in user_ids))
+
+def setup_http_cache(app):
+    _responses.maxsize = app.config['RESPONSE_CACHE_SIZE']
+    _responses.ttl = app.config['RESPONSE_CACHE_TTL']
@@ -0,0 +1,56 @@
+"""
+JWT identity handling. Tokens carry the user id as a string `sub`, and
+`flask_jwt_extended.current_user` is resolved through a bounded TTL/LRU cache of
+detached User snapshots, so authenticated requests that only touch the caller
+skip the SELECT. Routes that modify or delete a user must call forget_user().
+
+The cache is per process: forget_user() only evicts the entry of the worker that served
+the write, and the other workers keep resolving the old snapshot (an updated is_active,
+or a user that no longer exists) for up to JWT_USER_CACHE_TTL seconds. Code that must
+not act on a stale snapshot reads the row instead of using current_user.
+"""
+from flask import jsonify
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from cache import TTLCache
+from models import db, User
+
+_users = TTLCache()
+
+def _snapshot(user):
+    """
+    Detached copy of the user's column values that can be merged into any session without a query
+    """
+    copy = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+def forget_user(user_id):
+    """
+    Evicts the user from this process' cache only; other workers drop it when the TTL expires
+    """
+    _users.delete(int(user_id))
+
+def setup_identity(jwt, app):
+    _users.maxsize = app.config['JWT_USER_CACHE_SIZE']
+    _users.ttl = app.config['JWT_USER_CACHE_TTL']
+
+    @jwt.user_identity_loader
+    def user_identity(user):
+        return str(user.id if isinstance(user, User) else user)
+
+    @jwt.user_lookup_loader
+    def user_lookup(jwt_header, jwt_data):
+        user_id = int(jwt_data[app.config['JWT_IDENTITY_CLAIM']])
+        cached = _users.get(user_id)
+        if cached is not None:
+            return db.session.merge(cached, load=False)
+
+        user = db.session.get(User, user_id)
+        if user is not None:
+            _users.set(user_id, _snapshot(user))
+        return user
+
+    @jwt.user_lookup_error_loader
+    def user_lookup_error(jwt_header, jwt_data):
+        return jsonify({"msg": "User not found"}), 404
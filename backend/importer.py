@@ -0,0 +1,214 @@
+"""
+Streaming import of bank exports (CSV or OFX) into the transaction table.
+
+Rows are parsed lazily from the file, validated and resolved against in-memory lookups
+of the user's accounts and categories, and written in chunks with one executemany
+INSERT each. Balances and rollups are adjusted once per chunk with the bulk helpers of
+ledger.py (the ORM listeners do not fire for these inserts). A chunk that fails on
+insert is retried row by row so only the offending rows are reported.
+
+CSV columns: date, amount, description, account, category. The amount is stored as an
+absolute value; the category type decides whether it is income or expense. When the
+category is empty (always for OFX) the sign of the amount picks the default income or
+expense category.
+"""
+import csv
+import re
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from ledger import (
+    apply_balance_deltas, apply_merchant_deltas, apply_rollup_deltas, balance_deltas, merchant_deltas, rollup_deltas,
+)
+from models import db, Account, Category, Transaction, TransactionType
+from utils import parse_date
+
+MAX_AMOUNT = Decimal("99999999.99")
+MAX_REPORTED_ERRORS = 1000
+OFX_FIELD = re.compile(r"<(DTPOSTED|TRNAMT|NAME|MEMO)>([^<\r\n]*)", re.IGNORECASE)
+OFX_DATE = re.compile(r"(\d{8})(\d{6})?(?:\.\d+)?(?:\[([+-]?\d+(?:\.\d+)?)(?::[^\]]*)?\])?$")
+
+def parse_csv(stream):
+    """
+    Yields (line number, raw row) for each data row of a CSV file
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+
+def parse_ofx(stream):
+    """
+    Yields (line number, raw row) for each <STMTTRN> block of an OFX file (SGML or XML),
+    reading it line by line
+    """
+    current = None
+    start = 0
+    for line_number, line in enumerate(stream, start=1):
+        upper = line.upper()
+        if "<STMTTRN>" in upper:
+            current, start = {}, line_number
+        if current is not None:
+            for tag, value in OFX_FIELD.findall(line):
+                current[tag.upper()] = value.strip()
+        if "</STMTTRN>" in upper and current is not None:
+            yield start, {
+                "date": current.get("DTPOSTED", ""),
+                "amount": current.get("TRNAMT", ""),
+                "description": current.get("NAME") or current.get("MEMO", ""),
+                "account": "",
+                "category": "",
+            }
+            current = None
+
+PARSERS = {"csv": parse_csv, "ofx": parse_ofx}
+
+def _parse_date(value):
+    """
+    Accepts ISO 8601 dates and OFX dates (YYYYMMDD[HHMMSS[.XXX]][[offset:tz]]). Dates with
+    a time zone or an OFX offset are converted to naive UTC, like the stored ones
+    """
+    ofx = OFX_DATE.match(value)
+    if not ofx:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f"Invalid date: '{value}'")
+        return date
+    try:
+        date = datetime.strptime(ofx.group(1) + (ofx.group(2) or ""), "%Y%m%d%H%M%S" if ofx.group(2) else "%Y%m%d")
+        if ofx.group(3):
+            date -= timedelta(hours=float(ofx.group(3)))
+    except (ValueError, OverflowError):
+        raise ValueError(f"Invalid date: '{value}'")
+    return date
+
+def _integrity_message(error):
+    """
+    Readable reason for an IntegrityError raised while writing a row. SQLSTATE codes on
+    PostgreSQL, the error text elsewhere
+    """
+    code = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+    text = str(error.orig).lower()
+    if code == "23514" or "positive_balance" in text:
+        return "Account balance would go negative"
+    if code == "23503" or "foreign key" in text:
+        return "Unknown account or category"
+    if code == "23505" or "unique" in text:
+        return "Duplicate transaction"
+    return "The transaction could not be saved"
+
+class TransactionImporter:
+    """
+    Imports the rows of one user. Accounts and categories are looked up by name
+    (case-insensitive) from a single query each
+    """
+
+    def __init__(self, user_id, default_account=None, income_category=None, expense_category=None, chunk_size=1000):
+        self.user_id = user_id
+        self.chunk_size = chunk_size
+        self.accounts = {
+            name.lower(): account_id
+            for account_id, name in db.session.execute(
+                select(Account.id, Account.name).where(Account.user_id == user_id)
+            ).all()
+        }
+        self.categories = {
+            name.lower(): (category_id, category_type)
+            for category_id, name, category_type in db.session.execute(
+                select(Category.id, Category.name, Category.type).where(Category.user_id == user_id)
+            ).all()
+        }
+        self.default_account = (default_account or "").lower()
+        self.income_category = (income_category or "").lower()
+        self.expense_category = (expense_category or "").lower()
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+
+    def run(self, rows):
+        """
+        Consumes an iterator of (line number, raw row) and returns the import report
+        """
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            valid = self._validate(chunk)
+            if valid:
+                self._write(valid)
+
+        return {"imported": self.imported, "error_count": self.error_count, "errors": self.errors}
+
+    def _error(self, line, msg):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "msg": msg})
+
+    def _validate(self, chunk):
+        valid = []
+        for line, raw in chunk:
+            try:
+                valid.append((line, self._resolve(raw)))
+            except ValueError as e:
+                self._error(line, str(e))
+        return valid
+
+    def _resolve(self, raw):
+        date = _parse_date(raw.get("date", ""))
+        try:
+            amount = Decimal(raw.get("amount", "").replace(",", "")).quantize(Decimal("0.01"))
+        except InvalidOperation:
+            amount = None
+        if amount is None or not amount.is_finite() or amount == 0 or abs(amount) > MAX_AMOUNT:
+            raise ValueError(f"Invalid amount: '{raw.get('amount')}'")
+
+        account_name = (raw.get("account") or self.default_account).lower()
+        if account_name not in self.accounts:
+            raise ValueError(f"Unknown account: '{account_name}'")
+
+        category_name = (raw.get("category") or (self.expense_category if amount < 0 else self.income_category)).lower()
+        if category_name not in self.categories:
+            raise ValueError(f"Unknown category: '{category_name}'")
+        category_id, category_type = self.categories[category_name]
+
+        return {
+            "user_id": self.user_id,
+            "account_id": self.accounts[account_name],
+            "category_id": category_id,
+            "subscription_id": None,
+            "debt_id": None,
+            "loan_given_id": None,
+            "type": TransactionType.general,
+            "amount": abs(amount),
+            "description": (raw.get("description") or "")[:255] or None,
+            "date": date,
+            "is_recurring": False,
+        }
+
+    def _apply(self, connection, rows):
+        connection.execute(Transaction.__table__.insert(), rows)
+        types = {category_id: category_type for category_id, category_type in self.categories.values()}
+        apply_balance_deltas(connection, balance_deltas(rows, types))
+        apply_rollup_deltas(connection, rollup_deltas(rows))
+        apply_merchant_deltas(connection, merchant_deltas(rows))
+
+    def _write(self, valid):
+        rows = [row for _, row in valid]
+        try:
+            self._apply(db.session.connection(), rows)
+            db.session.commit()
+            self.imported += len(rows)
+            return
+        except IntegrityError:
+            db.session.rollback()
+
+        for line, row in valid:
+            try:
+                with db.session.begin_nested():
+                    self._apply(db.session.connection(), [row])
+                self.imported += 1
+            except IntegrityError as e:
+                self._error(line, _integrity_message(e))
+        db.session.commit()
@@ -0,0 +1,78 @@
+"""
+Opt-in per-request SQL instrumentation.
+
+When SQL_INSTRUMENTATION is enabled, every statement executed during a request is timed
+through the engine's before/after_cursor_execute events. The request gets a Server-Timing
+header with the query count, total DB time and total app time. Requests above the
+configured thresholds are logged along with their slowest statements.
+"""
+import heapq
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute: drop its start time so
+    # the stack of the pooled connection does not grow with every error. Errors raised
+    # before there is a cursor (connect, cursor creation) never pushed one. The cursor is
+    # read from the execution context: SQLAlchemy 2.0 leaves ExceptionContext.cursor unset
+    context = exception_context.execution_context
+    if context is None or getattr(context, 'cursor', None) is None:
+        return
+    stack = exception_context.connection.info.get('query_start_time')
+    if stack:
+        stack.pop()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = (time.perf_counter() - conn.info['query_start_time'].pop()) * 1000
+    if not has_request_context() or 'sql_stats' not in g:
+        return
+
+    stats = g.sql_stats
+    stats['count'] += 1
+    stats['time_ms'] += elapsed
+    entry = (elapsed, stats['count'], statement)
+    if len(stats['slowest']) < stats['keep']:
+        heapq.heappush(stats['slowest'], entry)
+    else:
+        heapq.heappushpop(stats['slowest'], entry)
+
+def setup_instrumentation(app):
+    if not app.config.get('SQL_INSTRUMENTATION'):
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start_time = time.perf_counter()
+        g.sql_stats = {'count': 0, 'time_ms': 0.0, 'slowest': [], 'keep': app.config['SLOWEST_STATEMENTS']}
+
+    @app.after_request
+    def report_request_timing(response):
+        if 'sql_stats' not in g:
+            return response
+
+        stats = g.sql_stats
+        total_ms = (time.perf_counter() - g.request_start_time) * 1000
+        response.headers.add('Server-Timing', f'db;dur={stats["time_ms"]:.2f};desc="{stats["count"]} queries"')
+        response.headers.add('Server-Timing', f'app;dur={total_ms:.2f}')
+
+        slow_statements = [entry for entry in stats['slowest'] if entry[0] >= app.config['SLOW_QUERY_MS']]
+        if (total_ms >= app.config['SLOW_REQUEST_MS']
+                or stats['count'] >= app.config['SLOW_REQUEST_QUERIES']
+                or slow_statements):
+            slowest = sorted(stats['slowest'], reverse=True)
+            app.logger.warning(
+                "Slow request %s %s (%s): %.1f ms, %d queries, %.1f ms in DB. Slowest statements:%s",
+                request.method, request.path, response.status_code, total_ms, stats['count'], stats['time_ms'],
+                ''.join(f"\n  {elapsed:.1f} ms  {' '.join(statement.split())[:500]}" for elapsed, _, statement in slowest),
+            )
+        return response
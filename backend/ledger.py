@@ -0,0 +1,228 @@
+"""
+Side effects of writing Transaction rows: keeps Account.balance and the
+TransactionRollup and MerchantRollup aggregates in sync. The mapper listeners cover
+ORM writes. Bulk writers that bypass the ORM build the deltas with balance_deltas(),
+rollup_deltas() and merchant_deltas(), then apply them with apply_balance_deltas(),
+apply_rollup_deltas() and apply_merchant_deltas().
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import bindparam, event, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, object_session
+from models import Account, Category, CategoryType, MerchantRollup, ReportType, Transaction, TransactionRollup
+
+ROLLUP_GRANULARITIES = (ReportType.weekly, ReportType.monthly)
+ROLLUP_KEY = ('user_id', 'account_id', 'category_id', 'granularity', 'bucket')
+MERCHANT_KEY = ('user_id', 'category_id', 'description', 'bucket')
+
+def _decimal(value):
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+def bucket_start(granularity, date):
+    """
+    Returns the start of the weekly/monthly/yearly bucket that contains `date` (naive)
+    """
+    day = datetime(date.year, date.month, date.day)
+    if granularity == ReportType.weekly:
+        return day - timedelta(days=day.weekday())
+    if granularity == ReportType.monthly:
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+def rollup_deltas(rows, sign=1, deltas=None):
+    """
+    Accumulates the rollup changes caused by adding (sign=1) or removing (sign=-1)
+    the given transaction rows. Each row is a mapping with user_id, account_id,
+    category_id, amount and date. Returns {rollup key: [total delta, count delta]}
+    """
+    if deltas is None:
+        deltas = defaultdict(lambda: [Decimal(0), 0])
+    buckets = {}
+    for row in rows:
+        amount = sign * _decimal(row['amount'])
+        day = row['date'].toordinal()
+        if day not in buckets:
+            buckets[day] = [(granularity, bucket_start(granularity, row['date'])) for granularity in ROLLUP_GRANULARITIES]
+        for granularity, bucket in buckets[day]:
+            delta = deltas[(row['user_id'], row['account_id'], row['category_id'], granularity, bucket)]
+            delta[0] += amount
+            delta[1] += sign
+    return deltas
+
+def merchant_deltas(rows, sign=1, deltas=None):
+    """
+    Same as rollup_deltas() for the monthly per-description aggregates. Rows without
+    a description are skipped. Returns {merchant key: [total delta, count delta]}
+    """
+    if deltas is None:
+        deltas = defaultdict(lambda: [Decimal(0), 0])
+    for row in rows:
+        if not row['description']:
+            continue
+        date = row['date']
+        delta = deltas[(row['user_id'], row['category_id'], row['description'], datetime(date.year, date.month, 1))]
+        delta[0] += sign * _decimal(row['amount'])
+        delta[1] += sign
+    return deltas
+
+def _upsert_deltas(connection, table, key, deltas):
+    """
+    Adds the accumulated deltas to the aggregate table in a single executemany
+    """
+    values = [
+        dict(zip(key, key_values), total=total, count=count)
+        for key_values, (total, count) in deltas.items()
+        if total or count
+    ]
+    if not values:
+        return
+
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(key),
+            set_={
+                'total': table.c.total + statement.excluded.total,
+                'count': table.c.count + statement.excluded.count,
+            },
+        )
+        connection.execute(statement, values)
+        return
+
+    for row in values:
+        result = connection.execute(
+            update(table)
+            .where(*(table.c[column] == row[column] for column in key))
+            .values(total=table.c.total + row['total'], count=table.c.count + row['count'])
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(**row))
+
+def apply_rollup_deltas(connection, deltas):
+    """
+    Upserts the accumulated deltas into the rollup table in a single executemany
+    """
+    _upsert_deltas(connection, TransactionRollup.__table__, ROLLUP_KEY, deltas)
+
+def apply_merchant_deltas(connection, deltas):
+    """
+    Upserts the accumulated deltas into the merchant rollup table in a single executemany
+    """
+    _upsert_deltas(connection, MerchantRollup.__table__, MERCHANT_KEY, deltas)
+
+def category_types(connection, category_ids):
+    """
+    Returns {category_id: CategoryType} for the given categories
+    """
+    rows = connection.execute(select(Category.id, Category.type).where(Category.id.in_(set(category_ids))))
+    return dict(rows.all())
+
+def balance_deltas(rows, types, sign=1, deltas=None):
+    """
+    Accumulates the balance changes caused by adding (sign=1) or removing (sign=-1)
+    the given transaction rows. Income categories add to the account and expense
+    categories subtract from it. `types` maps category_id to its CategoryType.
+    Returns {account_id: delta}
+    """
+    if deltas is None:
+        deltas = defaultdict(Decimal)
+    for row in rows:
+        amount = _decimal(row['amount'])
+        if types[row['category_id']] == CategoryType.expense:
+            amount = -amount
+        deltas[row['account_id']] += sign * amount
+    return deltas
+
+def apply_balance_deltas(connection, deltas):
+    """
+    Applies the deltas as `balance = balance + delta` in the database, so concurrent
+    writers never overwrite each other. Each UPDATE holds the account row lock until
+    the transaction ends. Accounts are updated in id order so two writers cannot deadlock.
+    The positive_balance check still applies and raises IntegrityError on overdraft
+    """
+    values = [
+        {'account_id': account_id, 'delta': delta}
+        for account_id, delta in sorted(deltas.items())
+        if delta
+    ]
+    if not values:
+        return
+
+    table = Account.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.id == bindparam('account_id'))
+        .values(balance=table.c.balance + bindparam('delta')),
+        values,
+    )
+
+def _expire_balances(target, account_ids):
+    """
+    Marks the balance of the affected accounts loaded in the session as stale.
+    The database was updated behind the ORM's back
+    """
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('stale_account_ids', set()).update(account_ids)
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _refresh_stale_balances(session, flush_context):
+    for account_id in session.info.pop('stale_account_ids', ()):
+        account = session.identity_map.get(session.identity_key(Account, account_id))
+        if account is not None:
+            session.expire(account, ['balance'])
+
+def _current_values(target):
+    return {
+        'user_id': target.user_id,
+        'account_id': target.account_id,
+        'category_id': target.category_id,
+        'amount': target.amount,
+        'date': target.date,
+        'description': target.description,
+    }
+
+def _previous_values(target):
+    state = inspect(target)
+    values = {}
+    for key, value in _current_values(target).items():
+        history = state.attrs[key].history
+        values[key] = history.deleted[0] if history.deleted else value
+    return values
+
+def _apply(connection, target, removed=(), added=()):
+    rows = [*removed, *added]
+    types = category_types(connection, [row['category_id'] for row in rows])
+
+    balances = balance_deltas(removed, types, sign=-1)
+    balance_deltas(added, types, deltas=balances)
+    apply_balance_deltas(connection, balances)
+    _expire_balances(target, balances)
+
+    rollups = rollup_deltas(removed, sign=-1)
+    rollup_deltas(added, deltas=rollups)
+    apply_rollup_deltas(connection, rollups)
+
+    merchants = merchant_deltas(removed, sign=-1)
+    merchant_deltas(added, deltas=merchants)
+    apply_merchant_deltas(connection, merchants)
+
+@event.listens_for(Transaction, 'after_insert')
+def _transaction_inserted(mapper, connection, target):
+    _apply(connection, target, added=[_current_values(target)])
+
+@event.listens_for(Transaction, 'after_update')
+def _transaction_updated(mapper, connection, target):
+    previous = _previous_values(target)
+    current = _current_values(target)
+    if previous == current:
+        return
+    _apply(connection, target, removed=[previous], added=[current])
+
+@event.listens_for(Transaction, 'after_delete')
+def _transaction_deleted(mapper, connection, target):
+    _apply(connection, target, removed=[_previous_values(target)])
@@ -0,0 +1,38 @@
+"""The MerchantRollup model was created to hold monthly per-description transaction aggregates for analytics.
+
+Revision ID: 09ba77221798
+Revises: d5f0dfe853f1
+Create Date: 2026-10-17 14:12:05.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '09ba77221798'
+down_revision = 'd5f0dfe853f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('merchant_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('total', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['category.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'category_id', 'description', 'bucket', name='unique_merchant_rollup_bucket')
+    )
+
+    # Existing rows are aggregated with: flask rebuild-rollups
+
+
+def downgrade():
+    op.drop_table('merchant_rollup')
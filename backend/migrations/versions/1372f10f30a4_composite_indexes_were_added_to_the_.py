@@ -0,0 +1,28 @@
+"""Composite indexes were added to the Transaction model for the date range listing.
+
+Revision ID: 1372f10f30a4
+Revises: a829831525ae
+Create Date: 2026-10-17 09:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1372f10f30a4'
+down_revision = 'a829831525ae'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transaction', schema=None) as batch_op:
+        batch_op.create_index('ix_transaction_user_id_date_id', ['user_id', sa.text('date DESC'), sa.text('id DESC')], unique=False)
+        batch_op.create_index('ix_transaction_account_id_date', ['account_id', 'date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transaction', schema=None) as batch_op:
+        batch_op.drop_index('ix_transaction_account_id_date')
+        batch_op.drop_index('ix_transaction_user_id_date_id')
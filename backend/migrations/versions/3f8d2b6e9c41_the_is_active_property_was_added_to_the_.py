@@ -0,0 +1,26 @@
+"""The is_active property was added to the User model.
+
+Revision ID: 3f8d2b6e9c41
+Revises: e5b0d4c8a7f3
+Create Date: 2026-10-18 11:40:52.661730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8d2b6e9c41'
+down_revision = 'e5b0d4c8a7f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_active', sa.Boolean(), server_default=sa.true(), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('is_active')
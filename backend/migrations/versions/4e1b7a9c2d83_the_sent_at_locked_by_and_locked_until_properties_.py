@@ -0,0 +1,35 @@
+"""The sent_at, locked_by and locked_until properties were added to the Reminder model, along with the partial index of unsent reminders used by the dispatcher.
+
+Revision ID: 4e1b7a9c2d83
+Revises: c6db56dff5cc
+Create Date: 2026-10-17 17:12:48.204631
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e1b7a9c2d83'
+down_revision = 'c6db56dff5cc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reminder', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sent_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('locked_by', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('locked_until', sa.DateTime(), nullable=True))
+        batch_op.create_index(
+            'ix_reminder_unsent_reminder_date', ['reminder_date'], unique=False,
+            postgresql_where=sa.text('NOT is_sent'), sqlite_where=sa.text('NOT is_sent'),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('reminder', schema=None) as batch_op:
+        batch_op.drop_index('ix_reminder_unsent_reminder_date')
+        batch_op.drop_column('locked_until')
+        batch_op.drop_column('locked_by')
+        batch_op.drop_column('sent_at')
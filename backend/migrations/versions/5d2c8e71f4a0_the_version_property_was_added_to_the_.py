@@ -0,0 +1,26 @@
+"""The version property was added to the User model, used to compute the ETags of the user endpoints.
+
+Revision ID: 5d2c8e71f4a0
+Revises: b83f5e0d6a17
+Create Date: 2026-10-17 19:21:09.337152
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2c8e71f4a0'
+down_revision = 'b83f5e0d6a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,29 @@
+"""The billing_day property was added to the Subscription model so monthly renewals keep the original day of the month.
+
+Revision ID: 7c3e9a1f5b28
+Revises: a41f7c93e2b6
+Create Date: 2026-10-18 10:24:11.902413
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e9a1f5b28'
+down_revision = 'a41f7c93e2b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('subscription', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('billing_day', sa.Integer(), nullable=True))
+
+    subscription = sa.table('subscription', sa.column('billing_day', sa.Integer()), sa.column('payment_date', sa.DateTime()))
+    op.execute(subscription.update().values(billing_day=sa.extract('day', subscription.c.payment_date)))
+
+
+def downgrade():
+    with op.batch_alter_table('subscription', schema=None) as batch_op:
+        batch_op.drop_column('billing_day')
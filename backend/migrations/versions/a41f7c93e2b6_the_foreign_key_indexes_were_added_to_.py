@@ -0,0 +1,36 @@
+"""The foreign key indexes were added to the Installment and InstallmentTransaction models for the admin filters and the installment joins.
+
+Revision ID: a41f7c93e2b6
+Revises: 5d2c8e71f4a0
+Create Date: 2026-10-17 21:12:48.305517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41f7c93e2b6'
+down_revision = '5d2c8e71f4a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('installment', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_installment_debt_id'), ['debt_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_installment_loan_given_id'), ['loan_given_id'], unique=False)
+
+    with op.batch_alter_table('installment_transaction', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_installment_transaction_installment_id'), ['installment_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_installment_transaction_transaction_id'), ['transaction_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('installment_transaction', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_installment_transaction_transaction_id'))
+        batch_op.drop_index(batch_op.f('ix_installment_transaction_installment_id'))
+
+    with op.batch_alter_table('installment', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_installment_loan_given_id'))
+        batch_op.drop_index(batch_op.f('ix_installment_debt_id'))
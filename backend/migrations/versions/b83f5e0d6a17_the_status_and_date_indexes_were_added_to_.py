@@ -0,0 +1,38 @@
+"""The (status, due_date) and (status, payment_date) indexes were added to the Installment, Debt and LoanGiven models for the overdue sweep.
+
+Revision ID: b83f5e0d6a17
+Revises: 4e1b7a9c2d83
+Create Date: 2026-10-17 18:05:37.618240
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b83f5e0d6a17'
+down_revision = '4e1b7a9c2d83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('installment', schema=None) as batch_op:
+        batch_op.create_index('ix_installment_status_due_date', ['status', 'due_date'], unique=False)
+
+    with op.batch_alter_table('debt', schema=None) as batch_op:
+        batch_op.create_index('ix_debt_status_payment_date', ['status', 'payment_date'], unique=False)
+
+    with op.batch_alter_table('loan_given', schema=None) as batch_op:
+        batch_op.create_index('ix_loan_given_status_payment_date', ['status', 'payment_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('loan_given', schema=None) as batch_op:
+        batch_op.drop_index('ix_loan_given_status_payment_date')
+
+    with op.batch_alter_table('debt', schema=None) as batch_op:
+        batch_op.drop_index('ix_debt_status_payment_date')
+
+    with op.batch_alter_table('installment', schema=None) as batch_op:
+        batch_op.drop_index('ix_installment_status_due_date')
@@ -0,0 +1,40 @@
+"""The account_id and category_id properties were added to the Subscription model, along with the indexes and constraint used by the renewal scheduler.
+
+Revision ID: c6db56dff5cc
+Revises: 09ba77221798
+Create Date: 2026-10-17 15:40:21.913508
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6db56dff5cc'
+down_revision = '09ba77221798'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('subscription', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('account_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_subscription_account_id_account', 'account', ['account_id'], ['id'])
+        batch_op.create_foreign_key('fk_subscription_category_id_category', 'category', ['category_id'], ['id'])
+        batch_op.create_index('ix_subscription_is_active_payment_date', ['is_active', 'payment_date'], unique=False)
+
+    with op.batch_alter_table('transaction', schema=None) as batch_op:
+        batch_op.create_unique_constraint('unique_subscription_charge', ['subscription_id', 'date'])
+
+
+def downgrade():
+    with op.batch_alter_table('transaction', schema=None) as batch_op:
+        batch_op.drop_constraint('unique_subscription_charge', type_='unique')
+
+    with op.batch_alter_table('subscription', schema=None) as batch_op:
+        batch_op.drop_index('ix_subscription_is_active_payment_date')
+        batch_op.drop_constraint('fk_subscription_category_id_category', type_='foreignkey')
+        batch_op.drop_constraint('fk_subscription_account_id_account', type_='foreignkey')
+        batch_op.drop_column('category_id')
+        batch_op.drop_column('account_id')
@@ -0,0 +1,26 @@
+"""The is_admin property was added to the User model.
+
+Revision ID: c938c302c70e
+Revises: 3f8d2b6e9c41
+Create Date: 2026-10-18 16:05:27.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c938c302c70e'
+down_revision = '3f8d2b6e9c41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_admin', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('is_admin')
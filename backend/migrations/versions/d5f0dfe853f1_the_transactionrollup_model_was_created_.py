@@ -0,0 +1,43 @@
+"""The TransactionRollup model was created to hold per-period transaction aggregates for reports.
+
+Revision ID: d5f0dfe853f1
+Revises: 1372f10f30a4
+Create Date: 2026-10-17 10:03:47.815240
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f0dfe853f1'
+down_revision = '1372f10f30a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The reporttype enum already exists on PostgreSQL (created with the report table)
+    report_type = sa.Enum('weekly', 'monthly', 'yearly', name='reporttype').with_variant(
+        postgresql.ENUM('weekly', 'monthly', 'yearly', name='reporttype', create_type=False), 'postgresql')
+
+    op.create_table('transaction_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('granularity', report_type, nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('total', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['account.id'], ),
+    sa.ForeignKeyConstraint(['category_id'], ['category.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'account_id', 'category_id', 'granularity', 'bucket', name='unique_transaction_rollup_bucket')
+    )
+
+
+def downgrade():
+    op.drop_table('transaction_rollup')
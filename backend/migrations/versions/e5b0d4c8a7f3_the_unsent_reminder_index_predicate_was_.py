@@ -0,0 +1,34 @@
+"""The unsent reminder index predicate was changed to the SQL the Reminder queries compile to (is_sent = 0 on SQLite), so the planner can use it.
+
+Revision ID: e5b0d4c8a7f3
+Revises: 7c3e9a1f5b28
+Create Date: 2026-10-18 11:02:37.184925
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b0d4c8a7f3'
+down_revision = '7c3e9a1f5b28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reminder', schema=None) as batch_op:
+        batch_op.drop_index('ix_reminder_unsent_reminder_date')
+        batch_op.create_index(
+            'ix_reminder_unsent_reminder_date', ['reminder_date'], unique=False,
+            postgresql_where=sa.text('NOT is_sent'), sqlite_where=sa.text('is_sent = 0'),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('reminder', schema=None) as batch_op:
+        batch_op.drop_index('ix_reminder_unsent_reminder_date')
+        batch_op.create_index(
+            'ix_reminder_unsent_reminder_date', ['reminder_date'], unique=False,
+            postgresql_where=sa.text('NOT is_sent'), sqlite_where=sa.text('NOT is_sent'),
+        )
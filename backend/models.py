@@ -3,9 +3,10 @@ from datetime import datetime, timezone
 from decimal import Decimal
 import enum
 from typing import Any
-from sqlalchemy import JSON, CheckConstraint, ForeignKey, Numeric, String, Boolean, UniqueConstraint
-from sqlalchemy.orm import Mapped, mapped_column, validates
+from sqlalchemy import JSON, CheckConstraint, ForeignKey, Index, Numeric, String, Boolean, UniqueConstraint, inspect, literal_column, select, true, false
+from sqlalchemy.orm import Mapped, joinedload, mapped_column, selectinload, validates
 from database import db
+from serialization import column_serializer
 
 class AccountType(enum.Enum):
     bank = "bank"
@@ -48,6 +49,25 @@ class TransactionType(enum.Enum):
     debt_payment = "debt_payment"
     loan_payment = "loan_payment"
 
+def eager_load(instance, options):
+    """
+    Loads the relationships of an already persisted instance that are still unloaded,
+    using the given loader options, so serializing it does not fan out into lazy loads.
+    Does nothing when every relationship covered by the options is already loaded.
+    """
+    state = inspect(instance)
+    if state.session is None or state.key is None:
+        return
+
+    relationships = {option.path[1].key for option in options}
+    if not relationships & state.unloaded:
+        return
+
+    model = type(instance)
+    state.session.execute(
+        select(model).where(model.id == instance.id).options(*options)
+    ).scalars().all()
+
 class User(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -55,7 +75,12 @@ class User(db.Model):
     email: Mapped[str] = mapped_column(String(120), unique=True, nullable=False)
     password_hash: Mapped[str] = mapped_column(nullable=True)
     currency: Mapped[str] = mapped_column(String(3), nullable=False, default='USD')
+    is_active: Mapped[bool] = mapped_column(nullable=False, default=True, server_default=true())
+    # Granted with `flask set-admin`; required by the routes decorated with utils.admin_required
+    is_admin: Mapped[bool] = mapped_column(nullable=False, default=False, server_default=false())
     created_at: Mapped[datetime] = mapped_column(nullable=False, default=lambda: datetime.now(timezone.utc))
+    # Row version for the ETags of http_cache.py, bumped by every UPDATE of the row
+    version: Mapped[int] = mapped_column(nullable=False, default=1, server_default='1', onupdate=literal_column('version') + 1)
 
     accounts: Mapped[list["Account"]] = db.relationship("Account", back_populates="user")
     transactions: Mapped[list["Transaction"]] = db.relationship("Transaction", back_populates="user")
@@ -66,32 +91,39 @@ class User(db.Model):
     reminders: Mapped[list["Reminder"]] = db.relationship("Reminder", back_populates="user")
     reports: Mapped[list["Report"]] = db.relationship("Report", back_populates="user")
 
-    def serialize(self, large=False):
+    @classmethod
+    def loader_options(cls, large=False):
         if not large:
-            return {
-                "id": self.id,
-                "full_name": self.full_name,
-                "email": self.email,
-                "currency": self.currency,
-                "created_at": self.created_at.isoformat() if self.created_at else None
-            } 
-        else:
-            return {
-            "id": self.id,
-            "full_name": self.full_name,
-            "email": self.email,
-            "currency": self.currency,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "accounts": [account.serialize() for account in self.accounts],
-            "transactions": [transaction.serialize() for transaction in self.transactions],
-            "categories": [category.serialize() for category in self.categories],
-            "subscriptions": [subscription.serialize() for subscription in self.subscriptions],
-            "loans_given": [loan_given.serialize() for loan_given in self.loans_given],
-            "debts": [debt.serialize() for debt in self.debts],
-            "reminders": [reminder.serialize() for reminder in self.reminders],
-            "reports": [report.serialize() for report in self.reports]
-        }
-    
+            return []
+        return [
+            selectinload(cls.accounts),
+            selectinload(cls.transactions),
+            selectinload(cls.categories),
+            selectinload(cls.subscriptions),
+            selectinload(cls.loans_given),
+            selectinload(cls.debts),
+            selectinload(cls.reminders),
+            selectinload(cls.reports),
+        ]
+
+    _serialize_columns = column_serializer("id", "full_name", "email", "currency", "created_at")
+
+    def serialize(self, large=False):
+        data = self._serialize_columns()
+        if large:
+            eager_load(self, User.loader_options(large=True))
+            data.update(
+                accounts=[account.serialize() for account in self.accounts],
+                transactions=[transaction.serialize() for transaction in self.transactions],
+                categories=[category.serialize() for category in self.categories],
+                subscriptions=[subscription.serialize() for subscription in self.subscriptions],
+                loans_given=[loan_given.serialize() for loan_given in self.loans_given],
+                debts=[debt.serialize() for debt in self.debts],
+                reminders=[reminder.serialize() for reminder in self.reminders],
+                reports=[report.serialize() for report in self.reports],
+            )
+        return data
+
 class Account(db.Model):
 
     __table_args__ = (
@@ -110,29 +142,30 @@ class Account(db.Model):
     user = db.relationship("User", back_populates="accounts")
     transactions: Mapped[list["Transaction"]] = db.relationship("Transaction", back_populates="account")
 
+    _serialize_columns = column_serializer("id", "user_id", "name", "balance", "type", "created_at")
+
     def serialize(self):
-        return {
-            "id": self.id,
-            "user_id": self.user_id,
-            "name": self.name,
-            "balance": str(self.balance),
-            "type": self.type.value,
-            "created_at": self.created_at.isoformat() if self.created_at else None
-        } 
-    
+        return self._serialize_columns()
+
 class Transaction(db.Model):
+
+    __table_args__ = (
+        # A subscription is charged at most once per payment date, which keeps the renewal scheduler idempotent
+        UniqueConstraint('subscription_id', 'date', name='unique_subscription_charge'),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
-    account_id: Mapped[int] = mapped_column(ForeignKey("account.id"), nullable=False, index=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False, index=True)
-    category_id: Mapped[int] = mapped_column(ForeignKey("category.id"), nullable=False, index=True)
+    account_id: Mapped[int] = mapped_column(ForeignKey("account.id"), nullable=False, index=True, active_history=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False, index=True, active_history=True)
+    category_id: Mapped[int] = mapped_column(ForeignKey("category.id"), nullable=False, index=True, active_history=True)
     subscription_id: Mapped[int] = mapped_column(ForeignKey("subscription.id"), nullable=True)
     debt_id: Mapped[int] = mapped_column(ForeignKey("debt.id"), nullable=True)
     loan_given_id: Mapped[int] = mapped_column(ForeignKey("loan_given.id"), nullable=True)
 
     type: Mapped[TransactionType] = mapped_column(nullable=False, index=True)
-    amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
-    description: Mapped[str] = mapped_column(String(255), nullable=True, index=True)
-    date: Mapped[datetime] = mapped_column(nullable=False, default=lambda: datetime.now(timezone.utc))
+    amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False, active_history=True)
+    description: Mapped[str] = mapped_column(String(255), nullable=True, index=True, active_history=True)
+    date: Mapped[datetime] = mapped_column(nullable=False, default=lambda: datetime.now(timezone.utc), active_history=True)
     is_recurring: Mapped[bool] = mapped_column(nullable=False, default=False)
 
     user = db.relationship("User", back_populates="transactions")
@@ -171,49 +204,48 @@ class Transaction(db.Model):
             raise ValueError("A 'general' type transaction cannot be linked to debt, loan_given, or subscription.")
         
         return value
+
+    @classmethod
+    def loader_options(cls, large=False):
+        if not large:
+            return []
+        return [
+            joinedload(cls.account),
+            joinedload(cls.category),
+            joinedload(cls.subscription),
+            joinedload(cls.debt),
+            joinedload(cls.loan_given),
+        ]
         
+    _serialize_columns = column_serializer("id", "account_id", "user_id", "category_id", "subscription_id", "type", "amount", "description", "date", "is_recurring")
+
     def serialize(self , large=False):
-        if not large:
-            return {
-                "id": self.id,
-                "account_id": self.account_id,
-                "user_id": self.user_id,
-                "category_id": self.category_id,
-                "subscription_id": self.subscription_id,
-                "type": self.type.value,
-                "amount": str(self.amount),
-                "description": self.description,
-                "date": self.date.isoformat() if self.date else None,
-                "is_recurring": self.is_recurring
-            }
-        else:           
-            return {
-                "id": self.id,
-                "account_id": self.account_id,
-                "user_id": self.user_id,
-                "category_id": self.category_id,
-                "subscription_id": self.subscription_id,
-                "type": self.type.value,
-                "amount": str(self.amount),
-                "description": self.description,
-                "date": self.date.isoformat() if self.date else None,
-                "is_recurring": self.is_recurring,
-                "account": self.account.serialize() if self.account else None,
-                "category": self.category.serialize() if self.category else None,
-                "subscription": self.subscription.serialize() if self.subscription else None,
-                "debt": {
+        data = self._serialize_columns()
+        if large:
+            eager_load(self, Transaction.loader_options(large=True))
+            data.update(
+                account=self.account.serialize() if self.account else None,
+                category=self.category.serialize() if self.category else None,
+                subscription=self.subscription.serialize() if self.subscription else None,
+                debt={
                     "id": self.debt.id,
                     "creditor": self.debt.creditor,
                     "remaining_amount": self.debt.remaining_amount,
-                    "status": self.debt.status.value
+                    "status": self.debt.status
                 } if self.debt else None,
-                "loan_given": {
+                loan_given={
                     "id": self.loan_given.id,
                     "debtor": self.loan_given.debtor,
                     "remaining_amount": self.loan_given.remaining_amount,
-                    "status": self.loan_given.status.value
+                    "status": self.loan_given.status
                 } if self.loan_given else None,
-            }
+            )
+        return data
+
+# Composite indexes for the "user's transactions between two dates, newest first" listing
+# and for per-account date range scans
+Index('ix_transaction_user_id_date_id', Transaction.user_id, Transaction.date.desc(), Transaction.id.desc())
+Index('ix_transaction_account_id_date', Transaction.account_id, Transaction.date)
     
 class Category(db.Model):
 
@@ -230,31 +262,40 @@ class Category(db.Model):
     user = db.relationship("User", back_populates="categories")
     transactions: Mapped[list["Transaction"]] = db.relationship("Transaction", back_populates="category")
 
-    def serialize(self, large=False):
+    @classmethod
+    def loader_options(cls, large=False):
         if not large:
-            return {
-                "id": self.id,
-                "user_id": self.user_id,
-                "name": self.name,
-                "type": self.type.value
-            }
-        else:
-            return {
-                "id": self.id,
-                "user_id": self.user_id,
-                "name": self.name,
-                "type": self.type.value,
-                "transactions": [transaction.serialize() for transaction in self.transactions]
-            }
+            return []
+        return [selectinload(cls.transactions)]
+
+    _serialize_columns = column_serializer("id", "user_id", "name", "type")
+
+    def serialize(self, large=False):
+        data = self._serialize_columns()
+        if large:
+            eager_load(self, Category.loader_options(large=True))
+            data["transactions"] = [transaction.serialize() for transaction in self.transactions]
+        return data
 
 class Subscription(db.Model):
+
+    __table_args__ = (
+        # Due subscriptions lookup of the renewal scheduler
+        Index('ix_subscription_is_active_payment_date', 'is_active', 'payment_date'),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
+    # Account charged and category of the transactions created on each renewal
+    account_id: Mapped[int] = mapped_column(ForeignKey("account.id"), nullable=True)
+    category_id: Mapped[int] = mapped_column(ForeignKey("category.id"), nullable=True)
 
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     frequency: Mapped[frequencyType] = mapped_column(nullable=False)
     payment_date: Mapped[datetime] = mapped_column(nullable=False)
+    # Day of the month of the first payment date: renewals return to it after a shorter month
+    billing_day: Mapped[int] = mapped_column(nullable=True, default=lambda context: context.get_current_parameters()['payment_date'].day)
     last_payment_date: Mapped[datetime] = mapped_column(nullable=True)
     is_active: Mapped[bool] = mapped_column(nullable=False, default=True)
     created_at: Mapped[datetime] = mapped_column(nullable=False, default=lambda: datetime.now(timezone.utc))
@@ -263,38 +304,35 @@ class Subscription(db.Model):
     transactions: Mapped[list["Transaction"]] = db.relationship("Transaction", back_populates="subscription")
     reminders: Mapped[list["Reminder"]] = db.relationship("Reminder", back_populates="subscription")
 
-    def serialize(self, large=False):
+    @classmethod
+    def loader_options(cls, large=False):
         if not large:
-            return {
-                "id": self.id,
-                "user_id": self.user_id,
-                "name": self.name,
-                "price": str(self.price),
-                "frequency": self.frequency.value,
-                "payment_date": self.payment_date.isoformat() if self.payment_date else None,
-                "last_payment_date": self.last_payment_date.isoformat() if self.last_payment_date else None,
-                "is_active": self.is_active,
-                "created_at": self.created_at.isoformat() if self.created_at else None
-            }
-        else:
-            return {
-                "id": self.id,
-                "user_id": self.user_id,
-                "name": self.name,
-                "price": str(self.price),
-                "frequency": self.frequency.value,
-                "payment_date": self.payment_date.isoformat() if self.payment_date else None,
-                "last_payment_date": self.last_payment_date.isoformat() if self.last_payment_date else None,
-                "is_active": self.is_active,
-                "created_at": self.created_at.isoformat() if self.created_at else None,
-                "transactions": [transaction.serialize() for transaction in self.transactions],
-                "reminders": [reminder.serialize() for reminder in self.reminders]
-            }
+            return []
+        return [
+            selectinload(cls.transactions),
+            selectinload(cls.reminders),
+        ]
+
+    _serialize_columns = column_serializer("id", "user_id", "account_id", "category_id", "name", "price", "frequency", "payment_date", "billing_day", "last_payment_date", "is_active", "created_at")
+
+    def serialize(self, large=False):
+        data = self._serialize_columns()
+        if large:
+            eager_load(self, Subscription.loader_options(large=True))
+            data.update(
+                transactions=[transaction.serialize() for transaction in self.transactions],
+                reminders=[reminder.serialize() for reminder in self.reminders],
+            )
+        return data
 
 class Installment(db.Model):
+    __table_args__ = (
+        Index('ix_installment_status_due_date', 'status', 'due_date'),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
-    loan_given_id: Mapped[int] = mapped_column(ForeignKey("loan_given.id"), nullable=True)
-    debt_id: Mapped[int] = mapped_column(ForeignKey("debt.id"), nullable=True)
+    loan_given_id: Mapped[int] = mapped_column(ForeignKey("loan_given.id"), nullable=True, index=True)
+    debt_id: Mapped[int] = mapped_column(ForeignKey("debt.id"), nullable=True, index=True)
 
     amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     last_payment_date: Mapped[datetime] = mapped_column(nullable=True)
@@ -317,37 +355,38 @@ class Installment(db.Model):
             raise ValueError("Installment must belong to either debt or loan_given")
         return value
 
+    @classmethod
+    def loader_options(cls, large=False):
+        return [selectinload(cls.installment_links)]
+
+    _serialize_columns = column_serializer("id", "debt_id", "loan_given_id", "amount", "last_payment_date", "due_date", "status")
+
     def serialize(self):
-        return {
-            "id": self.id,
-            "debt_id": self.debt_id,
-            "loan_given_id": self.loan_given_id,
-            "amount": str(self.amount),
-            "last_payment_date": self.last_payment_date.isoformat() if self.last_payment_date else None,
-            "due_date": self.due_date.isoformat() if self.due_date else None,
-            "status": self.status.value,
-            "installment_links": [link.serialize() for link in self.installment_links],
-        }
-    
+        eager_load(self, Installment.loader_options())
+        data = self._serialize_columns()
+        data["installment_links"] = [link.serialize() for link in self.installment_links]
+        return data
+
 class InstallmentTransaction(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
-    installment_id: Mapped[int] = mapped_column(ForeignKey("installment.id"), nullable=False)
-    transaction_id: Mapped[int] = mapped_column(ForeignKey("transaction.id"), nullable=False)
+    installment_id: Mapped[int] = mapped_column(ForeignKey("installment.id"), nullable=False, index=True)
+    transaction_id: Mapped[int] = mapped_column(ForeignKey("transaction.id"), nullable=False, index=True)
 
     amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
 
     installment = db.relationship("Installment", back_populates="installment_links" )
     transaction = db.relationship("Transaction", back_populates="installment_links")
 
+    _serialize_columns = column_serializer("id", "installment_id", "transaction_id", "amount")
+
     def serialize(self):
-        return {
-            "id": self.id,
-            "installment_id": self.installment_id,
-            "transaction_id": self.transaction_id,
-            "amount": str(self.amount)
-        }
+        return self._serialize_columns()
 
 class Debt(db.Model):
+    __table_args__ = (
+        Index('ix_debt_status_payment_date', 'status', 'payment_date'),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
     
@@ -364,36 +403,34 @@ class Debt(db.Model):
     installments: Mapped[list["Installment"]] = db.relationship("Installment", back_populates="debt")
     reminders: Mapped[list["Reminder"]] = db.relationship("Reminder", back_populates="debt")
 
-    def serialize(self, large=False):
+    @classmethod
+    def loader_options(cls, large=False):
         if not large:
-            return {
-                "id": self.id,
-                "user_id": self.user_id,
-                "creditor": self.creditor,
-                "total_amount": str(self.total_amount),
-                "remaining_amount": str(self.remaining_amount),
-                "last_payment_date": self.last_payment_date.isoformat() if self.last_payment_date else None,
-                "payment_date": self.payment_date.isoformat() if self.payment_date else None,
-                "status": self.status.value,
-                "created_at": self.created_at.isoformat() if self.created_at else None
-            }
-        else:
-            return {
-                "id": self.id,
-                "user_id": self.user_id,
-                "creditor": self.creditor,
-                "total_amount": str(self.total_amount),
-                "remaining_amount": str(self.remaining_amount),
-                "last_payment_date": self.last_payment_date.isoformat() if self.last_payment_date else None,
-                "payment_date": self.payment_date.isoformat() if self.payment_date else None,
-                "status": self.status.value,
-                "created_at": self.created_at.isoformat() if self.created_at else None,
-                "transactions": [transaction.serialize() for transaction in self.transactions],
-                "installments": [installment.serialize() for installment in self.installments],
-                "reminders": [reminder.serialize() for reminder in self.reminders]
-            }
-        
+            return []
+        return [
+            selectinload(cls.transactions),
+            selectinload(cls.installments).selectinload(Installment.installment_links),
+            selectinload(cls.reminders),
+        ]
+
+    _serialize_columns = column_serializer("id", "user_id", "creditor", "total_amount", "remaining_amount", "last_payment_date", "payment_date", "status", "created_at")
+
+    def serialize(self, large=False):
+        data = self._serialize_columns()
+        if large:
+            eager_load(self, Debt.loader_options(large=True))
+            data.update(
+                transactions=[transaction.serialize() for transaction in self.transactions],
+                installments=[installment.serialize() for installment in self.installments],
+                reminders=[reminder.serialize() for reminder in self.reminders],
+            )
+        return data
+
 class LoanGiven(db.Model):
+    __table_args__ = (
+        Index('ix_loan_given_status_payment_date', 'status', 'payment_date'),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
 
@@ -410,34 +447,28 @@ class LoanGiven(db.Model):
     installments: Mapped[list["Installment"]] = db.relationship("Installment", back_populates="loan_given")
     reminders: Mapped[list["Reminder"]] = db.relationship("Reminder", back_populates="loan_given")
 
-    def serialize(self, large=False):
+    @classmethod
+    def loader_options(cls, large=False):
         if not large:
-            return {
-                "id": self.id,
-                "user_id": self.user_id,
-                "debtor": self.debtor,
-                "total_amount": str(self.total_amount),
-                "remaining_amount": str(self.remaining_amount),
-                "last_payment_date": self.last_payment_date.isoformat() if self.last_payment_date else None,
-                "payment_date": self.payment_date.isoformat() if self.payment_date else None,
-                "status": self.status.value,
-                "created_at": self.created_at.isoformat() if self.created_at else None
-            }
-        else:
-            return {
-                "id": self.id,
-                "user_id": self.user_id,
-                "debtor": self.debtor,
-                "total_amount": str(self.total_amount),
-                "remaining_amount": str(self.remaining_amount),
-                "last_payment_date": self.last_payment_date.isoformat() if self.last_payment_date else None,
-                "payment_date": self.payment_date.isoformat() if self.payment_date else None,
-                "status": self.status.value,
-                "created_at": self.created_at.isoformat() if self.created_at else None,
-                "transactions": [transaction.serialize() for transaction in self.transactions],
-                "installments": [installment.serialize() for installment in self.installments],
-                "reminders": [reminder.serialize() for reminder in self.reminders]
-            }
+            return []
+        return [
+            selectinload(cls.transactions),
+            selectinload(cls.installments).selectinload(Installment.installment_links),
+            selectinload(cls.reminders),
+        ]
+
+    _serialize_columns = column_serializer("id", "user_id", "debtor", "total_amount", "remaining_amount", "last_payment_date", "payment_date", "status", "created_at")
+
+    def serialize(self, large=False):
+        data = self._serialize_columns()
+        if large:
+            eager_load(self, LoanGiven.loader_options(large=True))
+            data.update(
+                transactions=[transaction.serialize() for transaction in self.transactions],
+                installments=[installment.serialize() for installment in self.installments],
+                reminders=[reminder.serialize() for reminder in self.reminders],
+            )
+        return data
 
 class Reminder(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -451,6 +482,10 @@ class Reminder(db.Model):
     description: Mapped[str] = mapped_column(String(255), nullable=True)
     reminder_date: Mapped[datetime] = mapped_column(nullable=False)
     is_sent: Mapped[bool] = mapped_column(nullable=False, default=False)
+    sent_at: Mapped[datetime] = mapped_column(nullable=True)
+    # Delivery lease of the worker that claimed the reminder (reminders.py)
+    locked_by: Mapped[str] = mapped_column(String(100), nullable=True)
+    locked_until: Mapped[datetime] = mapped_column(nullable=True)
 
     user = db.relationship("User", back_populates="reminders")
     debt = db.relationship("Debt", back_populates="reminders")
@@ -481,20 +516,71 @@ class Reminder(db.Model):
 
         return value
 
+    _serialize_columns = column_serializer("id", "user_id", "debt_id", "loan_given_id", "subscription_id", "type", "title", "description", "reminder_date", "is_sent", "sent_at")
+
     def serialize(self):
-        return {
-            "id": self.id,
-            "user_id": self.user_id,
-            "debt_id": self.debt_id,
-            "loan_given_id": self.loan_given_id,
-            "subscription_id": self.subscription_id,
-            "type": self.type.value,
-            "title": self.title,
-            "description": self.description,
-            "reminder_date": self.reminder_date.isoformat() if self.reminder_date else None,
-            "is_sent": self.is_sent
-        }
-    
+        return self._serialize_columns()
+
+# Due scan of reminders.py: only unsent reminders are indexed. The queries filter with the
+# same `unsent_reminder` expression, so the predicate compiles to the same SQL as the index
+# (`NOT is_sent` on PostgreSQL, `is_sent = 0` on SQLite) and the planner can use it
+unsent_reminder = ~Reminder.is_sent
+Index(
+    'ix_reminder_unsent_reminder_date', Reminder.reminder_date,
+    postgresql_where=unsent_reminder, sqlite_where=unsent_reminder,
+)
+
+class TransactionRollup(db.Model):
+    """
+    Per-period aggregate of a user's transactions by account and category.
+    Kept up to date incrementally by the listeners in ledger.py.
+    Weekly buckets start on Monday. Monthly buckets start on the 1st, and yearly
+    reports add up monthly buckets.
+    """
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'account_id', 'category_id', 'granularity', 'bucket', name='unique_transaction_rollup_bucket'),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
+    account_id: Mapped[int] = mapped_column(ForeignKey("account.id"), nullable=False)
+    category_id: Mapped[int] = mapped_column(ForeignKey("category.id"), nullable=False)
+
+    granularity: Mapped[ReportType] = mapped_column(nullable=False)
+    bucket: Mapped[datetime] = mapped_column(nullable=False)
+    total: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    count: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    _serialize_columns = column_serializer("id", "user_id", "account_id", "category_id", "granularity", "bucket", "total", "count")
+
+    def serialize(self):
+        return self._serialize_columns()
+
+class MerchantRollup(db.Model):
+    """
+    Monthly aggregate of a user's transactions by category and description (merchant).
+    Kept up to date incrementally by the listeners in ledger.py
+    """
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'category_id', 'description', 'bucket', name='unique_merchant_rollup_bucket'),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
+    category_id: Mapped[int] = mapped_column(ForeignKey("category.id"), nullable=False)
+
+    description: Mapped[str] = mapped_column(String(255), nullable=False)
+    bucket: Mapped[datetime] = mapped_column(nullable=False)
+    total: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    count: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    _serialize_columns = column_serializer("id", "user_id", "category_id", "description", "bucket", "total", "count")
+
+    def serialize(self):
+        return self._serialize_columns()
+
 class Report(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
@@ -507,13 +593,8 @@ class Report(db.Model):
 
     user = db.relationship("User", back_populates="reports")
 
+    _serialize_columns = column_serializer("id", "user_id", "period", "summary", "type", "created_at", "updated_at")
+
     def serialize(self):
-        return {
-            "id": self.id,
-            "user_id": self.user_id,
-            "period": self.period,
-            "summary": self.summary,
-            "type": self.type.value,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+        return self._serialize_columns()
+
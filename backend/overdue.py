@@ -0,0 +1,51 @@
+"""
+Overdue status sweep.
+
+Debts, loans given and installments are created as pending and never become overdue on
+their own. sweep_overdue() moves every pending row whose date has passed (due_date for
+installments, payment_date for debts and loans) to statusType.overdue with set-based
+UPDATEs, so listings can filter on status through the (status, date) indexes instead of
+comparing dates row by row.
+
+Each table is updated in chunks of `chunk_size` rows, one database transaction per chunk,
+so a large backlog does not hold its locks for the whole sweep. Running it again, or
+from several workers at once, is harmless: a row only matches while it is still pending.
+"""
+from datetime import datetime
+from sqlalchemy import select, update
+from models import db, Debt, Installment, LoanGiven, statusType
+
+OVERDUE_DATES = (
+    (Installment, Installment.due_date),
+    (Debt, Debt.payment_date),
+    (LoanGiven, LoanGiven.payment_date),
+)
+
+def sweep_overdue(now=None, chunk_size=5000):
+    """
+    Marks the pending rows past their date as overdue and returns {table name: rows updated}
+    """
+    now = now or datetime.now()
+    swept = {}
+    for model, date in OVERDUE_DATES:
+        table = model.__table__
+        swept[table.name] = 0
+        while True:
+            chunk = (
+                select(table.c.id)
+                .where(table.c.status == statusType.pending, date < now)
+                .limit(chunk_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            # The status condition is repeated so a row paid in between is left alone
+            result = db.session.execute(
+                update(table)
+                .where(table.c.id.in_(chunk), table.c.status == statusType.pending)
+                .values(status=statusType.overdue)
+            )
+            db.session.commit()
+            swept[table.name] += result.rowcount
+            if result.rowcount < chunk_size:
+                break
+    return swept
@@ -0,0 +1,100 @@
+"""
+Password hashing off the request thread.
+
+Hashes are generated and verified by Werkzeug on a bounded pool of worker processes,
+so a burst of logins cannot hold the GIL and starve the other requests of a worker.
+Every call first takes a slot of a semaphore of PASSWORD_HASH_MAX_PENDING jobs; when
+none is free within PASSWORD_HASH_QUEUE_TIMEOUT seconds PasswordHasherBusy is raised
+and the route answers 503 instead of queueing without bound.
+
+PASSWORD_HASH_METHOD is any Werkzeug method string ("scrypt", "scrypt:32768:8:1",
+"pbkdf2:sha256:600000"...). Hashes made with other parameters keep verifying, and
+needs_rehash() tells the login route to replace them with the current ones.
+With PASSWORD_HASH_WORKERS=0 the work runs inline on the request thread.
+
+The pool and the semaphore belong to one process. Under gunicorn the workers already
+spread the hashing over the cores, and a pool per worker would multiply the processes
+(and fork them from threaded workers), so gunicorn.conf.py defaults PASSWORD_HASH_WORKERS
+to 0; PASSWORD_HASH_MAX_PENDING then bounds the concurrent hashes of each worker. The pool
+processes are started with forkserver (spawn where it is not available), never forked
+from the threads of the serving process.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import jsonify
+from werkzeug.security import check_password_hash, generate_password_hash
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when every slot of the hashing pool is taken
+    """
+
+class PasswordHasher:
+
+    def __init__(self, method="scrypt", workers=None, max_pending=None, queue_timeout=1.0):
+        self.method = method
+        self.workers = min(4, os.cpu_count() or 1) if workers is None else workers
+        self.max_pending = max_pending or max(1, self.workers) * 8
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._prefix = None
+
+    def _pool(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+        return self._executor
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy()
+        try:
+            if not self.workers:
+                return function(*args)
+            return self._pool().submit(function, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        if not password_hash or not password:
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    @property
+    def prefix(self):
+        """
+        Method and parameters as Werkzeug writes them before the salt, e.g. "scrypt:32768:8:1"
+        """
+        if self._prefix is None:
+            self._prefix = generate_password_hash("", self.method).split("$", 1)[0]
+        return self._prefix
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split("$", 1)[0] != self.prefix
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+def setup_passwords(app):
+    workers = app.config['PASSWORD_HASH_WORKERS']
+    app.extensions['password_hasher'] = PasswordHasher(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        workers=None if workers is None else int(workers),
+        max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+        queue_timeout=app.config['PASSWORD_HASH_QUEUE_TIMEOUT'],
+    )
+
+    @app.errorhandler(PasswordHasherBusy)
+    def password_hasher_busy(error):
+        return jsonify({"msg": "Too many authentication requests, try again later"}), 503, {"Retry-After": "1"}
@@ -0,0 +1,143 @@
+"""
+Reminder delivery.
+
+ReminderDispatcher claims the unsent reminders whose reminder_date has passed, hands them
+to a sink and marks the delivered ones as sent. Several dispatchers can run at once:
+
+    1. claim: one UPDATE sets locked_by/locked_until (a lease) on the next batch of due
+       reminders that nobody holds, picked on the partial (reminder_date) index of unsent
+       reminders. On PostgreSQL the candidate rows are read with FOR UPDATE SKIP LOCKED,
+       so workers never wait on each other; on SQLite the UPDATE itself is atomic
+    2. deliver: the sink receives the whole batch and returns the ids it delivered
+    3. mark: one UPDATE flags those ids as sent, only while the lease still belongs to
+       this worker
+
+Reminders that were not delivered, and those of a worker that died, keep their lease for
+`lease` seconds, after which any worker claims them again. Delivery is at least once: a worker that outlives its lease may deliver a
+reminder that another worker delivers again.
+
+Sinks are callables taking a list of reminder dicts and returning the delivered ids.
+make_sink() builds one from REMINDER_SINK: "log" (default) or "file:<path>", which
+appends one JSON line per reminder.
+"""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+import orjson
+from sqlalchemy import select, update
+from models import db, Reminder, User, unsent_reminder
+
+def _lease_free(now):
+    return Reminder.locked_until.is_(None) | (Reminder.locked_until < now)
+
+class LogSink:
+    """
+    Writes every reminder to the application log (INFO level)
+    """
+
+    def __call__(self, reminders):
+        for reminder in reminders:
+            current_app.logger.info("Reminder %s for %s: %s", reminder["id"], reminder["email"], reminder["title"])
+        return [reminder["id"] for reminder in reminders]
+
+class FileSink:
+    """
+    Appends every reminder to a file as a JSON line
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, reminders):
+        with open(self.path, "ab") as file:
+            file.write(b"".join(orjson.dumps(reminder) + b"\n" for reminder in reminders))
+        return [reminder["id"] for reminder in reminders]
+
+def make_sink(spec=None):
+    spec = spec or os.getenv("REMINDER_SINK", "log")
+    if spec == "log":
+        return LogSink()
+    if spec.startswith("file:"):
+        return FileSink(spec[len("file:"):])
+    raise ValueError(f"Unknown reminder sink: {spec}")
+
+class ReminderDispatcher:
+
+    def __init__(self, sink, batch_size=500, lease=300, worker=None):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.lease = timedelta(seconds=lease)
+        self.worker = worker or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.sent = 0
+        self.failed = 0
+
+    def run(self):
+        """
+        Delivers every due reminder and returns {sent, failed}
+        """
+        while True:
+            batch = self.claim()
+            if not batch:
+                break
+            self.deliver(batch)
+            if len(batch) < self.batch_size:
+                break
+        return {"sent": self.sent, "failed": self.failed}
+
+    def _candidates(self, now):
+        """
+        The next batch of due reminders nobody holds, read on the partial index of unsent reminders
+        """
+        return (
+            select(Reminder.id)
+            .where(unsent_reminder, Reminder.reminder_date <= now, _lease_free(now))
+            .order_by(Reminder.reminder_date, Reminder.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+
+    def claim(self):
+        """
+        Leases the next batch of due reminders to this worker and returns them
+        """
+        now = datetime.now()
+        candidates = self._candidates(now)
+        # The lease condition is repeated on the UPDATE so a row claimed in between is skipped
+        claimed = db.session.execute(
+            update(Reminder.__table__)
+            .where(Reminder.id.in_(candidates.scalar_subquery()), unsent_reminder, _lease_free(now))
+            .values(locked_by=self.worker, locked_until=now + self.lease)
+            .returning(
+                Reminder.id, Reminder.user_id, Reminder.debt_id, Reminder.loan_given_id, Reminder.subscription_id,
+                Reminder.type, Reminder.title, Reminder.description, Reminder.reminder_date,
+            )
+        ).mappings().all()
+        db.session.commit()
+        if not claimed:
+            return []
+
+        emails = dict(db.session.execute(
+            select(User.id, User.email).where(User.id.in_({reminder["user_id"] for reminder in claimed}))
+        ).all())
+        return sorted(
+            ({**reminder, "email": emails.get(reminder["user_id"])} for reminder in claimed),
+            key=lambda reminder: (reminder["reminder_date"], reminder["id"]),
+        )
+
+    def deliver(self, batch):
+        try:
+            delivered = set(self.sink(batch))
+        except Exception:
+            current_app.logger.exception("Reminder sink failed for %s reminders", len(batch))
+            delivered = set()
+        self.failed += len(batch) - len(delivered)
+        if delivered:
+            result = db.session.execute(
+                update(Reminder.__table__)
+                .where(Reminder.id.in_(delivered), Reminder.locked_by == self.worker)
+                .values(is_sent=True, sent_at=datetime.now(), locked_by=None, locked_until=None)
+            )
+            db.session.commit()
+            self.sent += result.rowcount
@@ -0,0 +1,99 @@
+"""
+Builds Report summaries from the TransactionRollup aggregates. The cost grows with
+the number of buckets in the period, not with the number of transactions.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import func, select
+from ledger import bucket_start
+from models import db, Category, CategoryType, Report, ReportType, TransactionRollup
+from routing import replica_reads
+
+def period_bounds(report_type, date):
+    """
+    Returns (start, end, label) of the report period that contains `date`
+    """
+    start = bucket_start(report_type, date)
+    if report_type == ReportType.weekly:
+        year, week, _ = start.isocalendar()
+        return start, start + timedelta(days=7), f"{year}-W{week:02d}"
+    if report_type == ReportType.monthly:
+        end = (start + timedelta(days=32)).replace(day=1)
+        return start, end, start.strftime("%Y-%m")
+    return start, start.replace(year=start.year + 1), str(start.year)
+
+def build_summary(user_id, report_type, start, end):
+    """
+    Aggregates the rollup buckets of the user between start (inclusive) and end (exclusive)
+    """
+    granularity = ReportType.weekly if report_type == ReportType.weekly else ReportType.monthly
+    rows = db.session.execute(
+        select(
+            TransactionRollup.category_id,
+            TransactionRollup.account_id,
+            Category.name,
+            Category.type,
+            func.sum(TransactionRollup.total),
+            func.sum(TransactionRollup.count),
+        )
+        .join(Category, Category.id == TransactionRollup.category_id)
+        .where(
+            TransactionRollup.user_id == user_id,
+            TransactionRollup.granularity == granularity,
+            TransactionRollup.bucket >= start,
+            TransactionRollup.bucket < end,
+        )
+        .group_by(TransactionRollup.category_id, TransactionRollup.account_id, Category.name, Category.type)
+    ).all()
+
+    totals = {CategoryType.income: Decimal(0), CategoryType.expense: Decimal(0)}
+    categories = {}
+    accounts = defaultdict(lambda: {"income": Decimal(0), "expense": Decimal(0)})
+    transaction_count = 0
+    for category_id, account_id, name, category_type, total, count in rows:
+        total = Decimal(total or 0)
+        totals[category_type] += total
+        accounts[account_id][category_type.value] += total
+        category = categories.setdefault(category_id, {
+            "id": category_id, "name": name, "type": category_type.value, "total": Decimal(0), "count": 0
+        })
+        category["total"] += total
+        category["count"] += count
+        transaction_count += count
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "income": str(totals[CategoryType.income]),
+        "expense": str(totals[CategoryType.expense]),
+        "net": str(totals[CategoryType.income] - totals[CategoryType.expense]),
+        "transaction_count": transaction_count,
+        "categories": [
+            dict(category, total=str(category["total"]))
+            for category in sorted(categories.values(), key=lambda c: c["total"], reverse=True)
+        ],
+        "accounts": [
+            {"id": account_id, "income": str(values["income"]), "expense": str(values["expense"])}
+            for account_id, values in sorted(accounts.items())
+        ],
+    }
+
+def build_report(user_id, report_type, date=None):
+    """
+    Creates or refreshes the user's report for the period that contains `date`
+    (today by default). The report is added to the session but not committed.
+    The aggregation reads from a replica when one is configured
+    """
+    start, end, label = period_bounds(report_type, date or datetime.now())
+    with replica_reads(db.session):
+        summary = build_summary(user_id, report_type, start, end)
+    report = db.session.execute(
+        select(Report).where(Report.user_id == user_id, Report.type == report_type, Report.period == label)
+    ).scalar_one_or_none()
+    if report is None:
+        report = Report(user_id=user_id, type=report_type, period=label)
+        db.session.add(report)
+
+    report.summary = summary
+    return report
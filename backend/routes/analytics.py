@@ -0,0 +1,40 @@
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required, current_user
+from analytics import LATEST_END, build_analytics, default_window, month_count
+from utils import parse_date
+
+analytics_bp = Blueprint('analytics', __name__)
+
+MAX_TOP_MERCHANTS = 100
+MAX_MOVING_AVERAGE_WINDOW = 24
+
+@analytics_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_analytics():
+    """
+    Analítica de gastos del usuario autenticado entre `date_from` y `date_to` (ISO 8601,
+    por defecto los últimos 12 meses): totales por categoría y por mes, saldo al cierre
+    de cada mes, medias móviles de `window` meses y los `top` comercios con más gasto
+    """
+    try:
+        start, end = default_window()
+        if request.args.get('date_from'):
+            start = parse_date(request.args['date_from'])
+        if request.args.get('date_to'):
+            end = parse_date(request.args['date_to'])
+        top = int(request.args.get('top', 10))
+        window = int(request.args.get('window', 3))
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    if start >= end:
+        return jsonify({"msg": "'date_from' must be before 'date_to'"}), 400
+    if end > LATEST_END:
+        return jsonify({"msg": f"'date_to' must not be after {LATEST_END.date().isoformat()}"}), 400
+    max_months = current_app.config['ANALYTICS_MAX_MONTHS']
+    if month_count(start, end) > max_months:
+        return jsonify({"msg": f"The window must not span more than {max_months} months"}), 400
+    if not 1 <= top <= MAX_TOP_MERCHANTS or not 1 <= window <= MAX_MOVING_AVERAGE_WINDOW:
+        return jsonify({"msg": f"'top' must be between 1 and {MAX_TOP_MERCHANTS} and 'window' between 1 and {MAX_MOVING_AVERAGE_WINDOW}"}), 400
+
+    return jsonify({"analytics": build_analytics(current_user.id, start, end, top=top, window=window)}), 200
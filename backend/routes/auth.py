@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, current_user
+from http_cache import conditional_json
+from identity import forget_user
 from models import db, User
+from routes.users import user_response
+from utils import check_password, hash_password, password_needs_rehash
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -15,10 +19,15 @@ def login():
     if not email or not password:
         return jsonify({"msg": "Email and password are required"}), 400
     
-    # TODO: Implementar verificación de password hasheada
     user = User.query.filter_by(email=email).first()
     
-    if user and user.password == password:  # En producción usar hash
+    if user and check_password(user.password_hash, password):
+        # Rehashear si el hash se generó con otro método o coste
+        if password_needs_rehash(user.password_hash):
+            user.password_hash = hash_password(password)
+            db.session.commit()
+            forget_user(user.id)
+        
         access_token = create_access_token(identity=user.id)
         return jsonify({
             "access_token": access_token,
@@ -34,16 +43,16 @@ def register():
     """
     email = request.json.get('email', None)
     password = request.json.get('password', None)
+    full_name = request.json.get('full_name', None)
     
-    if not email or not password:
-        return jsonify({"msg": "Email and password are required"}), 400
+    if not email or not password or not full_name:
+        return jsonify({"msg": "Email, password and full name are required"}), 400
     
     # Verificar si el usuario ya existe
     if User.query.filter_by(email=email).first():
         return jsonify({"msg": "User already exists"}), 400
     
-    # TODO: Hashear password antes de guardar
-    user = User(email=email, password=password, is_active=True)
+    user = User(email=email, full_name=full_name, password_hash=hash_password(password))
     db.session.add(user)
     db.session.commit()
     
@@ -57,12 +66,13 @@ def register():
 @jwt_required()
 def profile():
     """
-    Endpoint para obtener perfil del usuario autenticado
+    Endpoint para obtener perfil del usuario autenticado.
+    Con `?large=true` incluye todas sus relaciones, cargadas en un número fijo de consultas.
+    Ambas variantes responden 304 si `If-None-Match` coincide con el ETag actual
     """
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user:
-        return jsonify({"msg": "User not found"}), 404
-    
-    return jsonify({"user": user.serialize()}), 200
+    large = request.args.get('large', 'false').lower() == 'true'
+    if large:
+        # Columns read from the row, not from the identity cache snapshot
+        user = db.session.get(User, current_user.id, populate_existing=True)
+        return conditional_json({"user": user.serialize(large=True)})
+    return user_response(current_user)
@@ -0,0 +1,49 @@
+from decimal import Decimal, InvalidOperation
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, current_user
+from amortization import build_projections
+
+projections_bp = Blueprint('projections', __name__)
+
+KINDS = {'debts': 'debt', 'loans_given': 'loan_given'}
+
+def _what_if_args():
+    extra = Decimal(request.args.get('extra', '0'))
+    lump_sum = Decimal(request.args.get('lump_sum', '0'))
+    if not extra.is_finite() or not lump_sum.is_finite() or extra < 0 or lump_sum < 0:
+        raise ValueError("'extra' and 'lump_sum' must be non-negative amounts")
+    return extra, lump_sum
+
+@projections_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_projections():
+    """
+    Calendario de pagos y fecha de liquidación proyectada de todas las deudas y préstamos
+    pendientes del usuario autenticado. `extra` (sumado a cada cuota) y `lump_sum`
+    (pagado hoy) añaden un escenario hipotético en `what_if`
+    """
+    try:
+        extra, lump_sum = _what_if_args()
+    except (ValueError, InvalidOperation) as e:
+        return jsonify({"msg": str(e) or "Invalid amount"}), 400
+
+    return jsonify({"projections": build_projections(current_user.id, extra=extra, lump_sum=lump_sum)}), 200
+
+@projections_bp.route('/<kind>/<int:obligation_id>', methods=['GET'])
+@jwt_required()
+def get_projection(kind, obligation_id):
+    """
+    Proyección de una deuda (`debts`) o préstamo (`loans_given`) del usuario autenticado
+    """
+    if kind not in KINDS:
+        return jsonify({"msg": "Not found"}), 404
+    try:
+        extra, lump_sum = _what_if_args()
+    except (ValueError, InvalidOperation) as e:
+        return jsonify({"msg": str(e) or "Invalid amount"}), 400
+
+    projections = build_projections(current_user.id, kinds=(KINDS[kind],), obligation_id=obligation_id, extra=extra, lump_sum=lump_sum)
+    obligations = projections[KINDS[kind]]["obligations"]
+    if not obligations:
+        return jsonify({"msg": "Not found"}), 404
+    return jsonify({"projection": obligations[0]}), 200
@@ -0,0 +1,40 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, current_user
+from sqlalchemy import select
+from models import db, Report, ReportType
+from reports import build_report
+from utils import parse_date
+
+reports_bp = Blueprint('reports', __name__)
+
+@reports_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_reports():
+    """
+    Listar los reportes del usuario autenticado
+    """
+    current_user_id = current_user.id
+    reports = db.session.execute(
+        select(Report).where(Report.user_id == current_user_id).order_by(Report.created_at.desc())
+    ).scalars().all()
+    return jsonify({"reports": [report.serialize() for report in reports]}), 200
+
+@reports_bp.route('/', methods=['POST'])
+@jwt_required()
+def generate_report():
+    """
+    Generar (o regenerar) el reporte semanal, mensual o anual que contiene `date`
+    a partir de los agregados por periodo
+    """
+    current_user_id = current_user.id
+    data = request.get_json(silent=True) or {}
+
+    try:
+        report_type = ReportType(data.get('type', ReportType.monthly.value))
+        date = parse_date(data.get('date'))
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    report = build_report(current_user_id, report_type, date)
+    db.session.commit()
+    return jsonify({"report": report.serialize()}), 201
@@ -0,0 +1,91 @@
+import io
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, current_user
+from sqlalchemy import select, tuple_
+from importer import PARSERS, TransactionImporter
+from models import db, Transaction, TransactionType
+from utils import get_pagination_args, parse_date
+
+transactions_bp = Blueprint('transactions', __name__)
+
+@transactions_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_transactions():
+    """
+    Listar las transacciones del usuario autenticado, de la más reciente a la más antigua.
+    Filtros opcionales: `date_from`, `date_to` (ISO 8601), `account_id`, `category_id` y `type`.
+    Paginación por cursor (`?limit=50&after=<id de la última transacción recibida>`)
+    """
+    current_user_id = current_user.id
+
+    try:
+        limit, after = get_pagination_args()
+        date_from = parse_date(request.args.get('date_from'))
+        date_to = parse_date(request.args.get('date_to'))
+        account_id = request.args.get('account_id', type=int)
+        category_id = request.args.get('category_id', type=int)
+        transaction_type = request.args.get('type')
+        transaction_type = TransactionType(transaction_type) if transaction_type else None
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    query = (
+        select(Transaction)
+        .where(Transaction.user_id == current_user_id)
+        .order_by(Transaction.date.desc(), Transaction.id.desc())
+    )
+    if date_from is not None:
+        query = query.where(Transaction.date >= date_from)
+    if date_to is not None:
+        query = query.where(Transaction.date < date_to)
+    if account_id is not None:
+        query = query.where(Transaction.account_id == account_id)
+    if category_id is not None:
+        query = query.where(Transaction.category_id == category_id)
+    if transaction_type is not None:
+        query = query.where(Transaction.type == transaction_type)
+
+    if after is not None:
+        cursor_date = db.session.execute(
+            select(Transaction.date).where(Transaction.id == after, Transaction.user_id == current_user_id)
+        ).scalar_one_or_none()
+        if cursor_date is None:
+            return jsonify({"msg": "Invalid cursor"}), 400
+        query = query.where(tuple_(Transaction.date, Transaction.id) < tuple_(cursor_date, after))
+
+    transactions = db.session.execute(query.limit(limit + 1)).scalars().all()
+    has_more = len(transactions) > limit
+    transactions = transactions[:limit]
+
+    return jsonify({
+        "transactions": [transaction.serialize() for transaction in transactions],
+        "next_after": transactions[-1].id if has_more else None
+    }), 200
+
+@transactions_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_transactions():
+    """
+    Importar transacciones desde un extracto bancario (multipart, campo `file`).
+    Campos opcionales: `format` (csv u ofx), `account`, `income_category`,
+    `expense_category` y `chunk_size`. Las filas inválidas se reportan sin abortar el resto
+    """
+    current_user_id = current_user.id
+    upload = request.files.get('file')
+    if upload is None:
+        return jsonify({"msg": "A file is required"}), 400
+
+    file_format = request.form.get('format') or ('ofx' if (upload.filename or '').lower().endswith('.ofx') else 'csv')
+    if file_format not in PARSERS:
+        return jsonify({"msg": f"Unsupported format: '{file_format}'"}), 400
+
+    chunk_size = request.form.get('chunk_size', 1000, type=int)
+    importer = TransactionImporter(
+        current_user_id,
+        default_account=request.form.get('account'),
+        income_category=request.form.get('income_category'),
+        expense_category=request.form.get('expense_category'),
+        chunk_size=max(1, min(chunk_size, 10000)),
+    )
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', errors='replace', newline='')
+    return jsonify(importer.run(PARSERS[file_format](stream))), 200
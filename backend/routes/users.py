@@ -1,31 +1,89 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, current_user
+from sqlalchemy import select
+from http_cache import cached_json, etag_for
+from identity import forget_user
 from models import db, User
+from serialization import requested_fields, sparse_fields
+from utils import get_pagination_args, hash_password
 
 users_bp = Blueprint('users', __name__)
 
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_BATCH_SIZE = 1000
+
 @users_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_users():
     """
-    Obtener lista de todos los usuarios (solo para usuarios autenticados)
+    Obtener lista de usuarios paginada por cursor sobre `User.id`
+    (`?limit=50&after=<id>`). Con `?format=ndjson` (o `Accept: application/x-ndjson`)
+    se devuelven todos los usuarios en streaming, una fila JSON por línea
+    """
+    try:
+        limit, after = get_pagination_args()
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    query = select(User).order_by(User.id)
+    if after is not None:
+        query = query.where(User.id > after)
+
+    if request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return _stream_users(query)
+
+    users = db.session.execute(query.limit(limit + 1)).scalars().all()
+    has_more = len(users) > limit
+    users = users[:limit]
+
+    # The page only changes when one of its rows changes, or rows are added or removed
+    etag = etag_for('users', limit, after, has_more, [(user.id, user.version) for user in users])
+    return cached_json(('users', limit, after), etag, lambda: {
+        "users": [user.serialize() for user in users],
+        "next_after": users[-1].id if has_more else None
+    })
+
+def _stream_users(query):
+    """
+    Genera la respuesta NDJSON leyendo desde un cursor del lado del servidor
+    en lotes de STREAM_BATCH_SIZE filas, con memoria constante
     """
-    users = User.query.all()
-    return jsonify({
-        "users": [user.serialize() for user in users]
-    }), 200
+    fields = requested_fields()
+
+    def generate():
+        # The generator runs after the request's context variables are gone
+        with sparse_fields(fields):
+            rows = db.session.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE)).scalars()
+            for user in rows:
+                yield current_app.json.dumps(user.serialize()) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
 
 @users_bp.route('/<int:user_id>', methods=['GET'])
 @jwt_required()
 def get_user(user_id):
     """
-    Obtener un usuario específico por ID
+    Obtener un usuario específico por ID. Responde 304 si `If-None-Match` trae su ETag actual
     """
-    user = User.query.get(user_id)
+    user = current_user if current_user.id == user_id else db.session.get(User, user_id)
     if not user:
         return jsonify({"msg": "User not found"}), 404
-    
-    return jsonify({"user": user.serialize()}), 200
+
+    return user_response(user)
+
+def user_response(user):
+    """
+    `{"user": ...}` con el ETag de la versión del usuario; el cuerpo se guarda en caché por versión.
+    La versión se lee de la base de datos: current_user puede ser una copia de la caché de
+    identidad anterior a una modificación hecha en otro worker
+    """
+    version = db.session.scalar(select(User.version).where(User.id == user.id))
+    if version is None:
+        return jsonify({"msg": "User not found"}), 404
+    if version != user.version:
+        user = db.session.get(User, user.id, populate_existing=True)
+        version = user.version
+    return cached_json(('user', user.id), etag_for('user', user.id, version), lambda: {"user": user.serialize()})
 
 @users_bp.route('/<int:user_id>', methods=['PUT'])
 @jwt_required()
@@ -33,15 +91,11 @@ def update_user(user_id):
     """
     Actualizar un usuario específico
     """
-    current_user_id = get_jwt_identity()
-    
     # Solo permitir que los usuarios actualicen su propio perfil
-    if current_user_id != user_id:
+    if current_user.id != user_id:
         return jsonify({"msg": "Unauthorized"}), 403
     
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"msg": "User not found"}), 404
+    user = current_user
     
     # Actualizar campos permitidos
     data = request.get_json()
@@ -55,11 +109,11 @@ def update_user(user_id):
     if 'is_active' in data:
         user.is_active = data['is_active']
     
-    # TODO: Implementar actualización de password con hash
     if 'password' in data:
-        user.password = data['password']  # En producción usar hash
+        user.password_hash = hash_password(data['password'])
     
     db.session.commit()
+    forget_user(user_id)
     return jsonify({"user": user.serialize()}), 200
 
 @users_bp.route('/<int:user_id>', methods=['DELETE'])
@@ -68,17 +122,12 @@ def delete_user(user_id):
     """
     Eliminar un usuario específico
     """
-    current_user_id = get_jwt_identity()
-    
     # Solo permitir que los usuarios eliminen su propio perfil
-    if current_user_id != user_id:
+    if current_user.id != user_id:
         return jsonify({"msg": "Unauthorized"}), 403
     
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"msg": "User not found"}), 404
-    
-    db.session.delete(user)
+    db.session.delete(current_user)
     db.session.commit()
+    forget_user(user_id)
     
     return jsonify({"msg": "User deleted successfully"}), 200
@@ -0,0 +1,90 @@
+"""
+Read-replica routing.
+
+DATABASE_REPLICA_URLS (comma separated) registers each replica as a Flask-SQLAlchemy bind
+named replica_<n>. RoutingSession sends SELECTs to one replica, picked per request,
+while replica reads are enabled on the session: for GET/HEAD requests (setup_routing)
+and inside replica_reads() blocks. Everything else stays on the primary:
+    - flushes, INSERT/UPDATE/DELETE and SELECT ... FOR UPDATE
+    - session.connection() calls
+    - every statement after the session has written anything (read-after-write)
+Replicas lag behind the primary, so a GET right after a write in another request may
+briefly see the previous data.
+"""
+import random
+from contextlib import contextmanager
+from flask import request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_PREFIX = 'replica_'
+REPLICA_READS = 'replica_reads'
+REPLICA_BIND = 'replica_bind'
+WROTE = 'wrote'
+
+class RoutingSession(Session):
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            replica = self._replica()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause):
+        if not self.info.get(REPLICA_READS) or self.info.get(WROTE) or self._flushing:
+            return False
+        return (
+            clause is not None
+            and getattr(clause, 'is_select', False)
+            and getattr(clause, '_for_update_arg', None) is None
+        )
+
+    def _replica(self):
+        if REPLICA_BIND not in self.info:
+            keys = [key for key in self._db.engines if key and key.startswith(REPLICA_PREFIX)]
+            self.info[REPLICA_BIND] = random.choice(keys) if keys else None
+        key = self.info[REPLICA_BIND]
+        return self._db.engines[key] if key else None
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _track_writes(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[WROTE] = True
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _track_flush(session, flush_context):
+    session.info[WROTE] = True
+
+@contextmanager
+def replica_reads(session):
+    """
+    Sends the SELECTs of the block to a replica (unless the session already wrote)
+    """
+    previous = session.info.get(REPLICA_READS, False)
+    session.info[REPLICA_READS] = True
+    try:
+        yield session
+    finally:
+        session.info[REPLICA_READS] = previous
+
+def replica_binds(urls, engine_options):
+    """
+    SQLALCHEMY_BINDS entries for a comma separated list of replica URLs
+    """
+    return {
+        f'{REPLICA_PREFIX}{number}': {'url': url, **engine_options(url)}
+        for number, url in enumerate((url.strip() for url in urls.split(',') if url.strip()), start=1)
+    }
+
+def setup_routing(app, db):
+
+    @app.before_request
+    def route_reads_to_replica():
+        if request.method in ('GET', 'HEAD'):
+            db.session.info[REPLICA_READS] = True
+
+    @app.teardown_request
+    def reset_routing(exception=None):
+        for key in (REPLICA_READS, REPLICA_BIND, WROTE):
+            db.session.info.pop(key, None)
@@ -0,0 +1,147 @@
+"""
+Subscription renewals.
+
+SubscriptionScheduler charges every active subscription whose payment_date has passed:
+it creates the recurring Transaction of each missed period and moves payment_date and
+last_payment_date forward. Work is done in batches, each in its own database transaction:
+
+    1. SELECT the next batch of due subscriptions on the (is_active, payment_date) index,
+       locking the rows with FOR UPDATE SKIP LOCKED where the database supports it
+    2. one UPDATE for the whole batch, guarded by the payment_date that was read
+       (compare-and-swap) and RETURNING the ids it actually advanced
+    3. one executemany INSERT of the charges of those ids, plus the bulk balance,
+       rollup and merchant deltas of ledger.py
+
+Running it twice, or from two workers at once, never charges a period twice: a subscription
+whose payment_date changed after it was read is skipped by the UPDATE, and the
+(subscription_id, date) unique constraint rejects a duplicate charge. A batch that fails
+(e.g. an overdraft on the account) is retried one subscription at a time, and the
+subscriptions that still fail stay due for the next run.
+"""
+from datetime import datetime
+from sqlalchemy import case, select, update
+from sqlalchemy.exc import IntegrityError
+from ledger import (
+    apply_balance_deltas, apply_merchant_deltas, apply_rollup_deltas, balance_deltas, category_types,
+    merchant_deltas, rollup_deltas,
+)
+from models import db, Subscription, Transaction, TransactionType
+from utils import next_payment_date
+
+MAX_CHARGES_PER_RUN = 24
+
+class SubscriptionScheduler:
+
+    def __init__(self, batch_size=1000, now=None):
+        self.batch_size = batch_size
+        self.now = now or datetime.now()
+        self.charged = set()
+        self.transactions = 0
+        self.failed = []
+
+    def run(self):
+        """
+        Charges every due subscription and returns {subscriptions, transactions, failed}
+        """
+        after = (datetime.min, 0)
+        while True:
+            batch = self._due(after)
+            if not batch:
+                break
+            after = (batch[-1].payment_date, batch[-1].id)
+            self._charge(batch)
+            if len(batch) < self.batch_size:
+                break
+        return {"subscriptions": len(self.charged), "transactions": self.transactions, "failed": self.failed}
+
+    def _due(self, after):
+        # Keyset on (payment_date, id) so subscriptions that failed are not selected again in this run
+        return db.session.execute(
+            select(
+                Subscription.id, Subscription.user_id, Subscription.account_id, Subscription.category_id,
+                Subscription.name, Subscription.price, Subscription.frequency, Subscription.payment_date,
+                Subscription.billing_day,
+            )
+            .where(
+                Subscription.is_active.is_(True),
+                Subscription.payment_date <= self.now,
+                Subscription.account_id.is_not(None),
+                Subscription.category_id.is_not(None),
+                (Subscription.payment_date > after[0]) | ((Subscription.payment_date == after[0]) & (Subscription.id > after[1])),
+            )
+            .order_by(Subscription.payment_date, Subscription.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+
+    def _plan(self, subscription):
+        """
+        Returns (charge dates, next payment date) of a due subscription
+        """
+        dates = []
+        date = subscription.payment_date
+        while date <= self.now and len(dates) < MAX_CHARGES_PER_RUN:
+            dates.append(date)
+            date = next_payment_date(date, subscription.frequency, subscription.billing_day)
+        return dates, date
+
+    def _apply(self, connection, batch):
+        plans = {subscription.id: self._plan(subscription) for subscription in batch}
+        table = Subscription.__table__
+        ids = list(plans)
+        advanced = set(connection.execute(
+            update(table)
+            .where(
+                table.c.id.in_(ids),
+                table.c.payment_date == case({s.id: s.payment_date for s in batch}, value=table.c.id),
+            )
+            .values(
+                payment_date=case({id: plan[1] for id, plan in plans.items()}, value=table.c.id),
+                last_payment_date=case({id: plan[0][-1] for id, plan in plans.items()}, value=table.c.id),
+            )
+            .returning(table.c.id)
+        ).scalars())
+
+        rows = [
+            {
+                "user_id": subscription.user_id,
+                "account_id": subscription.account_id,
+                "category_id": subscription.category_id,
+                "subscription_id": subscription.id,
+                "debt_id": None,
+                "loan_given_id": None,
+                "type": TransactionType.subscription,
+                "amount": subscription.price,
+                "description": subscription.name,
+                "date": date,
+                "is_recurring": True,
+            }
+            for subscription in batch if subscription.id in advanced
+            for date in plans[subscription.id][0]
+        ]
+        if rows:
+            connection.execute(Transaction.__table__.insert(), rows)
+            apply_balance_deltas(connection, balance_deltas(rows, category_types(connection, [row["category_id"] for row in rows])))
+            apply_rollup_deltas(connection, rollup_deltas(rows))
+            apply_merchant_deltas(connection, merchant_deltas(rows))
+        return advanced, len(rows)
+
+    def _charge(self, batch):
+        try:
+            charged, transactions = self._apply(db.session.connection(), batch)
+            db.session.commit()
+            self.charged |= charged
+            self.transactions += transactions
+            return
+        except IntegrityError:
+            db.session.rollback()
+
+        for subscription in batch:
+            try:
+                with db.session.begin_nested():
+                    charged, transactions = self._apply(db.session.connection(), [subscription])
+                self.charged |= charged
+                self.transactions += transactions
+            except IntegrityError as e:
+                self.failed.append({"id": subscription.id, "msg": str(e.orig)})
+        db.session.commit()
@@ -0,0 +1,280 @@
+"""
+Seeded generator of realistic synthetic data for load testing.
+
+Each chunk of users is generated in memory and written in one database transaction with
+a few executemany INSERTs per table. Ids come back through INSERT ... RETURNING, so no
+per-row flushes happen. All rows follow the model validators: each non-general transaction
+and each reminder is linked to exactly one entity of its type, and each installment
+belongs to a single debt or loan. Accounts whose random spending outruns their income get
+an opening balance, so the positive_balance check holds. Balances and rollups are applied
+with the ledger bulk helpers.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+import random
+from sqlalchemy import func, select
+from ledger import (
+    apply_balance_deltas, apply_merchant_deltas, apply_rollup_deltas, balance_deltas, merchant_deltas, rollup_deltas,
+)
+from models import (
+    db, Account, AccountType, Category, CategoryType, Debt, Installment, InstallmentTransaction,
+    LoanGiven, Reminder, ReminderType, Subscription, Transaction, TransactionType, User,
+    frequencyType, statusType,
+)
+
+INCOME_CATEGORIES = ["Salary", "Freelance", "Loan repayments"]
+EXPENSE_CATEGORIES = ["Food", "Rent", "Transport", "Entertainment", "Utilities", "Health", "Subscriptions", "Debt payments"]
+GENERAL_EXPENSES = ["Food", "Transport", "Entertainment", "Utilities", "Health"]
+MERCHANTS = {
+    "Food": ["Whole Foods", "Trader Joe's", "Local Market", "Pizza Place", "Sushi Bar"],
+    "Transport": ["Uber", "Metro Card", "Shell", "Parking"],
+    "Entertainment": ["Cinema", "Concert Hall", "Bookstore", "Steam"],
+    "Utilities": ["Electric Co", "Water Utility", "Internet Provider"],
+    "Health": ["Pharmacy", "Dentist", "Gym"],
+}
+SUBSCRIPTIONS = [("Netflix", "15.49"), ("Spotify", "10.99"), ("iCloud", "2.99"), ("Gym membership", "39.00"), ("News", "8.00")]
+
+def _insert(connection, model, rows, returning=False):
+    if not rows:
+        return []
+    table = model.__table__
+    if not returning:
+        connection.execute(table.insert(), rows)
+        return []
+    statement = table.insert().returning(table.c.id, sort_by_parameter_order=True)
+    return connection.execute(statement, rows).scalars().all()
+
+def _month_start(date, offset):
+    month = date.month - 1 + offset
+    return datetime(date.year + month // 12, month % 12 + 1, 1)
+
+class DatasetGenerator:
+    """
+    Generates `users` users with `months` months of history ending today.
+    With months=0 only the users are created
+    """
+
+    def __init__(self, users, months=12, transactions_per_month=60, seed=42, chunk_size=100, password_hash=None):
+        self.users = users
+        self.months = months
+        self.transactions_per_month = transactions_per_month
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.password_hash = password_hash
+        self.now = datetime.now().replace(microsecond=0)
+        self.first_month = _month_start(self.now, -max(months - 1, 0))
+        self.month_spans = []
+        for offset in range(months):
+            month = _month_start(self.first_month, offset)
+            end = min(_month_start(month, 1), self.now)
+            self.month_spans.append((month, max(int((end - month).total_seconds()), 1)))
+
+    def run(self, progress=None):
+        offset = db.session.execute(select(func.coalesce(func.max(User.id), 0))).scalar()
+        created = {"users": 0, "transactions": 0}
+        for start in range(0, self.users, self.chunk_size):
+            count = min(self.chunk_size, self.users - start)
+            created["transactions"] += self._write_chunk(offset + start, count)
+            db.session.commit()
+            created["users"] += count
+            if progress:
+                progress(created)
+        return created
+
+    def _write_chunk(self, offset, count):
+        rng = self.rng
+        connection = db.session.connection()
+
+        user_ids = _insert(connection, User, [{
+            "full_name": f"Test User {offset + i + 1}",
+            "email": f"seed{self.seed}_user{offset + i + 1}@test.com",
+            "password_hash": self.password_hash,
+            "currency": "USD",
+            "created_at": self.first_month,
+        } for i in range(count)], returning=True)
+        if not self.months:
+            return 0
+
+        account_ids = _insert(connection, Account, [{
+            "user_id": user_id, "name": name, "type": account_type, "balance": Decimal(0), "created_at": self.first_month,
+        } for user_id in user_ids for name, account_type in (("Checking", AccountType.bank), ("Wallet", AccountType.cash))], returning=True)
+        accounts = {user_id: account_ids[2 * i:2 * i + 2] for i, user_id in enumerate(user_ids)}
+
+        names = [(name, CategoryType.income) for name in INCOME_CATEGORIES] + [(name, CategoryType.expense) for name in EXPENSE_CATEGORIES]
+        category_ids = _insert(connection, Category, [{
+            "user_id": user_id, "name": name, "type": category_type,
+        } for user_id in user_ids for name, category_type in names], returning=True)
+        categories = {
+            user_id: dict(zip((name for name, _ in names), category_ids[i * len(names):(i + 1) * len(names)]))
+            for i, user_id in enumerate(user_ids)
+        }
+        types = {
+            category_id: category_type
+            for i in range(len(user_ids))
+            for category_id, (_, category_type) in zip(category_ids[i * len(names):(i + 1) * len(names)], names)
+        }
+
+        subscription_rows = []
+        for user_id in user_ids:
+            for name, price in rng.sample(SUBSCRIPTIONS, rng.randint(1, 3)):
+                day = rng.randint(1, 28)
+                paid_this_month = day <= self.now.day
+                subscription_rows.append({
+                    "user_id": user_id, "account_id": accounts[user_id][0], "category_id": categories[user_id]["Subscriptions"], "name": name, "price": Decimal(price), "frequency": frequencyType.monthly,
+                    "payment_date": _month_start(self.now, 1 if paid_this_month else 0).replace(day=day),
+                    "last_payment_date": _month_start(self.now, 0 if paid_this_month else -1).replace(day=day),
+                    "is_active": True, "created_at": self.first_month, "billing_day": day,
+                })
+        subscription_ids = _insert(connection, Subscription, subscription_rows, returning=True)
+
+        debt_rows, loan_rows = [], []
+        for user_id in user_ids:
+            for _ in range(rng.randint(0, 2)):
+                debt_rows.append(self._obligation(user_id, "creditor", rng.choice(["Bank loan", "Car dealer", "Credit union"])))
+            if rng.random() < 0.3:
+                loan_rows.append(self._obligation(user_id, "debtor", rng.choice(["Alex", "Sam", "Jordan", "Taylor"])))
+        debt_ids = _insert(connection, Debt, [row["record"] for row in debt_rows], returning=True)
+        loan_ids = _insert(connection, LoanGiven, [row["record"] for row in loan_rows], returning=True)
+
+        installment_rows = []
+        for key, rows, ids in (("debt_id", debt_rows, debt_ids), ("loan_given_id", loan_rows, loan_ids)):
+            for row, obligation_id in zip(rows, ids):
+                for installment in row["installments"]:
+                    installment_rows.append({**installment, "debt_id": None, "loan_given_id": None, key: obligation_id})
+        installment_ids = _insert(connection, Installment, installment_rows, returning=True)
+
+        transactions = []
+        expenses_per_month = max(self.transactions_per_month - 2, 0)
+        for user_id in user_ids:
+            checking, wallet = accounts[user_id]
+            category = categories[user_id]
+            salary_cents = rng.randrange(250000, 900000)
+            salary = Decimal(salary_cents) / 100
+            budget = salary * Decimal("0.6")
+            expense_cents = salary_cents * 0.6 / max(expenses_per_month, 1)
+            for month, seconds in self.month_spans:
+                transactions.append(self._transaction(user_id, checking, category["Salary"], salary, month, "Payroll"))
+                # The wallet is refilled from income every month so spending is split between both accounts
+                transactions.append(self._transaction(user_id, wallet, category["Freelance"], budget, month, "Cash income"))
+                for name in rng.choices(GENERAL_EXPENSES, k=expenses_per_month):
+                    transactions.append(self._transaction(
+                        user_id, wallet if name != "Utilities" and rng.random() < 0.5 else checking, category[name],
+                        Decimal(int(expense_cents * (0.2 + 1.6 * rng.random())) or 1) / 100,
+                        month + timedelta(seconds=int(seconds * rng.random())), rng.choice(MERCHANTS[name]),
+                    ))
+
+        for row, subscription_id in zip(subscription_rows, subscription_ids):
+            category_id = categories[row["user_id"]]["Subscriptions"]
+            checking = accounts[row["user_id"]][0]
+            for month_index in range(self.months):
+                date = _month_start(self.first_month, month_index).replace(day=row["billing_day"])
+                if date > self.now:
+                    break
+                transactions.append(self._transaction(
+                    row["user_id"], checking, category_id, row["price"], date, row["name"],
+                    type=TransactionType.subscription, subscription_id=subscription_id, is_recurring=True,
+                ))
+
+        payments = []
+        installment_index = 0
+        for key, rows, ids, transaction_type, category_name in (
+            ("debt_id", debt_rows, debt_ids, TransactionType.debt_payment, "Debt payments"),
+            ("loan_given_id", loan_rows, loan_ids, TransactionType.loan_payment, "Loan repayments"),
+        ):
+            for row, obligation_id in zip(rows, ids):
+                user_id = row["record"]["user_id"]
+                for installment in row["installments"]:
+                    installment_id = installment_ids[installment_index]
+                    installment_index += 1
+                    if installment["status"] != statusType.paid:
+                        continue
+                    payments.append((installment_id, installment["amount"], self._transaction(
+                        user_id, accounts[user_id][0], categories[user_id][category_name], installment["amount"],
+                        installment["last_payment_date"], row["name"], type=transaction_type, **{key: obligation_id},
+                    )))
+
+        _insert(connection, Transaction, transactions)
+        payment_ids = _insert(connection, Transaction, [payment for _, _, payment in payments], returning=True)
+        _insert(connection, InstallmentTransaction, [
+            {"installment_id": installment_id, "transaction_id": transaction_id, "amount": amount}
+            for (installment_id, amount, _), transaction_id in zip(payments, payment_ids)
+        ])
+
+        reminders = []
+        for row, subscription_id in zip(subscription_rows, subscription_ids):
+            reminders.append(self._reminder(row["user_id"], ReminderType.subscription, row["name"], row["payment_date"], subscription_id=subscription_id))
+        for key, reminder_type, rows, ids in (
+            ("debt_id", ReminderType.debt, debt_rows, debt_ids),
+            ("loan_given_id", ReminderType.loan_given, loan_rows, loan_ids),
+        ):
+            for row, obligation_id in zip(rows, ids):
+                if row["record"]["payment_date"] is not None:
+                    reminders.append(self._reminder(row["record"]["user_id"], reminder_type, row["name"], row["record"]["payment_date"], **{key: obligation_id}))
+        _insert(connection, Reminder, reminders)
+
+        all_transactions = transactions + [payment for _, _, payment in payments]
+        balances = balance_deltas(all_transactions, types)
+        opening = []
+        for user_id in user_ids:
+            for account_id in accounts[user_id]:
+                if balances[account_id] < 0:
+                    # Random spending outran the income: top the account up so positive_balance holds
+                    opening.append(self._transaction(
+                        user_id, account_id, categories[user_id]["Salary"], -balances[account_id] + 100, self.first_month, "Opening balance",
+                    ))
+        _insert(connection, Transaction, opening)
+        all_transactions += opening
+        apply_balance_deltas(connection, balance_deltas(all_transactions, types))
+        apply_rollup_deltas(connection, rollup_deltas(all_transactions))
+        apply_merchant_deltas(connection, merchant_deltas(all_transactions))
+        return len(all_transactions)
+
+    def _obligation(self, user_id, party_key, name):
+        rng = self.rng
+        count = rng.choice([6, 12, 24])
+        installment_amount = Decimal(rng.randrange(5000, 40000)) / 100
+        first_due = _month_start(self.first_month, rng.randrange(self.months)).replace(day=rng.randint(1, 28))
+        installments = []
+        paid = Decimal(0)
+        for n in range(count):
+            due_date = _month_start(first_due, n).replace(day=first_due.day)
+            is_paid = due_date <= self.now
+            paid += installment_amount if is_paid else 0
+            installments.append({
+                "amount": installment_amount,
+                "due_date": due_date,
+                "last_payment_date": due_date if is_paid else None,
+                "status": statusType.paid if is_paid else statusType.pending,
+            })
+        total = installment_amount * count
+        pending = [installment for installment in installments if installment["status"] == statusType.pending]
+        return {
+            "name": name,
+            "installments": installments,
+            "record": {
+                "user_id": user_id,
+                party_key: name,
+                "total_amount": total,
+                "remaining_amount": total - paid,
+                "last_payment_date": max((i["last_payment_date"] for i in installments if i["last_payment_date"]), default=None),
+                "payment_date": pending[0]["due_date"] if pending else None,
+                "status": statusType.pending if pending else statusType.paid,
+                "created_at": first_due,
+            },
+        }
+
+    def _transaction(self, user_id, account_id, category_id, amount, date, description,
+                     type=TransactionType.general, subscription_id=None, debt_id=None, loan_given_id=None, is_recurring=False):
+        return {
+            "user_id": user_id, "account_id": account_id, "category_id": category_id,
+            "subscription_id": subscription_id, "debt_id": debt_id, "loan_given_id": loan_given_id,
+            "type": type, "amount": amount, "description": description, "date": date, "is_recurring": is_recurring,
+        }
+
+    def _reminder(self, user_id, reminder_type, name, date, debt_id=None, loan_given_id=None, subscription_id=None):
+        return {
+            "user_id": user_id, "debt_id": debt_id, "loan_given_id": loan_given_id, "subscription_id": subscription_id,
+            "type": reminder_type, "title": f"{name} payment due", "description": None,
+            "reminder_date": date - timedelta(days=3), "is_sent": date - timedelta(days=3) < self.now,
+        }
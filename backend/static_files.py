@@ -0,0 +1,134 @@
+"""
+Serving of the built frontend (dist/).
+
+StaticManifest walks the directory once at startup and keeps, for every file, its
+mimetype, a content ETag, its cache policy and the precompressed .br/.gz siblings found
+next to it. Files up to STATIC_MEMORY_LIMIT bytes are also kept in memory, so serving
+them involves no filesystem access at all; larger ones are streamed with send_file.
+
+Cache policy:
+    - fingerprinted files (Vite's assets/ directory, or a name like app-3f9a1c2b.js) never
+      change under the same URL: `public, max-age=31536000, immutable`
+    - index.html (also the fallback of unknown paths, for client side routing): `no-cache`,
+      so browsers revalidate it and pick up new asset URLs after a deploy
+    - any other file: `public, max-age=STATIC_MAX_AGE`
+
+Precompressed variants are sent with Content-Encoding when the client accepts them;
+`flask precompress-static` writes them at maximum quality. Compressible in-memory files
+without them are compressed once while the manifest is built (at the COMPRESS_* levels),
+so compression.py never re-encodes a static file per request and its strong ETag is kept.
+Since the manifest is built once, a new build needs a restart (gunicorn reloads workers on HUP).
+"""
+import hashlib
+import mimetypes
+import os
+import re
+from flask import request
+from werkzeug.exceptions import NotFound
+from werkzeug.utils import send_file
+from compression import COMPRESSIBLE_MIMETYPES, ENCODINGS, compress
+
+INDEX = 'index.html'
+IMMUTABLE_MAX_AGE = 31536000
+VARIANT_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+FINGERPRINT = re.compile(r'[.-][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$')
+
+def is_fingerprinted(relative_path):
+    return relative_path.startswith('assets/') or bool(FINGERPRINT.search(relative_path))
+
+class StaticFile:
+
+    def __init__(self, path, relative_path, memory_limit, compress_min_size=1024, gzip_level=6, brotli_quality=4):
+        self.path = path
+        self.mimetype = mimetypes.guess_type(relative_path)[0] or 'application/octet-stream'
+        self.immutable = is_fingerprinted(relative_path)
+        self.mtime = os.stat(path).st_mtime
+        self.data, self.etag = self._read(path, memory_limit)
+        self.variants = {}
+        for encoding, suffix in VARIANT_SUFFIXES.items():
+            if encoding not in ENCODINGS:
+                continue
+            if os.path.isfile(path + suffix):
+                self.variants[encoding] = (path + suffix, *self._read(path + suffix, memory_limit))
+            elif self.data is not None and len(self.data) >= compress_min_size and self.mimetype in COMPRESSIBLE_MIMETYPES:
+                data = compress(self.data, encoding, gzip_level, brotli_quality)
+                self.variants[encoding] = (None, data, hashlib.blake2b(data, digest_size=16).hexdigest())
+
+    @staticmethod
+    def _read(path, memory_limit):
+        """
+        Returns (bytes if the file fits in memory_limit else None, content ETag)
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        return (data if len(data) <= memory_limit else None), hashlib.blake2b(data, digest_size=16).hexdigest()
+
+class StaticManifest:
+
+    def __init__(self, root, max_age=3600, memory_limit=1024 * 1024, compress_min_size=1024, gzip_level=6, brotli_quality=4):
+        self.root = root
+        self.max_age = max_age
+        self.files = {}
+        if os.path.isdir(root):
+            for directory, _, names in os.walk(root):
+                for name in names:
+                    if os.path.splitext(name)[1] in ('.br', '.gz'):
+                        continue
+                    path = os.path.join(directory, name)
+                    relative_path = os.path.relpath(path, root).replace(os.sep, '/')
+                    self.files[relative_path] = StaticFile(
+                        path, relative_path, memory_limit, compress_min_size, gzip_level, brotli_quality,
+                    )
+        self.index = self.files.get(INDEX)
+
+    def response(self, relative_path, response_class):
+        entry = self.files.get(relative_path) or self.index
+        if entry is None:
+            raise NotFound()
+
+        encoding = None
+        path, data, etag = entry.path, entry.data, entry.etag
+        if entry.variants and request.accept_encodings:
+            encoding = request.accept_encodings.best_match(list(entry.variants))
+            if encoding is not None:
+                path, data, etag = entry.variants[encoding]
+
+        if data is not None:
+            response = response_class(data, mimetype=entry.mimetype)
+            response.set_etag(etag)
+            response.last_modified = entry.mtime
+        else:
+            response = send_file(path, request.environ, mimetype=entry.mimetype, etag=etag, last_modified=entry.mtime, conditional=False)
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        if entry.variants:
+            response.vary.add('Accept-Encoding')
+
+        if entry is self.index:
+            response.cache_control.no_cache = True
+        else:
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE if entry.immutable else self.max_age
+            response.cache_control.immutable = entry.immutable
+        return response.make_conditional(request)
+
+def precompress(root, min_size=1024):
+    """
+    Writes the .br (if brotli is installed) and .gz variants of every compressible file
+    of `root` that is larger than min_size. Returns the number of files written
+    """
+    written = 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if os.path.splitext(name)[1] in ('.br', '.gz'):
+                continue
+            path = os.path.join(directory, name)
+            if mimetypes.guess_type(name)[0] not in COMPRESSIBLE_MIMETYPES or os.path.getsize(path) < min_size:
+                continue
+            with open(path, 'rb') as file:
+                data = file.read()
+            for encoding in ENCODINGS:
+                with open(path + VARIANT_SUFFIXES[encoding], 'wb') as file:
+                    file.write(compress(data, encoding, gzip_level=9, brotli_quality=11))
+                written += 1
+    return written
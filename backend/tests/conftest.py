@@ -0,0 +1,55 @@
+import pytest
+import http_cache
+import identity
+from flask_jwt_extended import create_access_token
+from app import create_app
+from database import db as _db
+from models import User
+
+@pytest.fixture
+def replica_urls():
+    """
+    DATABASE_REPLICA_URLS of the test app, none by default
+    """
+    return ""
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, replica_urls):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", replica_urls)
+    app = create_app({"TESTING": True, "PASSWORD_HASH_WORKERS": "0"})
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+    # Process-wide caches keyed by row id would leak between the databases of different tests
+    for cache in (identity._users, http_cache._responses):
+        cache.clear()
+
+@pytest.fixture
+def db(app):
+    return _db
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def user(db):
+    user = User(full_name="Ana", email="ana@example.com", currency="USD")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+@pytest.fixture
+def headers_for(app):
+    """
+    Builds the Authorization header of a user id
+    """
+    def headers_for(user_id):
+        return {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+    return headers_for
+
+@pytest.fixture
+def auth_headers(user, headers_for):
+    return headers_for(user.id)
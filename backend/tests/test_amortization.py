@@ -0,0 +1,44 @@
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import update
+from amortization import project
+from models import Debt, Installment, statusType
+
+def test_monthly_repeats_keep_the_end_of_month_day():
+    installments = [(datetime(2026, 1, 31), Decimal("100.00"))]
+
+    projection = project(Decimal("400.00"), installments, today=datetime(2026, 1, 1))
+
+    assert [payment["due_date"] for payment in projection["payments"]] == [
+        datetime(2026, 1, 31), datetime(2026, 2, 28), datetime(2026, 3, 31), datetime(2026, 4, 30),
+    ]
+    assert projection["payoff_date"] == datetime(2026, 4, 30)
+    assert projection["unscheduled"] == Decimal("0.00")
+
+def test_repeats_after_a_clamped_last_installment_return_to_the_schedule_day():
+    installments = [(datetime(2026, 1, 31), Decimal("50.00")), (datetime(2026, 2, 28), Decimal("50.00"))]
+
+    projection = project(Decimal("150.00"), installments, today=datetime(2026, 1, 1))
+
+    assert projection["payments"][-1]["due_date"] == datetime(2026, 3, 31)
+
+def test_projection_reads_installments_written_outside_the_session(db, client, user, auth_headers):
+    debt = Debt(user_id=user.id, creditor="Bank", total_amount=Decimal("300.00"), remaining_amount=Decimal("300.00"))
+    db.session.add(debt)
+    db.session.flush()
+    installments = [
+        Installment(debt_id=debt.id, amount=Decimal("100.00"), due_date=datetime(2030, month, 15)) for month in (1, 2, 3)
+    ]
+    db.session.add_all(installments)
+    db.session.commit()
+
+    first = client.get(f"/api/projections/debts/{debt.id}", headers=auth_headers).get_json()["projection"]
+    assert len(first["payments"]) == 3
+
+    # A bulk Core write (another worker, the importer, the overdue sweep...) pays the first installment
+    db.session.execute(update(Installment).where(Installment.id == installments[0].id).values(status=statusType.paid))
+    db.session.execute(update(Debt).where(Debt.id == debt.id).values(remaining_amount=Decimal("200.00")))
+    db.session.commit()
+
+    second = client.get(f"/api/projections/debts/{debt.id}", headers=auth_headers).get_json()["projection"]
+    assert [payment["due_date"][:10] for payment in second["payments"]] == ["2030-02-15", "2030-03-15"]
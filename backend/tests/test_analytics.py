@@ -0,0 +1,54 @@
+from datetime import datetime
+from decimal import Decimal
+from models import Account, AccountType, Category, CategoryType, Transaction, TransactionType, User
+
+def test_offset_aware_bounds_are_accepted(client, auth_headers):
+    response = client.get("/api/analytics/?date_from=2026-01-01T00:00:00Z", headers=auth_headers)
+    assert response.status_code == 200
+
+    response = client.get("/api/analytics/?date_from=2026-01-01T00:00:00%2B00:00&date_to=2026-06-01T00:00:00%2B00:00", headers=auth_headers)
+    assert response.status_code == 200
+
+def test_aware_bounds_are_compared_in_utc(client, auth_headers):
+    # 2026-01-01T02:00+03:00 is 2025-12-31T23:00 UTC, before date_to
+    response = client.get("/api/analytics/?date_from=2026-01-01T02:00:00%2B03:00&date_to=2026-01-01T00:00:00", headers=auth_headers)
+    assert response.status_code == 200
+
+def test_windows_longer_than_the_limit_are_rejected(app, client, auth_headers):
+    app.config["ANALYTICS_MAX_MONTHS"] = 12
+
+    response = client.get("/api/analytics/?date_from=2025-01-01&date_to=2026-01-01", headers=auth_headers)
+    assert response.status_code == 200
+
+    response = client.get("/api/analytics/?date_from=2025-01-01&date_to=2026-01-02", headers=auth_headers)
+    assert response.status_code == 400
+
+def test_end_dates_near_the_last_year_are_rejected(client, auth_headers):
+    response = client.get("/api/analytics/?date_from=9998-06-01&date_to=9999-01-01", headers=auth_headers)
+    assert response.status_code == 200
+
+    for date_to in ("9999-01-02", "9999-12-31T23:59:59"):
+        response = client.get(f"/api/analytics/?date_from=9998-06-01&date_to={date_to}", headers=auth_headers)
+        assert response.status_code == 400
+
+def test_transactions_of_foreign_categories_are_skipped(db, client, user, auth_headers):
+    other = User(full_name="Bea", email="bea@example.com", currency="USD")
+    db.session.add(other)
+    db.session.flush()
+    account = Account(user_id=user.id, name="Main", balance=Decimal("100.00"), type=AccountType.bank)
+    own = Category(user_id=user.id, name="Food", type=CategoryType.expense)
+    foreign = Category(user_id=other.id, name="Salary", type=CategoryType.income)
+    db.session.add_all([account, own, foreign])
+    db.session.flush()
+    for category, amount in ((own, "30.00"), (foreign, "50.00")):
+        db.session.add(Transaction(
+            user_id=user.id, account_id=account.id, category_id=category.id, type=TransactionType.general,
+            amount=Decimal(amount), date=datetime(2026, 2, 10),
+        ))
+    db.session.commit()
+
+    response = client.get("/api/analytics/?date_from=2026-02-01&date_to=2026-03-01", headers=auth_headers)
+
+    assert response.status_code == 200
+    analytics = response.get_json()["analytics"]
+    assert (analytics["income"], analytics["expense"]) == ("0.00", "30.00")
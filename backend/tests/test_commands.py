@@ -0,0 +1,61 @@
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import insert, select, update
+from models import Account, AccountType, Category, CategoryType, MerchantRollup, Transaction, TransactionRollup, TransactionType
+from seed import DatasetGenerator
+
+def _transaction(account, category, amount):
+    return {
+        "user_id": account.user_id, "account_id": account.id, "category_id": category.id, "type": TransactionType.general,
+        "amount": Decimal(amount), "date": datetime(2026, 1, 10), "is_recurring": False,
+    }
+
+def _aggregates(db, model, key):
+    rows = db.session.execute(select(*(getattr(model, column) for column in key), model.total, model.count).where(model.count != 0))
+    return {tuple(row[:-2]): (row[-2], row[-1]) for row in rows}
+
+def test_rebuild_rollups_matches_the_incremental_rollups(app, db):
+    DatasetGenerator(3, months=3, transactions_per_month=30, password_hash="x", seed=7).run()
+    # Edits and deletes go through the listeners, which leave emptied buckets behind
+    transactions = db.session.scalars(select(Transaction).order_by(Transaction.id).limit(6)).all()
+    transactions[0].amount += 1
+    transactions[1].date = datetime(2020, 2, 29)
+    transactions[2].description = "Renamed"
+    for transaction in transactions[3:]:
+        db.session.delete(transaction)
+    db.session.commit()
+    rollup_key = ("user_id", "account_id", "category_id", "granularity", "bucket")
+    merchant_key = ("user_id", "category_id", "description", "bucket")
+    incremental = _aggregates(db, TransactionRollup, rollup_key), _aggregates(db, MerchantRollup, merchant_key)
+    assert incremental[0] and incremental[1]
+
+    result = app.test_cli_runner().invoke(args=["rebuild-rollups", "--chunk-size", "50"])
+
+    assert result.exit_code == 0, result.output
+    db.session.expire_all()
+    assert (_aggregates(db, TransactionRollup, rollup_key), _aggregates(db, MerchantRollup, merchant_key)) == incremental
+
+def test_reconcile_fixes_drift_and_skips_negative_ledgers(app, db, user):
+    accounts = [Account(user_id=user.id, name=name, balance=Decimal("0.00"), type=AccountType.bank) for name in ("A", "B", "C")]
+    salary = Category(user_id=user.id, name="Salary", type=CategoryType.income)
+    food = Category(user_id=user.id, name="Food", type=CategoryType.expense)
+    db.session.add_all([*accounts, salary, food])
+    db.session.commit()
+    a, b, c = accounts
+    # Core inserts bypass the ledger listeners, so the balances drift from the transactions
+    db.session.execute(insert(Transaction), [
+        _transaction(a, salary, "100.00"),
+        _transaction(a, food, "40.00"),
+        _transaction(b, food, "25.00"),
+    ])
+    db.session.execute(update(Account).where(Account.id == c.id).values(balance=Decimal("10.00")))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["reconcile-balances", "--fix", "--chunk-size", "2"])
+
+    assert result.exit_code == 0, result.output
+    assert f"Account {b.id} balance 0.00 ledger -25.00 drift 25.00" in result.output
+    assert "Checked 3 accounts, 2 drifted, fixed" in result.output
+    assert f"1 accounts have a negative ledger and were not changed: {b.id}" in result.stderr
+    balances = dict(db.session.execute(select(Account.name, Account.balance)).all())
+    assert balances == {"A": Decimal("60.00"), "B": Decimal("0.00"), "C": Decimal("0.00")}
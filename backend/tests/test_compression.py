@@ -0,0 +1,35 @@
+import gzip
+import brotli
+import pytest
+from models import User
+
+@pytest.fixture
+def users(db, user):
+    db.session.add_all([User(full_name=f"User {number}", email=f"user{number}@example.com", currency="USD") for number in range(20)])
+    db.session.commit()
+
+@pytest.mark.parametrize("encoding, decompress", [("br", brotli.decompress), ("gzip", gzip.decompress)])
+def test_accepted_encoding_compresses_the_body(client, users, auth_headers, encoding, decompress):
+    plain = client.get("/api/users/?limit=50", headers=auth_headers)
+    assert "Content-Encoding" not in plain.headers
+    assert len(plain.data) >= 1024
+
+    response = client.get("/api/users/?limit=50", headers={**auth_headers, "Accept-Encoding": f"{encoding}, identity;q=0.5"})
+
+    assert response.headers["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert decompress(response.data) == plain.data
+    # Same version, different bytes: the strong ETag of the identity body becomes weak
+    assert response.headers["ETag"] == f'W/{plain.headers["ETag"]}'
+
+    revalidated = client.get(
+        "/api/users/?limit=50",
+        headers={**auth_headers, "Accept-Encoding": encoding, "If-None-Match": response.headers["ETag"]},
+    )
+    assert revalidated.status_code == 304
+
+def test_small_bodies_are_sent_as_is(client, user, auth_headers):
+    response = client.get(f"/api/users/{user.id}", headers={**auth_headers, "Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
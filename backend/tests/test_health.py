@@ -0,0 +1,18 @@
+from app import create_app
+
+def test_pool_metrics_are_disabled_by_default(client):
+    assert client.get("/api/health/pool").status_code == 404
+
+def test_pool_metrics_require_an_admin_token(app, auth_headers):
+    metrics_app = create_app({"POOL_METRICS": True, "SQLALCHEMY_DATABASE_URI": app.config["SQLALCHEMY_DATABASE_URI"]})
+    client = metrics_app.test_client()
+
+    assert client.get("/api/health/pool").status_code == 401
+    assert client.get("/api/health/pool", headers=auth_headers).status_code == 403
+
+    result = app.test_cli_runner().invoke(args=["set-admin", "ana@example.com"])
+    assert result.exit_code == 0, result.output
+    assert client.get("/api/health/pool", headers=auth_headers).status_code == 200
+
+    app.test_cli_runner().invoke(args=["set-admin", "ana@example.com", "--revoke"])
+    assert client.get("/api/health/pool", headers=auth_headers).status_code == 403
@@ -0,0 +1,18 @@
+from models import User
+
+def test_self_etag_follows_writes_made_by_other_workers(db, client, user, auth_headers):
+
+    first = client.get(f"/api/users/{user.id}", headers=auth_headers)
+    assert first.status_code == 200
+
+    # Another worker renames the user: this process keeps its identity cache entry
+    db.session.execute(db.update(User).where(User.id == user.id).values(full_name="Ana María"))
+    db.session.commit()
+
+    second = client.get(f"/api/users/{user.id}", headers={**auth_headers, "If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.get_json()["user"]["full_name"] == "Ana María"
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+    profile = client.get("/api/auth/profile", headers={**auth_headers, "If-None-Match": second.headers["ETag"]})
+    assert profile.status_code == 304
@@ -0,0 +1,24 @@
+from flask import Blueprint
+from models import User
+from utils import admin_required
+
+def test_admin_required_rejects_inactive_user(app, db, user, auth_headers):
+    bp = Blueprint("admin_only", __name__)
+
+    @bp.route("/admin-only")
+    @admin_required
+    def admin_only():
+        return {"ok": True}
+
+    app.register_blueprint(bp)
+    client = app.test_client()
+    user.is_admin = True
+    db.session.commit()
+
+    assert client.get("/admin-only", headers=auth_headers).status_code == 200
+
+    # Deactivated by another worker: this process still has the user in its identity cache
+    db.session.execute(db.update(User).where(User.id == user.id).values(is_active=False))
+    db.session.commit()
+
+    assert client.get("/admin-only", headers=auth_headers).status_code == 403
@@ -0,0 +1,110 @@
+import io
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import select
+from importer import TransactionImporter, parse_csv, parse_ofx
+from models import Account, AccountType, Category, CategoryType, MerchantRollup, ReportType, Transaction, TransactionRollup
+
+def _setup(db, user, balance="100.00"):
+    account = Account(user_id=user.id, name="Main", balance=Decimal(balance), type=AccountType.bank)
+    food = Category(user_id=user.id, name="Food", type=CategoryType.expense)
+    salary = Category(user_id=user.id, name="Salary", type=CategoryType.income)
+    db.session.add_all([account, food, salary])
+    db.session.commit()
+    return account, food, salary
+
+def _monthly_rollups(db, user):
+    rows = db.session.execute(
+        select(TransactionRollup.category_id, TransactionRollup.bucket, TransactionRollup.total, TransactionRollup.count)
+        .where(TransactionRollup.user_id == user.id, TransactionRollup.granularity == ReportType.monthly)
+    ).all()
+    return {(category_id, bucket): (total, count) for category_id, bucket, total, count in rows}
+
+def test_csv_import_updates_balance_and_rollups(db, client, user, auth_headers):
+    account, food, salary = _setup(db, user)
+    data = (
+        "date,amount,description,account,category\n"
+        "2026-01-05,50.00,Market,Main,Food\n"
+        "2026-01-20T10:00:00+02:00,1000,Payroll,Main,Salary\n"
+    )
+
+    response = client.post(
+        "/api/transactions/import",
+        data={"file": (io.BytesIO(data.encode()), "export.csv")},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.get_json() == {"imported": 2, "error_count": 0, "errors": []}
+    assert db.session.get(Account, account.id, populate_existing=True).balance == Decimal("1050.00")
+    dates = db.session.scalars(select(Transaction.date).order_by(Transaction.date)).all()
+    assert dates == [datetime(2026, 1, 5), datetime(2026, 1, 20, 8, 0)]
+    assert _monthly_rollups(db, user) == {
+        (food.id, datetime(2026, 1, 1)): (Decimal("50.00"), 1),
+        (salary.id, datetime(2026, 1, 1)): (Decimal("1000.00"), 1),
+    }
+    merchants = db.session.execute(select(MerchantRollup.description, MerchantRollup.total)).all()
+    assert sorted(merchants) == [("Market", Decimal("50.00")), ("Payroll", Decimal("1000.00"))]
+
+def test_ofx_import_uses_the_sign_and_the_offset(db, user):
+    account, food, salary = _setup(db, user)
+    data = io.StringIO(
+        "<OFX><BANKTRANLIST>\n"
+        "<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>20260203120000.000[-5:EST]\n<TRNAMT>-25.50\n<NAME>Grocer\n</STMTTRN>\n"
+        "<STMTTRN>\n<TRNTYPE>CREDIT\n<DTPOSTED>20260210\n<TRNAMT>200.00\n<MEMO>Refund\n</STMTTRN>\n"
+        "</BANKTRANLIST></OFX>\n"
+    )
+    importer = TransactionImporter(user.id, default_account="Main", income_category="Salary", expense_category="Food")
+
+    result = importer.run(parse_ofx(data))
+
+    assert result == {"imported": 2, "error_count": 0, "errors": []}
+    assert db.session.get(Account, account.id, populate_existing=True).balance == Decimal("274.50")
+    rows = db.session.execute(select(Transaction.category_id, Transaction.amount, Transaction.date).order_by(Transaction.date)).all()
+    assert rows == [
+        (food.id, Decimal("25.50"), datetime(2026, 2, 3, 17, 0)),
+        (salary.id, Decimal("200.00"), datetime(2026, 2, 10)),
+    ]
+
+def test_invalid_rows_are_reported_without_aborting_the_rest(db, user):
+    account, food, salary = _setup(db, user)
+    data = io.StringIO(
+        "date,amount,description,account,category\n"
+        "2026-01-05,abc,Market,Main,Food\n"
+        "2026-01-06,NaN,Market,Main,Food\n"
+        "not a date,10,Market,Main,Food\n"
+        "2026-01-07,10,Market,Main,Food\n"
+    )
+
+    result = TransactionImporter(user.id).run(parse_csv(data))
+
+    assert result["imported"] == 1
+    assert result["errors"] == [
+        {"line": 2, "msg": "Invalid amount: 'abc'"},
+        {"line": 3, "msg": "Invalid amount: 'NaN'"},
+        {"line": 4, "msg": "Invalid date: 'not a date'"},
+    ]
+    assert db.session.get(Account, account.id, populate_existing=True).balance == Decimal("90.00")
+
+def test_overdraft_row_falls_back_to_savepoints(db, user):
+    account, food, salary = _setup(db, user)
+    data = io.StringIO(
+        "date,amount,description,account,category\n"
+        "2026-03-01,30,Market,Main,Food\n"
+        "2026-03-02,500,Laptop,Main,Food\n"
+        "2026-03-03,10,Bonus,Main,Salary\n"
+    )
+
+    result = TransactionImporter(user.id, chunk_size=10).run(parse_csv(data))
+
+    assert result == {
+        "imported": 2,
+        "error_count": 1,
+        "errors": [{"line": 3, "msg": "Account balance would go negative"}],
+    }
+    assert db.session.get(Account, account.id, populate_existing=True).balance == Decimal("80.00")
+    assert _monthly_rollups(db, user) == {
+        (food.id, datetime(2026, 3, 1)): (Decimal("30.00"), 1),
+        (salary.id, datetime(2026, 3, 1)): (Decimal("10.00"), 1),
+    }
+    assert sorted(db.session.scalars(select(Transaction.description)).all()) == ["Bonus", "Market"]
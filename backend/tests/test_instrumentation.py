@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import create_app
+from instrumentation import _handle_error
+
+def test_failed_statements_do_not_leak_start_times(app, db):
+    instrumented = create_app({"SQL_INSTRUMENTATION": True, "SQLALCHEMY_DATABASE_URI": app.config["SQLALCHEMY_DATABASE_URI"]})
+    with instrumented.app_context():
+        with db.engine.connect() as connection:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    connection.execute(text("SELECT * FROM missing_table"))
+            connection.execute(text("SELECT 1"))
+            assert connection.info.get('query_start_time') == []
+
+def test_errors_without_a_cursor_keep_the_stack(app, db):
+    with db.engine.connect() as connection:
+        connection.info['query_start_time'] = [1.0]
+        # Connect or cursor creation failures: before_cursor_execute never pushed a start time
+        for context in (None, SimpleNamespace(cursor=None)):
+            _handle_error(SimpleNamespace(connection=connection, execution_context=context))
+        assert connection.info['query_start_time'] == [1.0]
+
+        _handle_error(SimpleNamespace(connection=connection, execution_context=SimpleNamespace(cursor=object())))
+        assert connection.info['query_start_time'] == []
@@ -0,0 +1,96 @@
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from sqlalchemy import select
+from models import (
+    Account, AccountType, Category, CategoryType, MerchantRollup, ReportType, Transaction, TransactionRollup, TransactionType,
+)
+
+@pytest.fixture
+def books(db, user):
+    main = Account(user_id=user.id, name="Main", balance=Decimal("100.00"), type=AccountType.bank)
+    savings = Account(user_id=user.id, name="Savings", balance=Decimal("50.00"), type=AccountType.bank)
+    food = Category(user_id=user.id, name="Food", type=CategoryType.expense)
+    salary = Category(user_id=user.id, name="Salary", type=CategoryType.income)
+    db.session.add_all([main, savings, food, salary])
+    db.session.commit()
+    return main, savings, food, salary
+
+def _add(db, account, category, amount, date, description="Market"):
+    transaction = Transaction(
+        user_id=account.user_id, account_id=account.id, category_id=category.id, type=TransactionType.general,
+        amount=Decimal(amount), date=date, description=description,
+    )
+    db.session.add(transaction)
+    db.session.commit()
+    return transaction
+
+def _balances(db):
+    return dict(db.session.execute(select(Account.name, Account.balance)).all())
+
+def _rollups(db):
+    rows = db.session.execute(
+        select(TransactionRollup.account_id, TransactionRollup.category_id, TransactionRollup.bucket, TransactionRollup.total, TransactionRollup.count)
+        .where(TransactionRollup.granularity == ReportType.monthly, TransactionRollup.count != 0)
+    ).all()
+    return {(account_id, category_id, bucket): (total, count) for account_id, category_id, bucket, total, count in rows}
+
+def _weekly_total(db):
+    return db.session.scalar(
+        select(TransactionRollup.total).where(TransactionRollup.granularity == ReportType.weekly, TransactionRollup.count != 0)
+    )
+
+def _merchants(db):
+    rows = db.session.execute(
+        select(MerchantRollup.category_id, MerchantRollup.description, MerchantRollup.bucket, MerchantRollup.total, MerchantRollup.count)
+        .where(MerchantRollup.count != 0)
+    ).all()
+    return {(category_id, description, bucket): (total, count) for category_id, description, bucket, total, count in rows}
+
+def test_insert_updates_balance_and_rollups(db, books):
+    main, savings, food, salary = books
+
+    _add(db, main, food, "30.00", datetime(2026, 3, 11, 9, 30))
+
+    assert _balances(db) == {"Main": Decimal("70.00"), "Savings": Decimal("50.00")}
+    assert _rollups(db) == {(main.id, food.id, datetime(2026, 3, 1)): (Decimal("30.00"), 1)}
+    assert _weekly_total(db) == Decimal("30.00")
+    assert _merchants(db) == {(food.id, "Market", datetime(2026, 3, 1)): (Decimal("30.00"), 1)}
+
+def test_amount_change_applies_the_difference(db, books):
+    main, savings, food, salary = books
+    transaction = _add(db, main, food, "30.00", datetime(2026, 3, 11))
+
+    transaction.amount = Decimal("45.00")
+    db.session.commit()
+
+    assert _balances(db) == {"Main": Decimal("55.00"), "Savings": Decimal("50.00")}
+    assert _rollups(db) == {(main.id, food.id, datetime(2026, 3, 1)): (Decimal("45.00"), 1)}
+    assert _merchants(db) == {(food.id, "Market", datetime(2026, 3, 1)): (Decimal("45.00"), 1)}
+
+def test_moving_account_category_and_date_moves_the_totals(db, books):
+    main, savings, food, salary = books
+    transaction = _add(db, main, food, "30.00", datetime(2026, 3, 11))
+
+    transaction.account_id = savings.id
+    transaction.category_id = salary.id
+    transaction.date = datetime(2026, 4, 2)
+    transaction.description = "Refund"
+    db.session.commit()
+
+    # The expense is undone on Main and the income is added to Savings
+    assert _balances(db) == {"Main": Decimal("100.00"), "Savings": Decimal("80.00")}
+    assert _rollups(db) == {(savings.id, salary.id, datetime(2026, 4, 1)): (Decimal("30.00"), 1)}
+    assert _merchants(db) == {(salary.id, "Refund", datetime(2026, 4, 1)): (Decimal("30.00"), 1)}
+
+def test_delete_reverts_balance_and_rollups(db, books):
+    main, savings, food, salary = books
+    transaction = _add(db, main, food, "30.00", datetime(2026, 3, 11))
+    _add(db, main, food, "5.00", datetime(2026, 3, 12))
+
+    db.session.delete(transaction)
+    db.session.commit()
+
+    assert _balances(db) == {"Main": Decimal("95.00"), "Savings": Decimal("50.00")}
+    assert _rollups(db) == {(main.id, food.id, datetime(2026, 3, 1)): (Decimal("5.00"), 1)}
+    assert _merchants(db) == {(food.id, "Market", datetime(2026, 3, 1)): (Decimal("5.00"), 1)}
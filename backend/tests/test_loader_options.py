@@ -0,0 +1,45 @@
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event, select
+from models import User
+from seed import DatasetGenerator
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def _serialize_fresh(db, user_id):
+    db.session.expunge_all()
+    with count_queries(db.engine) as statements:
+        data = db.session.get(User, user_id).serialize(large=True)
+    return data, len(statements)
+
+@pytest.mark.parametrize("transactions_per_month", [5, 60])
+def test_large_user_serialization_runs_a_fixed_number_of_queries(db, transactions_per_month):
+    DatasetGenerator(3, months=3, transactions_per_month=transactions_per_month, password_hash="x", seed=7).run()
+    user_id = db.session.scalars(select(User.id).order_by(User.id)).first()
+
+    data, queries = _serialize_fresh(db, user_id)
+
+    assert data["transactions"] and data["accounts"] and data["categories"]
+    # The user, the eager_load() SELECT and one selectin query per collection (8),
+    # whatever the number of rows
+    assert queries == 10
+
+def test_serializing_twice_does_not_reload(db):
+    DatasetGenerator(1, months=1, transactions_per_month=5, password_hash="x", seed=7).run()
+    user = db.session.scalars(select(User)).first()
+    user.serialize(large=True)
+
+    with count_queries(db.engine) as statements:
+        user.serialize(large=True)
+    assert statements == []
@@ -0,0 +1,61 @@
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from sqlalchemy import select
+from models import Debt, Installment, LoanGiven, statusType
+from overdue import sweep_overdue
+
+NOW = datetime(2026, 6, 1, 12, 0)
+PAST = datetime(2026, 5, 31)
+FUTURE = datetime(2026, 6, 2)
+
+@pytest.fixture
+def pending(db, user):
+    """
+    Rows on both sides of NOW, plus a paid one in the past and a debt without payment date
+    """
+    debts = [
+        Debt(user_id=user.id, creditor=name, total_amount=Decimal("100.00"), remaining_amount=Decimal("100.00"), payment_date=date, status=status)
+        for name, date, status in (
+            ("past", PAST, statusType.pending), ("future", FUTURE, statusType.pending),
+            ("paid", PAST, statusType.paid), ("undated", None, statusType.pending),
+        )
+    ]
+    loans = [
+        LoanGiven(user_id=user.id, debtor=name, total_amount=Decimal("50.00"), remaining_amount=Decimal("50.00"), payment_date=date)
+        for name, date in (("past", PAST), ("future", FUTURE))
+    ]
+    db.session.add_all([*debts, *loans])
+    db.session.flush()
+    db.session.add_all([
+        Installment(debt_id=debts[0].id, amount=Decimal("10.00"), due_date=datetime(2026, month, 1), status=status)
+        for month, status in ((3, statusType.pending), (4, statusType.pending), (5, statusType.paid), (7, statusType.pending))
+    ])
+    db.session.commit()
+
+def _statuses(db, model, label):
+    return dict(db.session.execute(select(label, model.status).order_by(model.id)).all())
+
+def test_only_rows_past_their_date_become_overdue(db, pending):
+    swept = sweep_overdue(now=NOW)
+
+    assert swept == {"installment": 2, "debt": 1, "loan_given": 1}
+    assert _statuses(db, Debt, Debt.creditor) == {
+        "past": statusType.overdue, "future": statusType.pending, "paid": statusType.paid, "undated": statusType.pending,
+    }
+    assert _statuses(db, LoanGiven, LoanGiven.debtor) == {"past": statusType.overdue, "future": statusType.pending}
+    assert _statuses(db, Installment, Installment.due_date) == {
+        datetime(2026, 3, 1): statusType.overdue,
+        datetime(2026, 4, 1): statusType.overdue,
+        datetime(2026, 5, 1): statusType.paid,
+        datetime(2026, 7, 1): statusType.pending,
+    }
+
+def test_a_second_sweep_changes_nothing(db, pending):
+    sweep_overdue(now=NOW)
+
+    assert sweep_overdue(now=NOW) == {"installment": 0, "debt": 0, "loan_given": 0}
+
+def test_single_row_chunks_sweep_the_whole_backlog(db, pending):
+    assert sweep_overdue(now=NOW, chunk_size=1) == {"installment": 2, "debt": 1, "loan_given": 1}
+    assert db.session.scalar(select(Installment.id).where(Installment.status == statusType.pending, Installment.due_date < NOW)) is None
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from sqlalchemy import select, text, update
+from models import Debt, Reminder, ReminderType
+from reminders import ReminderDispatcher
+
+def _plan(db, statement):
+    sql = str(statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    return " ".join(row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+class ListSink:
+    """
+    Collects the delivered reminders
+    """
+
+    def __init__(self):
+        self.reminders = []
+
+    def __call__(self, reminders):
+        self.reminders += reminders
+        return [reminder["id"] for reminder in reminders]
+
+@pytest.fixture
+def reminders(db, user):
+    debt = Debt(user_id=user.id, creditor="Bank", total_amount=Decimal("100.00"), remaining_amount=Decimal("100.00"))
+    db.session.add(debt)
+    db.session.flush()
+    now = datetime.now()
+    due, upcoming = [
+        Reminder(user_id=user.id, debt_id=debt.id, type=ReminderType.debt, title=title, reminder_date=date)
+        for title, date in (("Due", now - timedelta(hours=1)), ("Upcoming", now + timedelta(days=1)))
+    ]
+    db.session.add_all([due, upcoming])
+    db.session.commit()
+    return due, upcoming
+
+def test_due_scan_uses_partial_index(db):
+    plan = _plan(db, ReminderDispatcher(sink=None)._candidates(datetime(2026, 1, 1)))
+    assert "USING INDEX ix_reminder_unsent_reminder_date" in plan
+
+def test_dispatch_delivers_due_reminders_once(db, reminders):
+    due, upcoming = reminders
+    sink = ListSink()
+
+    assert ReminderDispatcher(sink).run() == {"sent": 1, "failed": 0}
+    assert [(reminder["id"], reminder["email"]) for reminder in sink.reminders] == [(due.id, "ana@example.com")]
+    row = db.session.execute(
+        select(Reminder.is_sent, Reminder.sent_at, Reminder.locked_by).where(Reminder.id == due.id)
+    ).one()
+    assert row.is_sent and row.sent_at is not None and row.locked_by is None
+    assert db.session.scalar(select(Reminder.is_sent).where(Reminder.id == upcoming.id)) is False
+
+    assert ReminderDispatcher(ListSink()).run() == {"sent": 0, "failed": 0}
+
+def test_expired_leases_are_taken_over(db, reminders):
+    due, upcoming = reminders
+    held = {"locked_by": "other", "locked_until": datetime.now() + timedelta(minutes=5)}
+    db.session.execute(update(Reminder).where(Reminder.id == due.id).values(**held))
+    db.session.commit()
+
+    assert ReminderDispatcher(ListSink()).run() == {"sent": 0, "failed": 0}
+
+    db.session.execute(update(Reminder).where(Reminder.id == due.id).values(locked_until=datetime.now() - timedelta(seconds=1)))
+    db.session.commit()
+    sink = ListSink()
+
+    assert ReminderDispatcher(sink).run() == {"sent": 1, "failed": 0}
+    assert [reminder["id"] for reminder in sink.reminders] == [due.id]
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import insert, select
+from models import User
+from routing import replica_reads
+
+@pytest.fixture
+def replica_urls(tmp_path):
+    return f"sqlite:///{tmp_path / 'replica.db'}"
+
+@pytest.fixture
+def replica(db):
+    """
+    Replica engine with the schema and a different user row than the primary. Both are
+    written outside the session, which would otherwise keep every read on the primary
+    """
+    engine = db.engines["replica_1"]
+    db.Model.metadata.create_all(engine)
+    for target, name in ((db.engine, "Ana"), (engine, "Replica")):
+        with target.begin() as connection:
+            connection.execute(insert(User).values(id=1, full_name=name, email="ana@example.com", currency="USD"))
+    yield engine
+    # Flask-SQLAlchemy keeps a MetaData per bind key on the shared extension; the apps of
+    # other tests have no replica bind and their create_all() would fail on it
+    db.metadatas.pop("replica_1", None)
+
+def _names(engine):
+    with engine.connect() as connection:
+        return connection.scalars(select(User.full_name).order_by(User.id)).all()
+
+def test_selects_go_to_the_replica_only_inside_replica_reads(db, replica):
+    assert db.session.scalar(select(User.full_name)) == "Ana"
+
+    with replica_reads(db.session):
+        assert db.session.scalar(select(User.full_name)) == "Replica"
+        # SELECT ... FOR UPDATE locks rows, so it stays on the primary
+        assert db.session.scalar(select(User.full_name).with_for_update()) == "Ana"
+
+    assert db.session.scalar(select(User.full_name)) == "Ana"
+
+def test_writes_go_to_the_primary(db, replica):
+    with replica_reads(db.session):
+        db.session.add(User(full_name="Bea", email="bea@example.com", currency="EUR"))
+        db.session.commit()
+
+    assert _names(db.engine) == ["Ana", "Bea"]
+    assert _names(replica) == ["Replica"]
+
+def test_reads_after_a_write_stay_on_the_primary(db, replica):
+    with replica_reads(db.session):
+        db.session.add(User(full_name="Bea", email="bea@example.com", currency="EUR"))
+        db.session.flush()
+
+        assert db.session.scalars(select(User.full_name).order_by(User.id)).all() == ["Ana", "Bea"]
+
+def test_get_requests_read_from_the_replica(db, client, replica, headers_for):
+    response = client.get("/api/users/1", headers=headers_for(1))
+
+    assert response.get_json()["user"]["full_name"] == "Replica"
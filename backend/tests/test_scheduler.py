@@ -0,0 +1,42 @@
+from datetime import datetime
+from decimal import Decimal
+from models import Account, AccountType, Category, CategoryType, Subscription, Transaction, frequencyType
+from scheduler import SubscriptionScheduler
+from utils import next_payment_date
+
+def test_monthly_date_returns_to_anchor_day_after_short_month():
+    february = next_payment_date(datetime(2026, 1, 31), frequencyType.monthly, 31)
+    march = next_payment_date(february, frequencyType.monthly, 31)
+    april = next_payment_date(march, frequencyType.monthly, 31)
+
+    assert february == datetime(2026, 2, 28)
+    assert march == datetime(2026, 3, 31)
+    assert april == datetime(2026, 4, 30)
+
+def test_yearly_date_returns_to_leap_day():
+    date = datetime(2024, 2, 29)
+    for _ in range(4):
+        date = next_payment_date(date, frequencyType.yearly, 29)
+    assert date == datetime(2028, 2, 29)
+
+def test_scheduler_charges_on_the_billing_day(db, user):
+    account = Account(user_id=user.id, name="Main", balance=Decimal("1000.00"), type=AccountType.bank)
+    category = Category(user_id=user.id, name="Subscriptions", type=CategoryType.expense)
+    db.session.add_all([account, category])
+    db.session.flush()
+    subscription = Subscription(
+        user_id=user.id, account_id=account.id, category_id=category.id, name="Gym", price=Decimal("30.00"),
+        frequency=frequencyType.monthly, payment_date=datetime(2026, 1, 31),
+    )
+    db.session.add(subscription)
+    db.session.commit()
+    assert subscription.billing_day == 31
+
+    SubscriptionScheduler(now=datetime(2026, 4, 1)).run()
+
+    dates = db.session.scalars(
+        db.select(Transaction.date).where(Transaction.subscription_id == subscription.id).order_by(Transaction.date)
+    ).all()
+    assert dates == [datetime(2026, 1, 31), datetime(2026, 2, 28), datetime(2026, 3, 31)]
+    db.session.refresh(subscription)
+    assert subscription.payment_date == datetime(2026, 4, 30)
@@ -0,0 +1,41 @@
+import enum
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+def test_fields_limit_the_serialized_keys(client, user, auth_headers):
+    response = client.get(f"/api/users/{user.id}?fields=id,%20email", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.get_json() == {"user": {"id": user.id, "email": "ana@example.com"}}
+
+    full = client.get(f"/api/users/{user.id}", headers=auth_headers).get_json()["user"]
+    assert {"id", "email", "full_name", "currency"} <= set(full)
+
+def test_fields_apply_to_streamed_rows(client, user, auth_headers):
+    response = client.get("/api/users/?format=ndjson&fields=email", headers=auth_headers)
+
+    assert [json.loads(line) for line in response.get_data(as_text=True).splitlines()] == [{"email": "ana@example.com"}]
+
+def test_unknown_fields_are_rejected(client, user, auth_headers):
+    response = client.get(f"/api/users/{user.id}?fields=id,password_hash_typo", headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"msg": "Unknown fields: password_hash_typo"}
+
+class Color(enum.Enum):
+    red = "red"
+
+def test_orjson_matches_the_default_provider(app):
+    created = datetime(2026, 3, 4, 5, 6, 7, 890)
+    aware = datetime(2026, 3, 4, 5, 6, tzinfo=timezone.utc)
+    payload = {"z": Decimal("12.50"), "a": {"y": [Decimal("-0.01"), created], "b": Color.red}, "m": aware, "k": None}
+    # What the models rendered before orjson: ISO strings and enum values
+    legacy = {"z": Decimal("12.50"), "a": {"y": [Decimal("-0.01"), created.isoformat()], "b": "red"}, "m": aware.isoformat(), "k": None}
+    default = DefaultJSONProvider(app)
+    app.json.compact = True
+
+    assert app.json.dumps(payload) == default.dumps(legacy, separators=(",", ":"))
+    assert app.json.dumps(payload, sort_keys=False).startswith('{"z":')
+    assert app.json.loads(app.json.dumps({"name": "Ana María"})) == default.loads(default.dumps({"name": "Ana María"}))
@@ -0,0 +1,33 @@
+import compression
+from app import create_app
+
+def test_static_files_are_compressed_once_at_startup(app, tmp_path, monkeypatch):
+    dist = tmp_path / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / "index.html").write_text("<!doctype html><div id='root'></div>")
+    (dist / "assets" / "index-BbTq3kq1.js").write_text("console.log('finzen');\n" * 500)
+
+    static_app = create_app({
+        "STATIC_DIR": str(dist), "STATIC_MANIFEST": True, "SQLALCHEMY_DATABASE_URI": app.config["SQLALCHEMY_DATABASE_URI"],
+    })
+
+    def compress_per_request(*args, **kwargs):
+        raise AssertionError("static file compressed per request")
+
+    monkeypatch.setattr(compression, "compress", compress_per_request)
+    client = static_app.test_client()
+
+    for encoding in ("br", "gzip"):
+        response = client.get("/assets/index-BbTq3kq1.js", headers={"Accept-Encoding": encoding})
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == encoding
+        etag, weak = response.get_etag()
+        assert etag and not weak
+        assert "immutable" in response.headers["Cache-Control"]
+
+        revalidated = client.get("/assets/index-BbTq3kq1.js", headers={"Accept-Encoding": encoding, "If-None-Match": f'"{etag}"'})
+        assert revalidated.status_code == 304
+
+    identity = client.get("/assets/index-BbTq3kq1.js")
+    assert "Content-Encoding" not in identity.headers
+    assert len(identity.data) == len("console.log('finzen');\n") * 500
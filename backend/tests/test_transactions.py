@@ -0,0 +1,69 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import event, select, text
+from models import Account, AccountType, Category, CategoryType, Transaction, TransactionType, User
+from seed import DatasetGenerator
+
+def _listing_plan(db, client, headers_for, query_string):
+    """
+    Runs GET /api/transactions and returns the EXPLAIN QUERY PLAN of its listing query
+    """
+    user_id = db.session.scalars(select(User.id).order_by(User.id)).first()
+    headers = headers_for(user_id)
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and "ORDER BY" in statement and "transaction" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.get(f"/api/transactions/?{query_string}", headers=headers)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200
+
+    statement, parameters = statements[-1]
+    with db.engine.connect() as connection:
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return " | ".join(row[-1] for row in plan)
+
+@pytest.fixture
+def dataset(db):
+    DatasetGenerator(5, months=3, transactions_per_month=40, password_hash="x", seed=3).run()
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+
+@pytest.mark.parametrize("filters", ["", "date_from=2020-01-01&date_to=2100-01-01"])
+def test_listing_uses_user_date_index(db, client, headers_for, dataset, filters):
+    first_id = db.session.scalars(select(Transaction.id).order_by(Transaction.id)).first()
+
+    for query_string in (f"limit=20&{filters}", f"limit=20&after={first_id}&{filters}"):
+        plan = _listing_plan(db, client, headers_for, query_string)
+        assert "ix_transaction_user_id_date_id" in plan
+        # The index order is the listing order: no sort step
+        assert "TEMP B-TREE" not in plan
+
+def test_aware_date_filters_are_compared_in_utc(db, client, user, auth_headers):
+    account = Account(user_id=user.id, name="Main", balance=Decimal("100.00"), type=AccountType.bank)
+    category = Category(user_id=user.id, name="Food", type=CategoryType.expense)
+    db.session.add_all([account, category])
+    db.session.flush()
+    db.session.add(Transaction(
+        user_id=user.id, account_id=account.id, category_id=category.id, type=TransactionType.general,
+        amount=Decimal("10.00"), date=datetime(2026, 1, 1, 23, 30),
+    ))
+    db.session.commit()
+
+    def listed(query_string):
+        response = client.get(f"/api/transactions/?{query_string}", headers=auth_headers)
+        assert response.status_code == 200
+        return len(response.get_json()["transactions"])
+
+    # Midnight at +02:00 is 22:00 UTC of the previous day, before the transaction
+    assert listed("date_to=2026-01-02T00:00:00%2B02:00") == 0
+    assert listed("date_from=2026-01-02T00:00:00%2B02:00") == 1
+    assert client.get("/api/transactions/?date_from=yesterday", headers=auth_headers).get_json() == {
+        "msg": "Invalid date: 'yesterday'"
+    }
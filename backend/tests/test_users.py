@@ -0,0 +1,50 @@
+import json
+import pytest
+from models import User
+
+@pytest.fixture
+def users(db, user):
+    others = [User(full_name=f"User {number}", email=f"user{number}@example.com", currency="USD") for number in range(6)]
+    db.session.add_all(others)
+    db.session.commit()
+    return [user, *others]
+
+def test_pages_continue_from_next_after(client, users, auth_headers):
+    ids, after = [], None
+    for _ in range(len(users)):
+        query = "limit=3" + (f"&after={after}" if after is not None else "")
+        page = client.get(f"/api/users/?{query}", headers=auth_headers).get_json()
+        assert len(page["users"]) <= 3
+        ids += [user["id"] for user in page["users"]]
+        after = page["next_after"]
+        if after is None:
+            break
+        assert after == ids[-1]
+
+    assert ids == sorted(user.id for user in users)
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=-5", "limit=ten", "after=first"])
+def test_invalid_pagination_is_rejected(client, users, auth_headers, query):
+    response = client.get(f"/api/users/?{query}", headers=auth_headers)
+
+    assert response.status_code == 400
+
+def test_limit_is_capped(client, users, auth_headers):
+    response = client.get("/api/users/?limit=100000", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(response.get_json()["users"]) == len(users)
+
+@pytest.mark.parametrize("query, headers", [("format=ndjson", {}), ("", {"Accept": "application/x-ndjson"})])
+def test_ndjson_streams_one_user_per_line(client, users, auth_headers, query, headers):
+    response = client.get(f"/api/users/?{query}", headers={**auth_headers, **headers})
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)["email"] for line in lines] == [user.email for user in users]
+
+def test_ndjson_starts_after_the_cursor(client, users, auth_headers):
+    response = client.get(f"/api/users/?format=ndjson&after={users[3].id}", headers=auth_headers)
+
+    assert [json.loads(line)["id"] for line in response.get_data(as_text=True).splitlines()] == [user.id for user in users[4:]]
@@ -1,41 +1,101 @@
+import calendar
+from datetime import datetime, timedelta, timezone
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from models import User
+from flask import current_app, has_app_context, jsonify, request
+from flask_jwt_extended import verify_jwt_in_request, get_current_user
+from models import db, User, frequencyType
+
+def _password_hasher():
+    if has_app_context():
+        return current_app.extensions.get('password_hasher')
+    return None
 
 def hash_password(password):
     """
-    Hashea una contraseña usando Werkzeug
+    Hashea una contraseña usando Werkzeug, con el método configurado en
+    PASSWORD_HASH_METHOD y fuera del hilo de la petición (ver passwords.py)
     """
-    return generate_password_hash(password)
+    hasher = _password_hasher()
+    return hasher.hash(password) if hasher else generate_password_hash(password)
 
 def check_password(password_hash, password):
     """
     Verifica una contraseña contra su hash
     """
-    return check_password_hash(password_hash, password)
+    hasher = _password_hasher()
+    return hasher.verify(password_hash, password) if hasher else check_password_hash(password_hash, password)
+
+def password_needs_rehash(password_hash):
+    """
+    Indica si el hash fue generado con un método o parámetros distintos a los configurados
+    """
+    hasher = _password_hasher()
+    return bool(hasher and hasher.needs_rehash(password_hash))
 
 def admin_required(f):
     """
-    Decorator para rutas que requieren permisos de administrador
+    Decorator para rutas que requieren permisos de administrador: usuario activo con `is_admin`
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
         verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        # Se relee la fila: la caché de identidad puede tener una copia de antes de desactivarlo
+        user = db.session.get(User, get_current_user().id, populate_existing=True)
         
-        if not user or not user.is_active:
+        if not user or not user.is_active or not user.is_admin:
             return jsonify({"msg": "Admin access required"}), 403
         
-        # TODO: Implementar campo is_admin en el modelo User
-        # if not user.is_admin:
-        #     return jsonify({"msg": "Admin access required"}), 403
-        
         return f(*args, **kwargs)
     return decorated_function
 
+def next_payment_date(date, frequency, anchor_day=None):
+    """
+    Fecha del pago siguiente a `date` según la frecuencia. Los pagos mensuales y anuales caen
+    el día `anchor_day` (por defecto el de `date`), limitado al último día de los meses más
+    cortos: con el día original, un pago del 31 pasa al 28 de febrero y vuelve al 31 en marzo
+    """
+    if frequency == frequencyType.daily:
+        return date + timedelta(days=1)
+    if frequency == frequencyType.weekly:
+        return date + timedelta(days=7)
+    months = 1 if frequency == frequencyType.monthly else 12
+    month_index = date.month - 1 + months
+    year, month = date.year + month_index // 12, month_index % 12 + 1
+    return date.replace(year=year, month=month, day=min(anchor_day or date.day, calendar.monthrange(year, month)[1]))
+
+def get_pagination_args(default_limit=50, max_limit=500):
+    """
+    Lee los parámetros de paginación por cursor (keyset) `limit` y `after`
+    de la query string. Devuelve (limit, after) o lanza ValueError si no son válidos
+    """
+    try:
+        limit = int(request.args.get('limit', default_limit))
+        after = request.args.get('after', None)
+        after = int(after) if after is not None else None
+    except ValueError:
+        raise ValueError("'limit' and 'after' must be integers")
+
+    if limit < 1:
+        raise ValueError("'limit' must be greater than 0")
+
+    return min(limit, max_limit), after
+
+def parse_date(value):
+    """
+    Convierte una fecha ISO 8601 a datetime. Las que traen zona horaria se pasan a UTC
+    sin zona, como las guardadas. Devuelve None si está vacía o lanza ValueError si no es válida
+    """
+    if not value:
+        return None
+    try:
+        date = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date: '{value}'")
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+    return date
+
 def validate_email(email):
     """
     Validar formato de email básico
@@ -29,7 +29,7 @@ docker-compose exec backend flask db upgrade
 
 REM Crear usuario de prueba
 echo 👤 Creando usuario de prueba...
-docker-compose exec backend python -c "from app import app; from models import db, User; from utils import hash_password; app.app_context().push(); user = User.query.filter_by(email='admin@example.com').first() or User(email='admin@example.com', password=hash_password('admin123'), is_active=True); db.session.add(user) if not User.query.filter_by(email='admin@example.com').first() else None; db.session.commit(); print('✅ Usuario admin@example.com configurado')"
+docker-compose exec backend python -c "from app import create_app; from models import db, User; from utils import hash_password; app = create_app(); app.app_context().push(); user = User.query.filter_by(email='admin@example.com').first() or User(email='admin@example.com', password=hash_password('admin123'), is_active=True); db.session.add(user) if not User.query.filter_by(email='admin@example.com').first() else None; db.session.commit(); print('✅ Usuario admin@example.com configurado')"
 
 echo.
 echo 🎉 ¡Setup completado!
@@ -29,9 +29,10 @@ docker-compose exec backend flask db upgrade
 # Crear usuario de prueba
 echo "👤 Creando usuario de prueba..."
 docker-compose exec backend python -c "
-from app import app
+from app import create_app
 from models import db, User
 from utils import hash_password
+app = create_app()
 with app.app_context():
     if not User.query.filter_by(email='admin@example.com').first():
         user = User(